@@ -0,0 +1 @@
+# Benchmarks of the scanning pipelines against local stub servers
@@ -0,0 +1,306 @@
+# benchmarks/run_benchmarks.py
+"""
+End-to-end benchmarks of the NEW and EXPIRED pipelines against local stub
+servers (DNS, WHOIS, Wayback, RSS, expireddomains.net, a Moz-style SEO API,
+the registrar availability APIs and the marketplaces), so runs are
+repeatable and never touch live services.
+
+Every scenario runs in its own process so peak memory is measured per
+scenario. The report is JSON and can be diffed between versions:
+
+    python -m benchmarks.run_benchmarks --candidates 3000 --output before.json
+    python -m benchmarks.run_benchmarks --candidates 3000 --output after.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ['new-batch', 'new-streaming', 'expired']
+TLDS = ['.com', '.io', '.ai']
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'to', 'ne', 'su', 'vi', 'do', 'pe', 'zu', 'ba', 'fi', 'go', 'ly', 'xo']
+EXPIRED_LISTS = ['deleted-com-domains', 'deleted-net-domains', 'deleted-io-domains']
+EXPIRED_PAGE_SIZE = 25
+
+
+def make_words(count: int) -> List[str]:
+    """Deterministic pronounceable pseudo-words: ka, lo, ..., kaka, kalo, ..."""
+    words = []
+    for length in itertools.count(2):
+        for combo in itertools.product(SYLLABLES, repeat=length):
+            words.append(''.join(combo))
+            if len(words) == count:
+                return words
+
+
+def is_picked(domain: str, ratio: float, salt: str) -> bool:
+    """Deterministically picks about `ratio` of all domains."""
+    digest = hashlib.blake2b(f"{salt}:{domain}".encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'big') < ratio * 0xFFFFFFFF
+
+
+def make_fixtures(candidates: int, taken_ratio: float, history_ratio: float) -> dict:
+    """Builds the word list, the registered set and the archive histories."""
+    words = make_words(max(1, candidates // len(TLDS)))
+    new_domains = [word + tld for word in words for tld in TLDS]
+    expired_domains = [f"old{word}{tld}" for word in words for tld in TLDS][:candidates]
+    all_domains = new_domains + expired_domains
+    registered = [domain for domain in all_domains if is_picked(domain, taken_ratio, 'taken')]
+    histories = {
+        domain: ['20150101000000', '20180101000000']
+        for domain in all_domains if is_picked(domain, history_ratio, 'history')
+    }
+    listings = {
+        list_name: expired_domains[i::len(EXPIRED_LISTS)] for i, list_name in enumerate(EXPIRED_LISTS)
+    }
+    return {
+        'words': words,
+        'registered': registered,
+        'histories': histories,
+        'listings': listings,
+        'headlines': [f"{word.capitalize()} unveils {word}cloud" for word in words[:10]],
+    }
+
+
+def _run_scenario(scenario: str, overrides: dict, workdir: str, result_queue):
+    """Child process: applies the config overrides, runs one pipeline and reports."""
+    # Runs from a scratch directory so the relative data/ paths stay out of the repo
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir)
+    from domainscanner import config
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    import main
+    from domainscanner.utils.metrics import metrics_summary
+    from domainscanner.utils.result_store import close_result_store, start_result_store
+    from domainscanner.publishers.marketplace_lister import close_publisher, start_publisher
+    run = {
+        'new-batch': main.process_new_domains,
+        'new-streaming': main.process_new_domains_streaming,
+        'expired': main.process_expired_domains,
+    }[scenario]
+
+    # Every scenario lists its domains from scratch
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(config.PUBLISH_OUTBOX_FILE + suffix):
+            os.remove(config.PUBLISH_OUTBOX_FILE + suffix)
+    store = start_result_store()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        start_publisher()
+        run()
+        wall_seconds = time.perf_counter() - start
+        # Listings still queued when the scan finished
+        close_publisher()
+        publish_drain_seconds = time.perf_counter() - start - wall_seconds
+
+    # Counted after the timed run, so the extra fetches do not skew it
+    with contextlib.redirect_stdout(io.StringIO()):
+        if scenario == 'expired':
+            from domainscanner.parsers.expired_domains_parser import get_expired_domains
+            candidates = len(get_expired_domains())
+        else:
+            from domainscanner.stages import iter_unique_candidates
+            candidates = sum(1 for _ in iter_unique_candidates())
+
+    pipeline, criterion = ('expired', 'high_value') if scenario == 'expired' else ('new', 'clean_history')
+    found = sum(1 for result in store.iter_results(pipeline, store.run_id) if result['outcomes'][criterion])
+    close_result_store()
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_rss //= 1024
+    result_queue.put({
+        'candidates': candidates,
+        'throughput_per_second': round(candidates / wall_seconds, 1) if wall_seconds else None,
+        'wall_seconds': round(wall_seconds, 3),
+        'publish_drain_seconds': round(publish_drain_seconds, 3),
+        'found': found,
+        'peak_rss_kb': peak_rss,
+        'metrics': metrics_summary(),
+    })
+
+
+def run_scenario(scenario: str, overrides: dict, workdir: str) -> dict:
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    process = context.Process(target=_run_scenario, args=(scenario, overrides, workdir, result_queue))
+    process.start()
+    while True:
+        try:
+            result = result_queue.get(timeout=1.0)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"Scenario '{scenario}' failed with exit code {process.exitcode}")
+    process.join()
+    return result
+
+
+def run_benchmarks(candidates: int, scenarios: List[str], taken_ratio: float, history_ratio: float,
+                   whois_latency: float, whois_error_rate: float, http_latency: float,
+                   http_error_rate: float, dns_prefilter: bool, seo_batch_size: int,
+                   availability_backend: str = 'async-whois', concurrency_mode: str = 'fixed') -> Dict:
+    from domainscanner.utils.stub_servers import (
+        StubDNSServer, StubExpiredDomainsServer, StubMarketplaceServer, StubRDAPServer, StubRegistrarServer,
+        StubRSSServer, StubSEOServer, StubWaybackServer, StubWhoisServer
+    )
+
+    fixtures = make_fixtures(candidates, taken_ratio, history_ratio)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'candidates': len(fixtures['words']) * len(TLDS),
+            'taken_ratio': taken_ratio,
+            'history_ratio': history_ratio,
+            'whois_latency': whois_latency,
+            'whois_error_rate': whois_error_rate,
+            'http_latency': http_latency,
+            'http_error_rate': http_error_rate,
+            'dns_prefilter': dns_prefilter,
+            'seo_batch_size': seo_batch_size,
+            'availability_backend': availability_backend,
+            'concurrency_mode': concurrency_mode,
+        },
+        'scenarios': {},
+    }
+
+    with contextlib.ExitStack() as stack:
+        dns_host, dns_port = stack.enter_context(StubDNSServer(fixtures['registered']))
+        whois_host, whois_port = stack.enter_context(StubWhoisServer(
+            fixtures['registered'], latency=whois_latency, error_rate=whois_error_rate))
+        wayback_host, wayback_port = stack.enter_context(StubWaybackServer(
+            fixtures['histories'], latency=http_latency, error_rate=http_error_rate))
+        rss_host, rss_port = stack.enter_context(StubRSSServer({'tech': fixtures['headlines']}))
+        expired_host, expired_port = stack.enter_context(StubExpiredDomainsServer(
+            fixtures['listings'], page_size=EXPIRED_PAGE_SIZE, latency=http_latency))
+        seo_server = StubSEOServer(latency=http_latency, error_rate=http_error_rate)
+        seo_host, seo_port = stack.enter_context(seo_server)
+        marketplace_server = StubMarketplaceServer(latency=http_latency, error_rate=http_error_rate)
+        marketplace_host, marketplace_port = stack.enter_context(marketplace_server)
+        marketplace_url = f"http://{marketplace_host}:{marketplace_port}/listings/bulk"
+        registrar_server = StubRegistrarServer(fixtures['registered'], latency=http_latency,
+                                               error_rate=http_error_rate)
+        registrar_host, registrar_port = stack.enter_context(registrar_server)
+        rdap_server = StubRDAPServer(fixtures['registered'], tlds=TLDS, latency=http_latency,
+                                     error_rate=http_error_rate)
+        rdap_host, rdap_port = stack.enter_context(rdap_server)
+        workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix='domainscanner-bench-'))
+
+        os.makedirs(os.path.join(workdir, 'data'))
+        with open(os.path.join(workdir, 'data', 'dictionary.txt'), 'w') as f:
+            f.write('\n'.join(fixtures['words']) + '\n')
+        with open(os.path.join(workdir, 'data', 'trend_words.txt'), 'w') as f:
+            f.write('')
+
+        wayback = f"http://{wayback_host}:{wayback_port}"
+        overrides = {
+            'DEFAULT_TLDS': TLDS,
+            'DICTIONARY_FILE': 'data/dictionary.txt',
+            'TREND_KEYWORDS_FILE': 'data/trend_words.txt',
+            'NEWS_SOURCES': [f"http://{rss_host}:{rss_port}/tech.xml"],
+            'STOPWORDS_FILE': os.path.join(REPO_ROOT, 'data', 'stopwords.txt'),
+            'DNS_PREFILTER_ENABLED': dns_prefilter,
+            'DNS_RESOLVER': dns_host,
+            'DNS_RESOLVER_PORT': dns_port,
+            'AVAILABILITY_BACKEND': availability_backend,
+            'CONCURRENCY_MODE': concurrency_mode,
+            # The stubs take far more than MAX_WORKERS, so the adaptive limits may grow past it
+            'CONCURRENCY_MAX_WORKERS': 100,
+            'WHOIS_SERVERS': {tld: f"{whois_host}:{whois_port}" for tld in TLDS},
+            'WHOIS_SERVER_CONCURRENCY': {'default': 50},
+            'RDAP_BOOTSTRAP_URL': f"http://{rdap_host}:{rdap_port}/rdap/dns.json",
+            'RDAP_BOOTSTRAP_FILE': 'data/rdap_dns.json',
+            'RDAP_SERVER_CONCURRENCY': {'default': 50},
+            'WAYBACK_AVAILABLE_URL': f"{wayback}/wayback/available",
+            'WAYBACK_CDX_URL': f"{wayback}/cdx/search/cdx",
+            'EXPIRED_DOMAINS_BASE_URL': f"http://{expired_host}:{expired_port}",
+            'EXPIRED_DOMAINS_LISTS': EXPIRED_LISTS,
+            'EXPIRED_DOMAINS_PAGE_SIZE': EXPIRED_PAGE_SIZE,
+            'SEO_API_URL': f"http://{seo_host}:{seo_port}/v2/url_metrics",
+            'SEO_BATCH_SIZE': seo_batch_size,
+            'MOZ_ACCESS_ID': 'benchmark',
+            'MOZ_SECRET_KEY': 'benchmark',
+            'MARKETPLACES': {
+                name: {'url': marketplace_url, 'api_key': 'SEDO_API_KEY', 'batch_size': 50}
+                for name in ('sedo.com', 'dan.com')
+            },
+            'SEDO_API_KEY': 'benchmark',
+            'GODADDY_API_URL': f"http://{registrar_host}:{registrar_port}",
+            'GODADDY_API_KEY': 'benchmark',
+            'GODADDY_API_SECRET': 'benchmark',
+            'NAMECHEAP_API_URL': f"http://{registrar_host}:{registrar_port}/xml.response",
+            'NAMECHEAP_API_KEY': 'benchmark',
+            'NAMECHEAP_USER_NAME': 'benchmark',
+            'NAMECHEAP_CLIENT_IP': '127.0.0.1',
+            'EXPIRED_DOMAINS_MAX_PAGES': -(-candidates // (EXPIRED_PAGE_SIZE * len(EXPIRED_LISTS))) + 1,
+            'RATE_LIMITS': {'default': (1e6, 1000)},
+            'RETRY_BASE_DELAY': 0.05,
+            'RETRY_MAX_DELAY': 0.5,
+            'CACHE_ENABLED': False,
+            'JOURNAL_ENABLED': False,
+        }
+
+        for scenario in scenarios:
+            print(f"Running scenario '{scenario}'...", file=sys.stderr)
+            seo_requests_before = seo_server.requests
+            marketplace_requests_before = marketplace_server.requests
+            registrar_requests_before = registrar_server.requests
+            rdap_requests_before, rdap_connections_before = rdap_server.requests, rdap_server.connections
+            result = run_scenario(scenario, overrides, workdir)
+            result['seo_requests'] = seo_server.requests - seo_requests_before
+            result['marketplace_requests'] = marketplace_server.requests - marketplace_requests_before
+            result['registrar_requests'] = registrar_server.requests - registrar_requests_before
+            result['rdap_requests'] = rdap_server.requests - rdap_requests_before
+            result['rdap_connections'] = rdap_server.connections - rdap_connections_before
+            report['scenarios'][scenario] = result
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the pipelines against local stub servers.")
+    parser.add_argument('--candidates', type=int, default=3000, help="Number of candidate domains per pipeline")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--taken-ratio', type=float, default=0.8, help="Fraction of candidates that are registered")
+    parser.add_argument('--history-ratio', type=float, default=0.3,
+                        help="Fraction of candidates with archived snapshots")
+    parser.add_argument('--whois-latency', type=float, default=0.02, help="Seconds per WHOIS answer")
+    parser.add_argument('--whois-error-rate', type=float, default=0.0)
+    parser.add_argument('--http-latency', type=float, default=0.01, help="Seconds per HTTP answer")
+    parser.add_argument('--http-error-rate', type=float, default=0.0)
+    parser.add_argument('--seo-batch-size', type=int, default=50, help="Domains per SEO API request")
+    parser.add_argument('--no-dns-prefilter', action='store_true', help="Send every candidate to WHOIS")
+    parser.add_argument('--availability-backend', choices=['async-whois', 'rdap', 'godaddy', 'namecheap'],
+                        default='async-whois', help="Check availability over WHOIS, RDAP or a stub registrar API")
+    parser.add_argument('--concurrency-mode', choices=['fixed', 'adaptive'], default='fixed',
+                        help="Fixed worker pools or adaptive per-stage limits")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        args.candidates, args.scenarios, args.taken_ratio, args.history_ratio,
+        args.whois_latency, args.whois_error_rate, args.http_latency, args.http_error_rate,
+        not args.no_dns_prefilter, args.seo_batch_size, args.availability_backend, args.concurrency_mode,
+    )
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"[SUCCESS] Benchmark report saved to {args.output}", file=sys.stderr)
+    else:
+        print(output)
@@ -0,0 +1,95 @@
+# benchmarks/startup_time.py
+"""
+Startup-time benchmark of the command line. Every command runs in a fresh
+interpreter from a scratch directory, on inputs that need no network
+(an empty domain file, zero generated candidates), so the timings are the
+import and setup cost every cron run or shard pays before any work.
+
+    python -m benchmarks.startup_time --repeat 10 --output startup.json
+
+The report lists the wall time of every command (min and median) and the
+modules with the largest cumulative import time (python -X importtime).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(REPO_ROOT, 'main.py')
+
+COMMANDS = {
+    'import': [sys.executable, '-c', 'import main'],
+    'help': [sys.executable, MAIN, '--help'],
+    'generate': [sys.executable, MAIN, 'generate', '--limit', '0'],
+    'check': [sys.executable, MAIN, 'check', 'empty.txt'],
+}
+
+
+def run_command(argv: List[str], workdir: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, PYTHONDONTWRITEBYTECODE='1')
+    if importtime:
+        argv = [argv[0], '-X', 'importtime'] + argv[1:]
+    return subprocess.run(argv, cwd=workdir, env=env, capture_output=True, text=True, check=True)
+
+
+def top_imports(stderr: str, count: int) -> List[Dict]:
+    """Parses `python -X importtime` output into the `count` slowest top-level imports."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented; only the top level adds up to the total
+        if not name.startswith('  '):
+            imports.append({'module': name.strip(), 'cumulative_ms': round(int(cumulative) / 1000, 1)})
+    return sorted(imports, key=lambda entry: entry['cumulative_ms'], reverse=True)[:count]
+
+
+def run_benchmarks(commands: List[str], repeat: int, top: int) -> Dict:
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'repeat': repeat},
+        'commands': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='domainscanner-startup-') as workdir:
+        open(os.path.join(workdir, 'empty.txt'), 'w').close()
+        for name in commands:
+            print(f"Timing '{name}'...", file=sys.stderr)
+            # One untimed run warms the OS file cache and writes the data files
+            run_command(COMMANDS[name], workdir)
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run_command(COMMANDS[name], workdir)
+                timings.append(time.perf_counter() - start)
+            report['commands'][name] = {
+                'min_seconds': round(min(timings), 3),
+                'median_seconds': round(statistics.median(timings), 3),
+                'top_imports': top_imports(run_command(COMMANDS[name], workdir, importtime=True).stderr, top),
+            }
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of the command line.")
+    parser.add_argument('--commands', nargs='+', choices=list(COMMANDS), default=list(COMMANDS))
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per command")
+    parser.add_argument('--top', type=int, default=10, help="Slowest imports listed per command")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run_benchmarks(args.commands, args.repeat, args.top), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
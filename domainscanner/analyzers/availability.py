@@ -4,32 +4,62 @@ import whois
 from typing import List, Tuple
 import time
 
+from .. import config
+from ..utils.metrics import timed
+from ..utils.rate_limit import RetryableError, backoff_delay, get_bucket
+
+def whois_endpoint(domain: str) -> str:
+    """Returns the rate-limit endpoint (the WHOIS server) used for a domain."""
+    tld = '.' + domain.rsplit('.', 1)[-1].lower()
+    return config.WHOIS_SERVERS.get(tld, 'whois').split(':')[0]
+
+def check_single_domain_once(domain: str) -> Tuple[str, bool, str]:
+    """
+    Performs a single WHOIS lookup for a domain.
+    Returns the domain, a boolean indicating availability and the outcome
+    ('available' or 'taken'). Raises RetryableError on network errors.
+    """
+    try:
+        with timed('whois', whois_endpoint(domain)):
+            w = whois.whois(domain)
+    except whois.parser.PywhoisError:
+        # No WHOIS record often means available for gTLDs
+        return domain, True, 'available'
+    except Exception as e:
+        # Other exceptions are likely network-related (e.g., Connection Refused)
+        raise RetryableError(f"WHOIS lookup for {domain} failed: {e}") from e
+    if not w.status or not w.expiration_date:
+        return domain, True, 'available'
+    return domain, False, 'taken'
+
+def check_single_domain_give_up(domain: str) -> Tuple[str, bool, str]:
+    """Result used when every attempt failed: assume taken or problematic."""
+    return domain, False, 'error'
+
+def check_single_domain_detailed(domain: str) -> Tuple[str, bool, str]:
+    """
+    Checks if a single domain is available.
+    Returns the domain, a boolean indicating availability and the outcome
+    ('available', 'taken' or 'error') used by the result cache.
+    Includes blocking retry logic; pipelines should run check_single_domain_once
+    through utils.rate_limit.run_rate_limited instead.
+    """
+    for i in range(config.MAX_ATTEMPTS):
+        get_bucket(whois_endpoint(domain)).acquire()
+        try:
+            return check_single_domain_once(domain)
+        except RetryableError:
+            if i < config.MAX_ATTEMPTS - 1:
+                time.sleep(backoff_delay(i))
+    return check_single_domain_give_up(domain)
+
 def check_single_domain(domain: str) -> Tuple[str, bool]:
     """
     Checks if a single domain is available.
     Returns the domain and a boolean indicating availability.
-    Includes retry logic for network errors.
     """
-    retries = 3
-    for i in range(retries):
-        try:
-            w = whois.whois(domain)
-            if not w.status or not w.expiration_date:
-                return domain, True # Available
-            return domain, False # Taken
-        except whois.parser.PywhoisError:
-            # No WHOIS record often means available for gTLDs
-            return domain, True # Available
-        except Exception:
-            # Catch other exceptions, likely network-related (e.g., Connection Refused)
-            if i < retries - 1:
-                wait = (i + 1) * 3 # Increased exponential backoff: 3, 6 seconds
-                time.sleep(wait)
-                continue
-            else:
-                # All retries failed, assume taken or problematic
-                return domain, False
-    return domain, False # Fallback
+    domain_name, is_available, _ = check_single_domain_detailed(domain)
+    return domain_name, is_available
 
 def check_domain_availability(domains: List[str]) -> List[str]:
     """
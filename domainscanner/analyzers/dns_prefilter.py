@@ -0,0 +1,182 @@
+# domainscanner/analyzers/dns_prefilter.py
+
+import asyncio
+import random
+import socket
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from .. import config
+from ..utils.metrics import ERRORS, RETRIES, timed
+
+# DNS response codes we care about
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+
+QTYPE_NS = 2
+QCLASS_IN = 1
+
+# Responses to hundreds of in-flight queries arrive in bursts; the default
+# socket receive buffer drops part of them, which then time out and retry
+RECEIVE_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Outcomes of the pre-filter for a single domain
+DELEGATED = 'delegated'  # The TLD knows the name -> it is registered
+NXDOMAIN = 'nxdomain'    # The TLD does not know the name -> ask WHOIS
+UNKNOWN = 'unknown'      # Timeout / SERVFAIL -> ask WHOIS to be safe
+
+
+def _build_query(query_id: int, domain: str) -> bytes:
+    """Builds a minimal recursive NS query packet for a domain."""
+    header = struct.pack('>HHHHHH', query_id, 0x0100, 1, 0, 0, 0)
+    qname = b''.join(
+        bytes([len(label)]) + label.encode('idna')
+        for label in domain.rstrip('.').split('.')
+    ) + b'\x00'
+    return header + qname + struct.pack('>HH', QTYPE_NS, QCLASS_IN)
+
+
+def _parse_rcode(packet: bytes) -> Tuple[int, int]:
+    """Returns the query id and response code of a DNS response packet."""
+    query_id, flags = struct.unpack('>HH', packet[:4])
+    return query_id, flags & 0x000F
+
+
+class _DNSClientProtocol(asyncio.DatagramProtocol):
+    """Multiplexes many in-flight queries over a single UDP socket."""
+
+    def __init__(self):
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.transport = None
+        self.resolver = ''
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.resolver = transport.get_extra_info('peername')[0]
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        query_id, rcode = _parse_rcode(data)
+        future = self.pending.pop(query_id, None)
+        if future and not future.done():
+            future.set_result(rcode)
+
+    def error_received(self, exc):
+        # ICMP errors are not tied to a query id; let the timeouts handle it
+        pass
+
+    def next_query_id(self) -> int:
+        while True:
+            query_id = random.randint(0, 0xFFFF)
+            if query_id not in self.pending:
+                return query_id
+
+
+async def _resolve_one(protocol: _DNSClientProtocol, domain: str,
+                       semaphore: asyncio.Semaphore, timeout: float, retries: int) -> str:
+    """Resolves the NS delegation of a single domain."""
+    async with semaphore:
+        with timed('dns', protocol.resolver):
+            return await _query_with_retries(protocol, domain, timeout, retries)
+
+
+async def _query_with_retries(protocol: _DNSClientProtocol, domain: str, timeout: float, retries: int) -> str:
+    loop = asyncio.get_running_loop()
+    for _ in range(retries + 1):
+        query_id = protocol.next_query_id()
+        future = loop.create_future()
+        protocol.pending[query_id] = future
+        try:
+            protocol.transport.sendto(_build_query(query_id, domain))
+            rcode = await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, OSError, UnicodeError):
+            protocol.pending.pop(query_id, None)
+            RETRIES.labels('dns', protocol.resolver).inc()
+            continue
+        if rcode == RCODE_NOERROR:
+            # NOERROR (with or without NS answers) means the name exists in the zone
+            return DELEGATED
+        if rcode == RCODE_NXDOMAIN:
+            return NXDOMAIN
+        # SERVFAIL / REFUSED: retry, then give up
+        RETRIES.labels('dns', protocol.resolver).inc()
+    ERRORS.labels('dns', protocol.resolver).inc()
+    return UNKNOWN
+
+
+async def resolve_delegations_async(domains: List[str], resolver: Optional[str] = None,
+                                    port: Optional[int] = None) -> Dict[str, str]:
+    """
+    Resolves NS records for many domains concurrently.
+
+    Args:
+        domains: A list of domain names.
+        resolver: The DNS resolver address. Defaults to config.DNS_RESOLVER.
+        port: The DNS resolver port. Defaults to config.DNS_RESOLVER_PORT.
+
+    Returns:
+        A dict mapping each domain to DELEGATED, NXDOMAIN or UNKNOWN.
+    """
+    resolver = resolver or config.DNS_RESOLVER
+    port = port or config.DNS_RESOLVER_PORT
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        _DNSClientProtocol, remote_addr=(resolver, port)
+    )
+    try:
+        transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_SIZE)
+    except OSError:
+        pass  # Keep the default buffer
+    # Query ids are 16 bit, so never keep more than that in flight
+    semaphore = asyncio.Semaphore(min(config.DNS_CONCURRENCY, 0xFFFF))
+    try:
+        outcomes = await asyncio.gather(*[
+            _resolve_one(protocol, domain, semaphore, config.DNS_TIMEOUT, config.DNS_RETRIES)
+            for domain in domains
+        ])
+    finally:
+        transport.close()
+    return dict(zip(domains, outcomes))
+
+
+def prefilter_domains(domains: List[str], resolver: Optional[str] = None,
+                      port: Optional[int] = None) -> Tuple[List[str], List[str]]:
+    """
+    Splits domains into the ones that are obviously taken (they have a
+    delegation in their TLD zone) and the ones that still need a WHOIS check.
+
+    Args:
+        domains: A list of domain names.
+        resolver: Optional DNS resolver address to use instead of the config one.
+        port: Optional DNS resolver port to use instead of the config one.
+
+    Returns:
+        A tuple of (taken_domains, domains_to_check).
+    """
+    if not config.DNS_PREFILTER_ENABLED or not domains:
+        return [], list(domains)
+
+    outcomes = asyncio.run(resolve_delegations_async(domains, resolver, port))
+    taken = [domain for domain in domains if outcomes[domain] == DELEGATED]
+    to_check = [domain for domain in domains if outcomes[domain] != DELEGATED]
+    return taken, to_check
+
+
+if __name__ == '__main__':
+    from ..utils.stub_servers import StubDNSServer
+
+    registered = {'google.com', 'facebook.ai'}
+    test_domains = [
+        'google.com',
+        'thisisdefinitelyanavailabledomain12345.com',
+        'facebook.ai',
+    ]
+    with StubDNSServer(registered) as (host, port):
+        taken, to_check = prefilter_domains(test_domains, host, port)
+
+    print("\n--- DNS Pre-filter Results ---")
+    for domain in taken:
+        print(f"[DELEGATED] {domain}")
+    for domain in to_check:
+        print(f"[NEEDS WHOIS] {domain}")
@@ -6,6 +6,9 @@ import requests
 import time
 
 from .. import config
+from ..utils.http import get_session
+from ..utils.metrics import timed
+from ..utils.rate_limit import RetryableError, backoff_delay, get_bucket
 
 def filter_by_length(domains: List[str]) -> List[str]:
     """
@@ -29,33 +32,57 @@ def filter_by_length(domains: List[str]) -> List[str]:
             
     return short_domains
 
+HISTORY_ENDPOINT = 'archive.org'
+
+def check_single_domain_history_once(domain: str) -> Tuple[str, bool, str]:
+    """
+    Performs a single Wayback Machine lookup for a domain.
+    Returns the domain, a boolean indicating if it has history and the
+    outcome used by the result cache ('taken' if it has history,
+    'available' if it is clean). Raises RetryableError on failure.
+    """
+    try:
+        with timed('history', HISTORY_ENDPOINT):
+            response = get_session().get(config.WAYBACK_AVAILABLE_URL, params={'url': domain},
+                                         timeout=config.HTTP_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        raise RetryableError(f"Wayback lookup for {domain} failed: {e}") from e
+    # Use .get() to avoid error if key is missing
+    if not data.get('archived_snapshots'):
+        return domain, False, 'available' # No history
+    return domain, True, 'taken' # Has history
+
+def check_single_domain_history_give_up(domain: str) -> Tuple[str, bool, str]:
+    """Result used when every attempt failed: assume it has history to be safe."""
+    return domain, True, 'error'
+
+def check_single_domain_history_detailed(domain: str) -> Tuple[str, bool, str]:
+    """
+    Checks a single domain against the Wayback Machine API.
+    Returns the domain, a boolean indicating if it has history and the
+    outcome used by the result cache ('taken' if it has history,
+    'available' if it is clean, 'error' if the lookup failed).
+    Includes blocking retry logic; pipelines should run
+    check_single_domain_history_once through utils.rate_limit.run_rate_limited.
+    """
+    for i in range(config.MAX_ATTEMPTS):
+        get_bucket(HISTORY_ENDPOINT).acquire()
+        try:
+            return check_single_domain_history_once(domain)
+        except RetryableError:
+            if i < config.MAX_ATTEMPTS - 1:
+                time.sleep(backoff_delay(i))
+    return check_single_domain_history_give_up(domain)
+
 def check_single_domain_history(domain: str) -> Tuple[str, bool]:
     """
     Checks a single domain against the Wayback Machine API.
     Returns the domain and a boolean indicating if it has history.
     """
-    retries = 3
-    for i in range(retries):
-        try:
-            api_url = f"http://archive.org/wayback/available?url={domain}"
-            response = requests.get(api_url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            # Use .get() to avoid error if key is missing
-            if not data.get('archived_snapshots'):
-                return domain, False # No history
-            return domain, True # Has history
-                
-        except (requests.exceptions.RequestException, KeyError, ValueError):
-            if i < retries - 1:
-                wait = (i + 1) * 2 # Exponential backoff: 2, 4 seconds
-                time.sleep(wait)
-                continue
-            else:
-                # If all retries fail, assume it has history to be safe
-                return domain, True
-    return domain, True # Fallback
+    domain_name, has_history, _ = check_single_domain_history_detailed(domain)
+    return domain_name, has_history
 
 def filter_clean_history_domains(domains: List[str]) -> List[str]:
     """
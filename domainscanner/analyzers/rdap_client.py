@@ -0,0 +1,382 @@
+# domainscanner/analyzers/rdap_client.py
+"""
+RDAP availability backend (config.AVAILABILITY_BACKEND = 'rdap').
+
+RDAP answers domain lookups with JSON over HTTPS: 404 means the domain is
+not registered, anything else is a domain object with its status and
+events, including the expiration date. The RDAP server of every TLD comes
+from the IANA bootstrap registry, downloaded once and cached in
+config.RDAP_BOOTSTRAP_FILE.
+
+Lookups run concurrently on asyncio. Every RDAP server gets a pool of
+HTTP/1.1 keep-alive connections, at most
+config.RDAP_SERVER_CONCURRENCY of them, and requests reuse idle ones.
+"""
+
+import asyncio
+import json
+import os
+import ssl
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+from .. import config
+from ..utils.cache import get_default_cache
+from ..utils.http import DEFAULT_HEADERS, get_session
+from ..utils.metrics import ERRORS, RETRIES, timed
+from ..utils.rate_limit import backoff_delay, get_bucket
+
+RDAP_MEDIA_TYPE = 'application/rdap+json'
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Statuses of a registration that is about to be deleted and released
+DROPPING_STATUSES = {'pending delete', 'redemption period'}
+
+_bootstrap: Optional[Dict[str, str]] = None
+_bootstrap_lock = threading.Lock()
+
+
+class RdapRecord(NamedTuple):
+    domain: str
+    is_available: bool
+    outcome: str  # 'available', 'taken', 'expiring' (taken, but being deleted) or 'error'
+    status: Tuple[str, ...] = ()
+    expiration_date: Optional[str] = None
+
+    @property
+    def is_dropping(self) -> bool:
+        """Whether the registration is in its deletion grace periods and will be released soon."""
+        return self.outcome == 'expiring'
+
+
+def parse_bootstrap(data: dict) -> Dict[str, str]:
+    """Maps every TLD of an IANA bootstrap registry ('.com') to the base URL of its RDAP server."""
+    servers = {}
+    for tlds, urls in data.get('services', []):
+        if not urls:
+            continue
+        url = next((url for url in urls if url.startswith('https://')), urls[0])
+        for tld in tlds:
+            servers['.' + tld.lower()] = url if url.endswith('/') else url + '/'
+    return servers
+
+
+def load_bootstrap(path: Optional[str] = None, url: Optional[str] = None) -> Dict[str, str]:
+    """
+    Returns the TLD -> RDAP base URL map of the IANA bootstrap registry.
+
+    The registry is read from `path` (config.RDAP_BOOTSTRAP_FILE) and
+    downloaded again once the copy is older than config.RDAP_BOOTSTRAP_MAX_AGE.
+    If the download fails, a stale copy is used.
+    """
+    path = path or config.RDAP_BOOTSTRAP_FILE
+    url = url or config.RDAP_BOOTSTRAP_URL
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < config.RDAP_BOOTSTRAP_MAX_AGE:
+        with open(path, 'r', encoding='utf-8') as f:
+            return parse_bootstrap(json.load(f))
+    try:
+        response = get_session().get(url, timeout=config.HTTP_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        if not os.path.exists(path):
+            raise LookupError(f"Could not download the RDAP bootstrap registry: {e}") from e
+        print(f"[WARNING] Could not refresh the RDAP bootstrap registry ({e}). Using the cached copy.")
+        with open(path, 'r', encoding='utf-8') as f:
+            return parse_bootstrap(json.load(f))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+    return parse_bootstrap(data)
+
+
+def get_bootstrap() -> Dict[str, str]:
+    """Returns the bootstrap registry, loaded once per process."""
+    global _bootstrap
+    with _bootstrap_lock:
+        if _bootstrap is None:
+            _bootstrap = load_bootstrap()
+        return _bootstrap
+
+
+def rdap_endpoint(host: str) -> str:
+    """Returns the rate-limit endpoint of an RDAP server: its host if listed in config.RATE_LIMITS."""
+    return host if host in config.RATE_LIMITS else 'rdap'
+
+
+def parse_rdap_domain(domain: str, data: dict) -> RdapRecord:
+    """
+    Builds the record of a registered domain from an RDAP domain object. A
+    registration in its deletion grace periods gets the 'expiring' outcome,
+    which the result cache keeps only briefly.
+    """
+    status = tuple(str(value).lower() for value in data.get('status', []))
+    expiration = next((event.get('eventDate') for event in data.get('events', [])
+                       if event.get('eventAction') == 'expiration'), None)
+    outcome = 'expiring' if any(value in DROPPING_STATUSES for value in status) else 'taken'
+    return RdapRecord(domain, False, outcome, status, expiration)
+
+
+class _HTTPError(Exception):
+    """Raised for answers worth retrying (rate limiting, server errors)."""
+
+
+class AsyncRdapClient:
+    """
+    Minimal asyncio HTTP/1.1 RDAP client with a keep-alive connection pool
+    per server. Servers come from the bootstrap registry, overridden by
+    config.RDAP_SERVERS and the `servers` argument (TLD -> base URL).
+    """
+
+    def __init__(self, servers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                 retries: Optional[int] = None):
+        self.servers = dict(servers) if servers is not None else {**get_bootstrap(), **config.RDAP_SERVERS}
+        self.timeout = timeout or config.RDAP_TIMEOUT
+        self.retries = retries if retries is not None else config.RDAP_RETRIES
+        self._ssl = ssl.create_default_context()
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._semaphores:
+            limit = config.RDAP_SERVER_CONCURRENCY.get(host, config.RDAP_SERVER_CONCURRENCY['default'])
+            self._semaphores[host] = asyncio.Semaphore(limit)
+        return self._semaphores[host]
+
+    def server_for(self, domain: str) -> str:
+        """Returns the RDAP base URL for the domain's TLD."""
+        tld = '.' + domain.rsplit('.', 1)[-1].lower()
+        if tld not in self.servers:
+            raise LookupError(f"No RDAP server known for {tld}")
+        return self.servers[tld]
+
+    async def _connect(self, origin: Tuple[str, str, int]):
+        scheme, host, port = origin
+        return await asyncio.wait_for(asyncio.open_connection(
+            host, port, ssl=self._ssl if scheme == 'https' else None), self.timeout)
+
+    async def _exchange(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str,
+                        target: str) -> Tuple[int, Dict[str, str], bytes]:
+        """Sends one GET request and reads the response. Returns (status, headers, body)."""
+        writer.write(
+            f"GET {target} HTTP/1.1\r\nHost: {host}\r\nAccept: {RDAP_MEDIA_TYPE}, application/json\r\n"
+            f"User-Agent: {DEFAULT_HEADERS['User-Agent']}\r\nConnection: keep-alive\r\n\r\n".encode('ascii')
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError(f"{host} closed the connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if not size:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            headers['connection'] = 'close'
+        return status, headers, body
+
+    async def _get(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        """GETs a URL over a pooled connection, reconnecting once if an idle one went stale."""
+        parts = urlsplit(url)
+        origin = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        host = parts.netloc
+        async with self._semaphore(parts.hostname):
+            await asyncio.sleep(get_bucket(rdap_endpoint(parts.hostname)).reserve())
+            with timed('rdap', parts.hostname):
+                idle = self._idle.setdefault(origin, [])
+                while True:
+                    reused = bool(idle)
+                    reader, writer = idle.pop() if reused else await self._connect(origin)
+                    try:
+                        status, headers, body = await asyncio.wait_for(
+                            self._exchange(reader, writer, host, target), self.timeout)
+                    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                        writer.close()
+                        if reused:
+                            # The server closed the idle connection; not a failed attempt
+                            continue
+                        raise
+                    break
+                if headers.get('connection', '').lower() == 'close':
+                    writer.close()
+                else:
+                    idle.append((reader, writer))
+        return status, headers, body
+
+    async def lookup(self, domain: str) -> RdapRecord:
+        """Looks a domain up, following one redirect. Raises on errors worth retrying."""
+        url = urljoin(self.server_for(domain), f"domain/{domain.encode('idna').decode('ascii')}")
+        status, headers, body = await self._get(url)
+        if status in REDIRECT_STATUSES and headers.get('location'):
+            status, headers, body = await self._get(urljoin(url, headers['location']))
+        if status == 404:
+            return RdapRecord(domain, True, 'available')
+        if status != 200:
+            raise _HTTPError(f"RDAP server answered {status} for {domain}")
+        return parse_rdap_domain(domain, json.loads(body))
+
+    async def check_domain(self, domain: str) -> RdapRecord:
+        """
+        Checks a single domain with retries. Returns its record; the outcome
+        is 'error' when every attempt failed or the TLD has no RDAP server.
+        """
+        host = ''
+        for i in range(self.retries):
+            try:
+                host = urlsplit(self.server_for(domain)).hostname or ''
+                return await self.lookup(domain)
+            except LookupError:
+                break
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError, asyncio.TimeoutError,
+                    _HTTPError):
+                if i < self.retries - 1:
+                    RETRIES.labels('rdap', host).inc()
+                    await asyncio.sleep(backoff_delay(i))
+        # All retries failed, assume taken or problematic
+        ERRORS.labels('rdap', host).inc()
+        return RdapRecord(domain, False, 'error')
+
+    async def check_domains(self, domains: List[str], on_record: Optional[Callable] = None) -> List[RdapRecord]:
+        """
+        Checks many domains concurrently, bounded by the per-server pools.
+        `on_record` is called with every record as soon as it is known.
+        """
+        async def check(domain):
+            record = await self.check_domain(domain)
+            if on_record is not None:
+                on_record(record)
+            return record
+
+        try:
+            return await asyncio.gather(*[check(domain) for domain in domains])
+        finally:
+            self.close()
+
+    def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+def lookup_domains(domains: List[str], servers: Optional[Dict[str, str]] = None,
+                   on_record: Optional[Callable] = None) -> List[RdapRecord]:
+    """
+    Synchronous entry point: looks up a list of domains with a fresh client.
+    The expiration dates of registered domains are kept in the result cache
+    (check type 'expiration') for drop-timing decisions.
+
+    Args:
+        domains: A list of domain names.
+        servers: Optional TLD -> RDAP base URL map replacing the bootstrap registry, e.g. a local stub.
+        on_record: Optional callback receiving every record as it completes.
+
+    Returns:
+        A list of RdapRecord, in the order of `domains`. Every record has the
+        'error' outcome when the bootstrap registry cannot be loaded.
+    """
+    if not domains:
+        return []
+    try:
+        client = AsyncRdapClient(servers)
+    except LookupError as e:
+        # No bootstrap registry (offline, nothing cached): no server is known for any TLD
+        print(f"[ERROR] {e}")
+        ERRORS.labels('rdap', '').inc(len(domains))
+        records = [RdapRecord(domain, False, 'error') for domain in domains]
+        for record in records if on_record is not None else []:
+            on_record(record)
+        return records
+    records = asyncio.run(client.check_domains(list(domains), on_record))
+    cache = get_default_cache()
+    if cache is not None:
+        cache.set_many('expiration', [(record.domain, record.expiration_date, record.outcome)
+                                      for record in records if record.expiration_date])
+    return records
+
+
+def get_expiration_dates(domains: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Returns the RDAP expiration date of every domain (None for unregistered
+    ones), from the result cache where possible.
+    """
+    cache = get_default_cache()
+    known = cache.get_many('expiration', list(domains)) if cache is not None else {}
+    missing = [domain for domain in domains if domain not in known]
+    return {**known, **{record.domain: record.expiration_date for record in lookup_domains(missing)}}
+
+
+def check_domains_detailed(domains: List[str], servers: Optional[Dict[str, str]] = None,
+                           on_result: Optional[Callable] = None) -> List[Tuple[str, bool, str]]:
+    """
+    Checks a list of domains over RDAP. `on_result` receives every
+    (domain, is_available, outcome) result as it completes.
+
+    Returns:
+        A list of (domain, is_available, outcome) tuples.
+    """
+    on_record = None
+    if on_result is not None:
+        on_record = lambda record: on_result((record.domain, record.is_available, record.outcome))
+    return [(record.domain, record.is_available, record.outcome)
+            for record in lookup_domains(domains, servers, on_record)]
+
+
+def check_single_domain(domain: str) -> Tuple[str, bool]:
+    """
+    Drop-in replacement for availability.check_single_domain.
+    Returns the domain and a boolean indicating availability.
+    """
+    domain_name, is_available, _ = check_domains_detailed([domain])[0]
+    return domain_name, is_available
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    from ..utils.stub_servers import StubRDAPServer
+
+    registered = {'google.com': '2028-09-14T04:00:00Z', 'facebook.ai': '2027-03-29T04:00:00Z'}
+    test_domains = [
+        'google.com',
+        'thisisdefinitelyanavailabledomain12345.com',
+        'another-random-available-domain-xyz.io',
+        'facebook.ai',
+    ]
+    stub = StubRDAPServer(registered)
+    with stub as (host, port), tempfile.TemporaryDirectory() as tmp:
+        config.RDAP_BOOTSTRAP_URL = f"http://{host}:{port}/rdap/dns.json"
+        config.RDAP_BOOTSTRAP_FILE = os.path.join(tmp, 'rdap_dns.json')
+        config.RATE_LIMITS['rdap'] = (1000.0, 100)
+        config.CACHE_ENABLED = False
+        records = lookup_domains(test_domains * 25)[:len(test_domains)]
+        print(f"{stub.requests} RDAP lookups over {stub.connections} connections.")
+
+    print("\n--- Results ---")
+    for record in records:
+        expiry = f", expires {record.expiration_date}" if record.expiration_date else ''
+        print(f"[{'AVAILABLE' if record.is_available else 'TAKEN'}] {record.domain} ({record.outcome}{expiry})")
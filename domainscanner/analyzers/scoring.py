@@ -0,0 +1,298 @@
+# domainscanner/analyzers/scoring.py
+"""
+Offline scoring of candidate names, so the network checks see the best
+candidates first.
+
+Names are encoded into one (candidates x characters) array and the features
+are computed with NumPy over the whole batch at once:
+
+- length: shorter is better, up to config.MAX_DOMAIN_LENGTH;
+- words: how much of the name splits into known words (config.SCORING_WORDS_FILE,
+  the dictionary, the trend words and the suffixes), with few pieces;
+- pronounceable: likelihood under a letter bigram model trained on those
+  words, plus the longest consonant run ('tmvbichhao' scores low);
+- digits and hyphens: counted, and penalized;
+- tld: config.TLD_WEIGHTS.
+
+The score is the config.SCORING_WEIGHTS weighted sum of the features.
+"""
+
+import heapq
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .. import config
+from ..generators.engine import iter_words
+
+# Letter classes: 0 is the word boundary (and padding), then a-z, digits, hyphen
+_BOUNDARY, _DIGIT, _HYPHEN = 0, 27, 28
+_CLASSES = 29
+_CLASS_OF_BYTE = np.zeros(256, dtype=np.uint8)
+_CLASS_OF_BYTE[np.frombuffer(b'abcdefghijklmnopqrstuvwxyz', dtype=np.uint8)] = np.arange(1, 27)
+_CLASS_OF_BYTE[np.frombuffer(b'0123456789', dtype=np.uint8)] = _DIGIT
+_CLASS_OF_BYTE[ord('-')] = _HYPHEN
+_IS_CONSONANT = np.zeros(_CLASSES, dtype=bool)
+_IS_CONSONANT[[ord(c) - ord('a') + 1 for c in 'bcdfghjklmnpqrstvwxz']] = True
+
+# Consonant runs up to this length are normal in English ('str', 'ght')
+_NORMAL_CONSONANT_RUN = 3
+# Words shorter than this do not count towards the segmentation coverage
+_MIN_WORD_LENGTH = 2
+# Longer words are left out of the segmentation (12 letters of 5 bits fit in a 64-bit code)
+_MAX_WORD_LENGTH = 12
+
+FEATURES = ('length', 'words', 'pronounceable', 'digits', 'hyphens', 'tld')
+
+
+def split_domain(domain: str) -> Tuple[str, str]:
+    """Splits 'name.tld' into ('name', '.tld')."""
+    name, _, tld = domain.lower().partition('.')
+    return name, '.' + tld if tld else ''
+
+
+def encode_names(names: Sequence[str], width: Optional[int] = None) -> np.ndarray:
+    """Encodes names as a (len(names), width + 2) array of letter classes framed by boundaries."""
+    encoded = [name.encode('ascii', 'replace') for name in names]
+    width = width or max((len(name) for name in encoded), default=1)
+    raw = np.array(encoded, dtype=f'S{width}').view(np.uint8).reshape(len(encoded), width)
+    classes = np.zeros((len(encoded), width + 2), dtype=np.uint8)
+    classes[:, 1:-1] = _CLASS_OF_BYTE[raw]
+    return classes
+
+
+class NameScorer:
+    """
+    Scores domain names in batches. Building the scorer loads the word list
+    and trains the bigram model once; score() is then vectorized.
+    """
+
+    def __init__(self, words: Optional[Iterable[str]] = None, tld_weights: Optional[Dict[str, float]] = None,
+                 weights: Optional[Dict[str, float]] = None):
+        self.words = frozenset(word.lower() for word in (words if words is not None else load_vocabulary())
+                               if len(word) >= _MIN_WORD_LENGTH and word.isascii() and word.isalpha())
+        self.tld_weights = tld_weights or config.TLD_WEIGHTS
+        self.weights = weights or config.SCORING_WEIGHTS
+        self.bigram_log_probs = self._train_bigrams()
+        # Random letters score 0 on pronounceability, a typical word of the vocabulary 1
+        self._log_prob_floor = self.bigram_log_probs[1:27, 1:27].mean()
+        self._log_prob_ceiling = self._log_prob_floor + 1.0
+        if self.words:
+            self._log_prob_ceiling = max(self._log_prob_ceiling,
+                                         float(np.median(self._mean_log_probs(encode_names(sorted(self.words))))))
+        self._codes = self._word_codes()
+
+    def _train_bigrams(self) -> np.ndarray:
+        """Add-one smoothed log P(next letter class | letter class), boundaries included."""
+        counts = np.ones((_CLASSES, _CLASSES), dtype=np.float64)
+        if self.words:
+            classes = encode_names(sorted(self.words))
+            # Trailing padding is boundary after boundary; it carries no information
+            mask = ~((classes[:, :-1] == _BOUNDARY) & (classes[:, 1:] == _BOUNDARY))
+            np.add.at(counts, (classes[:, :-1][mask], classes[:, 1:][mask]), 1)
+        return np.log(counts / counts.sum(axis=1, keepdims=True))
+
+    def _mean_log_probs(self, classes: np.ndarray, lengths: Optional[np.ndarray] = None) -> np.ndarray:
+        """Mean bigram log-probability of encoded names, over the first letter up to the closing boundary."""
+        if lengths is None:
+            lengths = (classes[:, 1:-1] != _BOUNDARY).sum(axis=1)
+        transitions = np.arange(classes.shape[1] - 1)[np.newaxis, :] <= lengths[:, np.newaxis]
+        log_probs = self.bigram_log_probs[classes[:, :-1], classes[:, 1:]]
+        return (log_probs * transitions).sum(axis=1) / np.maximum(transitions.sum(axis=1), 1)
+
+    def _word_codes(self) -> Dict[int, np.ndarray]:
+        """Vocabulary words as exact integer codes (5 bits per letter), sorted, per word length."""
+        codes: Dict[int, List[int]] = {}
+        for word in self.words:
+            if len(word) <= _MAX_WORD_LENGTH:
+                code = 0
+                for letter in word.encode('ascii'):
+                    code = (code << 5) | int(_CLASS_OF_BYTE[letter])
+                codes.setdefault(len(word), []).append(code)
+        return {length: np.array(sorted(values), dtype=np.uint64) for length, values in codes.items()}
+
+    def _segment(self, letters: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        Splits every name into known words and unknown letters, minimizing
+        first the unknown letters and then the number of pieces. Returns the
+        share of each name covered by words, minus 0.1 for every piece after
+        the first.
+
+        The dynamic program runs over the letter positions, each step for the
+        whole batch; substrings are looked up by their integer code.
+        """
+        count, width = letters.shape
+        # matches[k][:, s]: the k letters starting at s form a known word
+        matches = {}
+        code = np.zeros((count, width), dtype=np.uint64)
+        for length in range(1, min(width, _MAX_WORD_LENGTH) + 1):
+            code = (code[:, :width - length + 1] << np.uint64(5)) | letters[:, length - 1:].astype(np.uint64)
+            if length >= _MIN_WORD_LENGTH and length in self._codes:
+                matches[length] = np.isin(code, self._codes[length])
+
+        # (uncovered letters, pieces) of the best split of the first e letters
+        uncovered = np.zeros((count, width + 1), dtype=np.int32)
+        pieces = np.zeros((count, width + 1), dtype=np.int32)
+        for end in range(1, width + 1):
+            best_uncovered = uncovered[:, end - 1] + 1
+            best_pieces = pieces[:, end - 1] + 1
+            for length, match in matches.items():
+                if length > end:
+                    continue
+                start = end - length
+                candidate_uncovered, candidate_pieces = uncovered[:, start], pieces[:, start] + 1
+                better = match[:, start] & ((candidate_uncovered < best_uncovered) |
+                                            ((candidate_uncovered == best_uncovered) &
+                                             (candidate_pieces < best_pieces)))
+                best_uncovered = np.where(better, candidate_uncovered, best_uncovered)
+                best_pieces = np.where(better, candidate_pieces, best_pieces)
+            uncovered[:, end] = best_uncovered
+            pieces[:, end] = best_pieces
+
+        rows = np.arange(count)
+        covered = (lengths - uncovered[rows, lengths]) / np.maximum(lengths, 1)
+        return np.maximum(0.0, covered - 0.1 * (pieces[rows, lengths] - 1))
+
+    def features(self, domains: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Computes every feature for a batch of domains; one array per feature, in [0, 1] or counts."""
+        names, tlds = zip(*(split_domain(domain) for domain in domains)) if domains else ((), ())
+        classes = encode_names(names)
+        letters = classes[:, 1:-1]
+        lengths = (letters != _BOUNDARY).sum(axis=1)
+
+        mean_log_prob = self._mean_log_probs(classes, lengths)
+        likelihood = (mean_log_prob - self._log_prob_floor) / (self._log_prob_ceiling - self._log_prob_floor)
+
+        # Longest consonant run, one column at a time over the whole batch
+        is_consonant = _IS_CONSONANT[letters]
+        run = np.zeros(len(names), dtype=np.int32)
+        longest_run = np.zeros(len(names), dtype=np.int32)
+        for column in is_consonant.T:
+            run = (run + 1) * column
+            np.maximum(longest_run, run, out=longest_run)
+        run_penalty = 0.25 * np.maximum(0, longest_run - _NORMAL_CONSONANT_RUN)
+
+        max_length = max(config.MAX_DOMAIN_LENGTH, 1)
+        return {
+            'length': np.clip(1.0 - (lengths - 4) / max_length, 0.0, 1.0),
+            'words': self._segment(letters, lengths),
+            'pronounceable': np.clip(likelihood, 0.0, 1.0) - run_penalty,
+            'digits': (letters == _DIGIT).sum(axis=1).astype(np.float64),
+            'hyphens': (letters == _HYPHEN).sum(axis=1).astype(np.float64),
+            'tld': np.fromiter((self.tld_weights.get(tld, self.tld_weights['default']) for tld in tlds),
+                               dtype=np.float64, count=len(tlds)),
+        }
+
+    def score(self, domains: Sequence[str]) -> np.ndarray:
+        """Returns the score of every domain, higher is better."""
+        features = self.features(domains)
+        total = np.zeros(len(domains), dtype=np.float64)
+        for feature in FEATURES:
+            total += self.weights.get(feature, 0.0) * features[feature]
+        return total
+
+    def rank(self, domains: Sequence[str], top_k: Optional[int] = None,
+             min_score: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Returns (domain, score) pairs, best first, optionally limited to the
+        `top_k` best and to scores of at least `min_score`. Ties keep the input order.
+        """
+        domains = list(domains)
+        scores = self.score(domains)
+        order = np.argsort(-scores, kind='stable')
+        if min_score is not None:
+            order = order[scores[order] >= min_score]
+        if top_k is not None:
+            order = order[:top_k]
+        return [(domains[index], float(scores[index])) for index in order]
+
+
+def load_vocabulary() -> List[str]:
+    """The words names are segmented into: the word list, the dictionary, the trend words and the suffixes."""
+    words = list(config.DOMAIN_SUFFIXES)
+    for path in (config.SCORING_WORDS_FILE, config.DICTIONARY_FILE, config.TREND_KEYWORDS_FILE):
+        if path and os.path.exists(path):
+            words.extend(iter_words(path))
+    return words
+
+
+_default_scorer = None
+
+
+def get_default_scorer() -> NameScorer:
+    """Returns the scorer built from config, created on first use."""
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = NameScorer()
+    return _default_scorer
+
+
+def rank_domains(domains: Sequence[str], top_k: Optional[int] = None, min_score: Optional[float] = None,
+                 show_progress: bool = True) -> List[str]:
+    """
+    Orders domains best first. Only the `top_k` best, and only those scoring
+    at least `min_score`, are kept (config.SCORING_TOP_K / SCORING_MIN_SCORE by default).
+    """
+    top_k = top_k if top_k is not None else config.SCORING_TOP_K
+    min_score = min_score if min_score is not None else config.SCORING_MIN_SCORE
+    ranked = get_default_scorer().rank(domains, top_k, min_score)
+    if show_progress and len(ranked) < len(domains):
+        print(f"Scoring: kept the {len(ranked)} best of {len(domains)} candidates.")
+    return [domain for domain, _ in ranked]
+
+
+def iter_prioritized(domains: Iterable[str], top_k: Optional[int] = None, min_score: Optional[float] = None,
+                     chunk_size: Optional[int] = None) -> Iterator[str]:
+    """
+    Streaming version of rank_domains. Candidates are scored in chunks of
+    config.SCORING_CHUNK_SIZE and each chunk is yielded best first, so
+    memory stays bounded. With a top-K budget the whole stream is consumed
+    first, keeping only the K best seen so far, and those are yielded best first.
+    """
+    top_k = top_k if top_k is not None else config.SCORING_TOP_K
+    min_score = min_score if min_score is not None else config.SCORING_MIN_SCORE
+    chunk_size = chunk_size or config.SCORING_CHUNK_SIZE
+    scorer = get_default_scorer()
+    best: List[Tuple[float, int, str]] = []  # Min-heap of the top K as (score, -position, domain)
+    position = 0
+    chunk = []
+    iterator = iter(domains)
+    while True:
+        chunk.clear()
+        for domain in iterator:
+            chunk.append(domain)
+            if len(chunk) >= chunk_size:
+                break
+        if not chunk:
+            break
+        ranked = scorer.rank(chunk, top_k, min_score)
+        if top_k is None:
+            for domain, _ in ranked:
+                yield domain
+            continue
+        for domain, score in ranked:
+            entry = (score, -position, domain)
+            position += 1
+            if len(best) < top_k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+            else:
+                # The chunk is sorted, so nothing after this one makes it either
+                break
+    for _, _, domain in sorted(best, reverse=True):
+        yield domain
+
+
+if __name__ == '__main__':
+    test_domains = [
+        'tmvbichhao.com', 'cloudlabs.io', 'greenfuture.com', 'x7-k9q.net', 'focus.ai', 'brightvision.com',
+        'qzxjwv.com', 'smart-home-24.com', 'kalomi.io',
+    ]
+    scorer = get_default_scorer()
+    features = scorer.features(test_domains)
+    print(f"{'domain':<20}{'score':>8}  " + ''.join(f"{feature:>14}" for feature in FEATURES))
+    for domain, score in scorer.rank(test_domains):
+        index = test_domains.index(domain)
+        print(f"{domain:<20}{score:>8.2f}  " + ''.join(f"{features[f][index]:>14.2f}" for f in FEATURES))
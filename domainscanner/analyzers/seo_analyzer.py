@@ -1,29 +1,114 @@
 # src/analyzers/seo_analyzer.py
 import sys
 import os
-from typing import List, Tuple
+from typing import Callable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
 import random
 
+import requests
+
 from .. import config
+from ..utils.http import get_session
+from ..utils.metrics import timed
+from ..utils.rate_limit import RetryableError, run_rate_limited
+
+# Outcome of a scored domain in the result cache (selects its TTL)
+SCORED = 'scored'
+
+
+def seo_endpoint() -> str:
+    """The rate limit endpoint of the SEO metrics API."""
+    return urlparse(config.SEO_API_URL).hostname or 'default'
+
+
+def has_seo_credentials() -> bool:
+    return bool(config.MOZ_ACCESS_ID and config.MOZ_SECRET_KEY)
+
+
+def simulate_seo_score(domain: str) -> int:
+    """
+    Deterministic stand-in for a real Domain Authority: the same domain and
+    config.SEO_SIMULATION_SEED always give the same score.
+    """
+    return random.Random(f"{config.SEO_SIMULATION_SEED}:{domain.lower()}").randint(5, 40)
+
+
+def fetch_seo_batch_once(domains: Sequence[str]) -> List[Tuple[str, int, str]]:
+    """
+    Fetches the Domain Authority of up to config.SEO_BATCH_SIZE domains with a
+    single Moz-style bulk request. Returns (domain, score, outcome) tuples in
+    the order of `domains`. Raises RetryableError on failure.
+    """
+    try:
+        with timed('seo', seo_endpoint()):
+            response = get_session().post(
+                config.SEO_API_URL, json={'targets': list(domains)},
+                auth=(config.MOZ_ACCESS_ID, config.MOZ_SECRET_KEY), timeout=config.HTTP_TIMEOUT,
+            )
+            response.raise_for_status()
+            results = response.json()['results']
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        raise RetryableError(f"SEO metrics request for {len(domains)} domains failed: {e}") from e
+    if len(results) != len(domains):
+        raise RetryableError(f"SEO metrics API returned {len(results)} results for {len(domains)} domains")
+    return [
+        (domain, int(round(result.get('domain_authority') or 0)), SCORED)
+        for domain, result in zip(domains, results)
+    ]
+
+
+def fetch_seo_batch_give_up(domains: Sequence[str]) -> List[Tuple[str, int, str]]:
+    """Result used when every attempt of a batch failed: score 0, so it is never picked."""
+    return [(domain, 0, 'error') for domain in domains]
+
+
+def fetch_seo_scores(domains: List[str], show_progress: bool = True,
+                     on_result: Optional[Callable] = None) -> List[Tuple[str, int, str]]:
+    """
+    Scores many domains, config.SEO_BATCH_SIZE per request, throttled by the
+    API's token bucket. Without Moz credentials the scores are simulated.
+
+    Args:
+        domains: A list of domain names.
+        show_progress: Whether to show a progress bar.
+        on_result: Optional callback invoked with every (domain, score, outcome) result.
+
+    Returns:
+        A list of (domain, score, outcome) tuples.
+    """
+    if not has_seo_credentials():
+        results = [(domain, simulate_seo_score(domain), SCORED) for domain in domains]
+        for result in results if on_result is not None else []:
+            on_result(result)
+        return results
+
+    size = config.SEO_BATCH_SIZE
+    batches = [tuple(domains[i:i + size]) for i in range(0, len(domains), size)]
+
+    def on_batch(batch_results):
+        for result in batch_results:
+            on_result(result)
+
+    batch_results = run_rate_limited(
+        fetch_seo_batch_once, batches, lambda batch: seo_endpoint(), fetch_seo_batch_give_up,
+        "Checking SEO", show_progress=show_progress,
+        on_result=on_batch if on_result is not None else None, stage='seo',
+    )
+    return [result for results in batch_results for result in results]
+
 
 def get_single_domain_seo(domain: str) -> Tuple[str, int]:
     """
-    Simulates fetching SEO metrics for a single domain.
-    Returns the domain and its score.
+    Fetches SEO metrics for a single domain (simulated without Moz credentials).
+    Returns the domain and its score. Prefer fetch_seo_scores for many domains.
     """
-    if not config.MOZ_ACCESS_ID or not config.MOZ_SECRET_KEY:
-        # Simulate a score for demonstration purposes
-        score = random.randint(5, 40) 
-    else:
-        # TODO: Implement actual API call to Mozscape API
-        score = random.randint(5, 40) # Still using random for now
-    
+    _, score, _ = fetch_seo_scores([domain], show_progress=False)[0]
     return domain, score
 
 def get_seo_metrics(domains: List[str]) -> dict:
     """
     DEPRECATED: This function is kept for compatibility but the main logic
-    should use get_single_domain_seo with a ThreadPoolExecutor.
+    should use fetch_seo_scores, which sends the domains in bulk.
     """
     print("\n--- Checking SEO Metrics (Simulation) ---")
     if not config.MOZ_ACCESS_ID or not config.MOZ_SECRET_KEY:
@@ -31,18 +116,26 @@ def get_seo_metrics(domains: List[str]) -> dict:
         print("To get real data, sign up for a free Moz API key and add it to the config.")
     
     seo_scores = {}
-    for domain in domains:
-        domain_name, score = get_single_domain_seo(domain)
+    for domain_name, score, _ in fetch_seo_scores(domains, show_progress=False):
         print(f"[SEO SCORE] {domain_name}: DA = {score}")
         seo_scores[domain_name] = score
         
     return seo_scores
 
 if __name__ == '__main__':
+    from ..utils.stub_servers import StubSEOServer
+
     test_domains = [
         'expired-domain-with-history.com',
         'another-good-one.net',
         'formerly-a-blog.org'
     ]
     
-    get_seo_metrics(test_domains) 
\ No newline at end of file
+    get_seo_metrics(test_domains)
+
+    print("\n--- Checking SEO Metrics (local stub API) ---")
+    with StubSEOServer({'another-good-one.net': 35}) as (host, port):
+        config.SEO_API_URL = f"http://{host}:{port}/v2/url_metrics"
+        config.MOZ_ACCESS_ID, config.MOZ_SECRET_KEY = 'stub-id', 'stub-secret'
+        for domain, score, outcome in fetch_seo_scores(test_domains, show_progress=False):
+            print(f"[SEO SCORE] {domain}: DA = {score} ({outcome})") 
\ No newline at end of file
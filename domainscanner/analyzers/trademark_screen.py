@@ -0,0 +1,459 @@
+# domainscanner/analyzers/trademark_screen.py
+"""
+Trademark and blocklist screening of candidate names, before any network
+check, so flagged names never use WHOIS or marketplace quota.
+
+The terms of config.SCREENING_LISTS are compiled into one Aho-Corasick
+automaton that finds every term inside a name in a single pass. Terms of
+config.SCREENING_FUZZY_MIN_LENGTH letters or more also match with one typo
+(a dropped, swapped or doubled letter), and both terms and names are folded
+so look-alike digits match letters ('g00gle'). Terms shorter than
+config.SCREENING_MIN_SUBSTRING_LENGTH only match a whole name, or a
+boundary if their list is one of config.SCREENING_BOUNDARY_LISTS ('xxxlabs').
+
+Exact terms match anywhere in a name, except the terms of
+config.SCREENING_BOUNDARY_LISTS, which must start or end at a boundary: the
+start or end of the name or of a hyphen-separated part ('casinoroyal',
+'best-casino', but not 'specialist' for 'cialis'). Typos must start at a
+boundary, so a dropped letter never makes a term match inside a word
+('credit' is not 'reddit'). No match counts inside a longer word of
+config.SCREENING_ALLOWED_WORDS_FILE ('pineapple' is not 'apple').
+
+The automaton is cached in config.SCREENING_CACHE_FILE and rebuilt only
+when the lists or settings change. Layout (little endian):
+    header    magic, fingerprint of the lists and settings, node count, edge count, term table length
+    offsets   (node count + 1) x uint32, the first edge of every node; edges are sorted by node and letter
+    targets   edge count x uint32, the child of every edge
+    letters   edge count x uint8, the letter of every edge
+    fail      node count x uint32, the failure link of every node
+    match     node count x int32, term id * 2 + is_typo of the term found at a node, or -1
+    codes     node count x int32, the same for the pattern ending exactly at a node only
+    depths    node count x uint16, the length of the pattern ending at a node
+    terms     JSON: the terms by id, the whole-name terms and the allowed words
+
+Scanning runs over a whole batch of names at once: every step advances all
+names by one letter with vectorized edge lookups. Matches that must sit at
+a boundary are then confirmed one name at a time, walking every pattern
+found along the failure links.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .. import config
+from ..generators.engine import iter_words
+
+MAGIC = b'DSSCRN3\x00'
+_HEADER = struct.Struct('<8s32sQQQ')
+_ROOT = 0
+_LETTERS = 27  # 1-26 are a-z; 27 is anything else and has no edges
+# Bisection steps that find any letter among the edges of a node
+_SEARCH_STEPS = (_LETTERS + 1).bit_length()
+
+# Look-alike digits folded into letters, in terms and names alike
+_FOLD = str.maketrans('0123456789', 'olzeasbtbg')
+_NOT_ALNUM = re.compile('[^a-z0-9]+')
+_SYMBOL_OF_BYTE = np.full(256, _LETTERS, dtype=np.uint8)
+_SYMBOL_OF_BYTE[np.frombuffer(b'abcdefghijklmnopqrstuvwxyz', dtype=np.uint8)] = np.arange(1, 27)
+
+
+def fold(text: str) -> str:
+    """Lowercases, keeps letters and digits, and folds look-alikes ('PayPa1' -> 'paypal')."""
+    return _NOT_ALNUM.sub('', text.lower()).translate(_FOLD)
+
+
+def fold_parts(label: str) -> Tuple[str, frozenset]:
+    """Folds a name like fold() and returns it with its boundaries: the start and end of every hyphen-separated part."""
+    boundaries = {0}
+    folded = ''
+    for part in _NOT_ALNUM.split(label.lower()):
+        if part:
+            folded += part.translate(_FOLD)
+            boundaries.add(len(folded))
+    return folded, frozenset(boundaries)
+
+
+def iter_typos(term: str) -> Iterator[str]:
+    """
+    Yields the one-typo variants of a term: every dropped, swapped and doubled
+    letter. Dropping the first or last letter leaves a part of the term, not a typo.
+    """
+    for i in range(len(term)):
+        if 0 < i < len(term) - 1:
+            yield term[:i] + term[i + 1:]
+        yield term[:i + 1] + term[i:]
+        if i + 1 < len(term) and term[i] != term[i + 1]:
+            yield term[:i] + term[i + 1] + term[i] + term[i + 2:]
+
+
+def lists_fingerprint(lists: Dict[str, str]) -> bytes:
+    """Hash of the list contents and the settings the automaton depends on."""
+    digest = hashlib.sha256(repr((sorted(lists.items()), config.SCREENING_MIN_SUBSTRING_LENGTH,
+                                  config.SCREENING_FUZZY_MIN_LENGTH, sorted(config.SCREENING_BOUNDARY_LISTS),
+                                  config.SCREENING_ALLOWED_WORDS_FILE)).encode('utf-8'))
+    for path in [path for _, path in sorted(lists.items())] + [config.SCREENING_ALLOWED_WORDS_FILE]:
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.digest()
+
+
+def _collect_terms(lists: Dict[str, str]):
+    """Reads the lists into the term table, the substring patterns and the whole-name terms."""
+    terms: List[Tuple[str, str]] = []
+    patterns: Dict[str, int] = {}
+    whole: Dict[str, int] = {}
+    typos: Dict[str, int] = {}
+    for list_name, path in sorted(lists.items()):
+        if not os.path.exists(path):
+            print(f"[WARNING] Screening list {path} not found.")
+            continue
+        for term in iter_words(path):
+            folded = fold(term)
+            if not folded:
+                continue
+            code = len(terms) * 2
+            terms.append((list_name, term))
+            if len(folded) < config.SCREENING_MIN_SUBSTRING_LENGTH:
+                # Short terms that must sit at a boundary are safe to look for inside names
+                if list_name in config.SCREENING_BOUNDARY_LISTS:
+                    patterns.setdefault(folded, code)
+                else:
+                    whole.setdefault(folded, code)
+                continue
+            patterns.setdefault(folded, code)
+            if len(folded) >= config.SCREENING_FUZZY_MIN_LENGTH:
+                for typo in iter_typos(folded):
+                    if len(typo) >= config.SCREENING_MIN_SUBSTRING_LENGTH:
+                        typos.setdefault(typo, code + 1)
+    # An exact term wins over the typo of another one
+    for typo, code in typos.items():
+        patterns.setdefault(typo, code)
+    return terms, patterns, whole
+
+
+def _collect_allowed(patterns: Dict[str, int]) -> List[str]:
+    """Reads the allowed words that contain a term, so the others need not be kept."""
+    path = config.SCREENING_ALLOWED_WORDS_FILE
+    if not path or not os.path.exists(path):
+        return []
+    exact = [pattern for pattern, code in patterns.items() if not code & 1]
+    allowed = set()
+    for word in iter_words(path):
+        folded = fold(word)
+        if any(pattern in folded and pattern != folded for pattern in exact):
+            allowed.add(folded)
+    return sorted(allowed)
+
+
+def _goto(offsets: np.ndarray, letters: np.ndarray, targets: np.ndarray, states: np.ndarray,
+          symbols: np.ndarray):
+    """Looks up the edges (state, symbol) by bisecting the edges of every state. Returns (children, found)."""
+    if not len(letters):
+        # Every term is a whole-name term: the trie has no edges
+        return np.zeros(len(states), dtype=np.uint32), np.zeros(len(states), dtype=bool)
+    low = offsets[states].astype(np.int64)
+    end = offsets[states + 1].astype(np.int64)
+    high = end.copy()
+    for _ in range(_SEARCH_STEPS):
+        searching = low < high
+        middle = (low + high) >> 1
+        before = letters[np.minimum(middle, len(letters) - 1)] < symbols
+        low = np.where(searching & before, middle + 1, low)
+        high = np.where(searching & ~before, middle, high)
+    index = np.minimum(low, len(letters) - 1)
+    found = low < end
+    if not found.any():
+        return np.zeros(len(states), dtype=np.uint32), found
+    found &= letters[index] == symbols
+    return targets[index], found
+
+
+def _step(offsets, letters, targets, fail, states: np.ndarray, symbols: np.ndarray) -> np.ndarray:
+    """Advances every state by one symbol, following failure links where there is no edge."""
+    states = states.copy()
+    result = np.zeros(len(states), dtype=np.uint32)
+    pending = np.arange(len(states))
+    while pending.size:
+        children, found = _goto(offsets, letters, targets, states[pending], symbols[pending])
+        result[pending[found]] = children[found]
+        missing = pending[~found]
+        # Missing at the root means starting over with the next letter
+        missing = missing[states[missing] != _ROOT]
+        states[missing] = fail[states[missing]]
+        pending = missing
+    return result
+
+
+def build_screen(lists: Optional[Dict[str, str]] = None, path: Optional[str] = None) -> int:
+    """
+    Compiles the screening lists into the automaton file.
+
+    Returns:
+        The number of terms compiled.
+    """
+    lists = lists if lists is not None else config.SCREENING_LISTS
+    path = path or config.SCREENING_CACHE_FILE
+    terms, patterns, whole = _collect_terms(lists)
+
+    # The trie: sorted patterns share the nodes of their common prefixes
+    parents, symbols, depths = array('I', [0]), array('B', [0]), array('H', [0])
+    codes = array('i', [-1])
+    node_path = [_ROOT]
+    previous = ''
+    for pattern in sorted(patterns):
+        common = 0
+        while common < min(len(previous), len(pattern)) and previous[common] == pattern[common]:
+            common += 1
+        del node_path[common + 1:]
+        for char in pattern[common:]:
+            parents.append(node_path[-1])
+            symbols.append(ord(char) - ord('a') + 1)
+            depths.append(min(len(node_path), 0xFFFF))
+            codes.append(-1)
+            node_path.append(len(parents) - 1)
+        codes[node_path[-1]] = patterns[pattern]
+        previous = pattern
+
+    parents = np.frombuffer(parents, dtype=np.uint32)
+    symbols = np.frombuffer(symbols, dtype=np.uint8)
+    depths = np.frombuffer(depths, dtype=np.uint16)
+    codes = np.frombuffer(codes, dtype=np.int32)
+    count = len(parents)
+    order = np.lexsort((symbols[1:], parents[1:]))
+    offsets = np.searchsorted(parents[1:][order], np.arange(count + 1)).astype(np.uint32)
+    targets = (order + 1).astype(np.uint32)
+    letters = symbols[1:][order]
+
+    # Failure links and inherited matches, level by level (breadth first)
+    fail = np.zeros(count, dtype=np.uint32)
+    match = codes.copy()
+    for depth in range(1, int(depths.max(initial=0)) + 1):
+        nodes = np.nonzero(depths == depth)[0]
+        if depth > 1:
+            fail[nodes] = _step(offsets, letters, targets, fail, fail[parents[nodes]], symbols[nodes])
+        inherited = match[fail[nodes]]
+        match[nodes] = np.where(match[nodes] >= 0, match[nodes], inherited)
+
+    table = json.dumps({'terms': terms, 'whole': whole, 'allowed': _collect_allowed(patterns)}).encode('utf-8')
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as out:
+        out.write(_HEADER.pack(MAGIC, lists_fingerprint(lists), count, len(targets), len(table)))
+        for block in (offsets, targets, letters, fail, match, codes, depths):
+            out.write(np.ascontiguousarray(block).tobytes())
+            # Keeps every array 8-byte aligned for the memory-mapped reader
+            out.write(b'\x00' * (-block.nbytes % 8))
+        out.write(table)
+    os.replace(temporary, path)
+    return len(terms)
+
+
+class ScreeningAutomaton:
+    """Read-only, memory-mapped view of an automaton built by build_screen."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size or self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a screening automaton")
+        magic, self.fingerprint, count, edges, table_length = _HEADER.unpack_from(self._mmap, 0)
+        offset = _HEADER.size
+        arrays = []
+        for dtype, length in ((np.uint32, count + 1), (np.uint32, edges), (np.uint8, edges),
+                              (np.uint32, count), (np.int32, count), (np.int32, count), (np.uint16, count)):
+            arrays.append(np.frombuffer(self._mmap, dtype=dtype, count=length, offset=offset))
+            offset += length * np.dtype(dtype).itemsize
+            offset += -offset % 8
+        self._offsets, self._targets, self._letters, self._fail, self._match, self._codes, self._depths = arrays
+        table = json.loads(self._mmap[offset:offset + table_length])
+        self.terms = [tuple(term) for term in table['terms']]
+        self._whole = table['whole']
+        self._allowed_words = frozenset(table.get('allowed', []))
+        self._allowed_length = max(map(len, self._allowed_words), default=0)
+        self._bounded = np.array([list_name in config.SCREENING_BOUNDARY_LISTS for list_name, _ in self.terms],
+                                 dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def scan(self, domains: Sequence[str]) -> np.ndarray:
+        """Returns, for every domain, term id * 2 + is_typo of a term found in its name, or -1."""
+        labels = [domain.split('.')[0] for domain in domains]
+        names = [fold(label) for label in labels]
+        result = np.full(len(names), -1, dtype=np.int32)
+        if not names:
+            return result
+        encoded = [name.encode('ascii') for name in names]
+        width = max(1, max(len(name) for name in encoded))
+        raw = np.array(encoded, dtype=f'S{width}').view(np.uint8).reshape(len(encoded), width)
+        symbols = _SYMBOL_OF_BYTE[raw]
+        lengths = np.fromiter((len(name) for name in encoded), dtype=np.int32, count=len(encoded))
+        states = np.zeros(len(names), dtype=np.uint32)
+        for column in range(width):
+            active = np.nonzero((lengths > column) & (result < 0))[0]
+            if not active.size:
+                break
+            states[active] = _step(self._offsets, self._letters, self._targets, self._fail, states[active],
+                                   symbols[active, column])
+            found = self._match[states[active]]
+            result[active] = np.where(found >= 0, found, result[active])
+        # Matches that must sit at a boundary, or may sit inside an allowed word, are
+        # confirmed (or replaced by another match) name by name
+        hits = np.nonzero(result >= 0)[0]
+        if hits.size:
+            codes = result[hits]
+            restricted = hits
+            if not self._allowed_words:
+                restricted = hits[(codes & 1).astype(bool) | self._bounded[codes >> 1]]
+            for index in restricted.tolist():
+                result[index] = self._first_valid_match(labels[index])
+        if self._whole:
+            for index in np.nonzero(result < 0)[0]:
+                result[index] = self._whole.get(names[index], -1)
+        return result
+
+    def _allowed(self, code: int, name: str, start: int, end: int, boundaries: frozenset) -> bool:
+        if code & 1:
+            if start not in boundaries:
+                return False
+        elif self._bounded[code >> 1] and start not in boundaries and end not in boundaries:
+            return False
+        return not self._inside_allowed_word(name, start, end, boundaries)
+
+    def _inside_allowed_word(self, name: str, start: int, end: int, boundaries: frozenset) -> bool:
+        """Whether name[start:end] lies inside a longer allowed word that does not cross a hyphen."""
+        for word_start in range(max(0, end - self._allowed_length), start + 1):
+            if any(word_start < boundary <= start for boundary in boundaries):
+                continue
+            for word_end in range(end, min(len(name), word_start + self._allowed_length) + 1):
+                if any(end <= boundary < word_end for boundary in boundaries):
+                    break
+                if word_end - word_start > end - start and name[word_start:word_end] in self._allowed_words:
+                    return True
+        return False
+
+    def _first_valid_match(self, label: str) -> int:
+        """Scans one name, checking every pattern found against the boundary rules. Returns the first valid code, or -1."""
+        name, boundaries = fold_parts(label)
+        state = _ROOT
+        for position, char in enumerate(name.encode('ascii'), 1):
+            symbol = _SYMBOL_OF_BYTE[char:char + 1]
+            state = int(_step(self._offsets, self._letters, self._targets, self._fail,
+                              np.array([state], dtype=np.uint32), symbol)[0])
+            # Every pattern ending here: the node itself and the nodes along its failure links
+            node = state
+            while node != _ROOT:
+                code = int(self._codes[node])
+                if code >= 0 and self._allowed(code, name, position - int(self._depths[node]), position, boundaries):
+                    return code
+                node = int(self._fail[node])
+        return -1
+
+    def describe(self, code: int) -> str:
+        """Describes a scan result, e.g. 'trademark: Google (typo)'."""
+        list_name, term = self.terms[code >> 1]
+        return f"{list_name}: {term}{' (typo)' if code & 1 else ''}"
+
+    def screen(self, domains: Sequence[str]) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """
+        Splits domains into flagged and clean ones, in chunks of config.SCREENING_CHUNK_SIZE.
+
+        Returns:
+            A tuple of ([(flagged_domain, reason)], clean_domains).
+        """
+        flagged, clean = [], []
+        size = config.SCREENING_CHUNK_SIZE
+        for start in range(0, len(domains), size):
+            chunk = domains[start:start + size]
+            for domain, code in zip(chunk, self.scan(chunk).tolist()):
+                if code >= 0:
+                    flagged.append((domain, self.describe(code)))
+                else:
+                    clean.append(domain)
+        return flagged, clean
+
+    def close(self):
+        self._offsets = self._targets = self._letters = self._fail = self._match = None
+        self._codes = self._depths = None
+        self._mmap.close()
+        self._file.close()
+
+
+_screen = None
+
+
+def get_screen() -> Optional[ScreeningAutomaton]:
+    """
+    Returns the automaton of config.SCREENING_LISTS, compiling it first if
+    the cache is missing or stale. None if no list exists.
+    """
+    global _screen
+    if _screen is not None:
+        return _screen
+    lists = {name: path for name, path in config.SCREENING_LISTS.items() if os.path.exists(path)}
+    if not lists:
+        return None
+    path = config.SCREENING_CACHE_FILE
+    if os.path.exists(path):
+        try:
+            screen = ScreeningAutomaton(path)
+        except ValueError:
+            # Written by another version of the file format; rebuilt below
+            screen = None
+        if screen is not None and screen.fingerprint == lists_fingerprint(lists):
+            _screen = screen
+            return _screen
+        if screen is not None:
+            screen.close()
+    print(f"Compiling the screening lists into {path}...")
+    build_screen(lists, path)
+    _screen = ScreeningAutomaton(path)
+    return _screen
+
+
+def split_by_screening(domains: List[str]) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Splits domains into the ones matching a trademark or blocklist term and
+    the ones that may go on to the availability checks.
+
+    Returns:
+        A tuple of ([(flagged_domain, reason)], domains_to_check).
+    """
+    screen = get_screen() if config.SCREENING_ENABLED else None
+    if screen is None or not domains:
+        return [], list(domains)
+    return screen.screen(list(domains))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile the screening lists or screen names.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('build', help="Compile config.SCREENING_LISTS into config.SCREENING_CACHE_FILE.")
+    check = subparsers.add_parser('check', help="Screen domain names.")
+    check.add_argument('domains', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        total = build_screen()
+        print(f"[SUCCESS] Compiled {total} terms into {config.SCREENING_CACHE_FILE}")
+    else:
+        screen = get_screen()
+        if screen is None:
+            raise SystemExit("No screening list found, see config.SCREENING_LISTS.")
+        for domain, code in zip(args.domains, screen.scan(args.domains).tolist()):
+            print(f"[FLAGGED] {domain} ({screen.describe(code)})" if code >= 0 else f"[CLEAN] {domain}")
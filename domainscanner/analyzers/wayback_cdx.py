@@ -0,0 +1,105 @@
+# domainscanner/analyzers/wayback_cdx.py
+
+from typing import List, Optional, Tuple
+
+import requests
+
+from .. import config
+from ..utils.http import get_session
+from ..utils.metrics import timed
+from ..utils.rate_limit import RetryableError, run_rate_limited
+from .metrics import HISTORY_ENDPOINT
+
+
+def _format_timestamp(timestamp: str) -> str:
+    """Turns a CDX timestamp (YYYYMMDDhhmmss) into YYYY-MM-DD."""
+    return f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
+
+
+def fetch_history_once(domain: str, cdx_url: Optional[str] = None) -> Tuple[str, dict, str]:
+    """
+    Performs a single CDX query for a domain over the shared keep-alive session.
+
+    Captures are collapsed to one per day and capped at config.CDX_MAX_ROWS,
+    so very busy sites report at least that many snapshots.
+
+    Returns:
+        The domain, a dict with snapshot_count, first_capture and last_capture,
+        and the outcome used by the result cache ('taken' if it has history,
+        'available' if it is clean). Raises RetryableError on failure.
+    """
+    params = {
+        'url': domain,
+        'output': 'json',
+        'fl': 'timestamp',
+        'filter': 'statuscode:200',
+        'collapse': 'timestamp:8',
+        'limit': config.CDX_MAX_ROWS,
+    }
+    try:
+        with timed('history', HISTORY_ENDPOINT):
+            response = get_session().get(cdx_url or config.WAYBACK_CDX_URL, params=params,
+                                         timeout=config.HTTP_TIMEOUT)
+            response.raise_for_status()
+            rows = response.json() if response.content.strip() else []
+    except (requests.exceptions.RequestException, ValueError) as e:
+        raise RetryableError(f"CDX lookup for {domain} failed: {e}") from e
+
+    # The first row is the field header
+    timestamps = [row[0] for row in rows[1:]]
+    history = {
+        'snapshot_count': len(timestamps),
+        'first_capture': _format_timestamp(timestamps[0]) if timestamps else None,
+        'last_capture': _format_timestamp(timestamps[-1]) if timestamps else None,
+    }
+    return domain, history, 'taken' if timestamps else 'available'
+
+
+def fetch_history_give_up(domain: str) -> Tuple[str, Optional[dict], str]:
+    """Result used when every attempt failed; None means the history is unknown."""
+    return domain, None, 'error'
+
+
+def has_history(history: Optional[dict]) -> bool:
+    """Unknown history counts as history, to be safe."""
+    return history is None or history['snapshot_count'] > 0
+
+
+def fetch_histories(domains: List[str], cdx_url: Optional[str] = None,
+                    show_progress: bool = True, on_result=None) -> List[Tuple[str, Optional[dict], str]]:
+    """
+    Fetches the CDX history of a batch of domains.
+
+    The CDX API takes one URL per query, so a batch is spread over the
+    pooled keep-alive connections and throttled by the archive.org bucket.
+
+    Args:
+        domains: A list of domain names.
+        cdx_url: Optional CDX endpoint, e.g. a local stub.
+        show_progress: Whether to show a progress bar.
+        on_result: Optional callback invoked with every result as soon as it is final.
+
+    Returns:
+        A list of (domain, history, outcome) tuples.
+    """
+    return run_rate_limited(
+        lambda domain: fetch_history_once(domain, cdx_url), domains,
+        lambda domain: HISTORY_ENDPOINT, fetch_history_give_up, "Checking History (CDX)",
+        show_progress=show_progress, on_result=on_result, stage='history',
+    )
+
+
+if __name__ == '__main__':
+    from ..utils.stub_servers import StubWaybackServer
+
+    histories = {
+        'google.com': ['19981111184551', '20240101000000'],
+        'github.com': ['20080301000000'],
+    }
+    test_domains = ['google.com', 'this-domain-surely-has-no-history-12345.com', 'github.com']
+    with StubWaybackServer(histories) as (host, port):
+        results = fetch_histories(test_domains, f"http://{host}:{port}/cdx/search/cdx")
+
+    print("\n--- History Results ---")
+    for domain, history, outcome in results:
+        print(f"[{'HISTORY FOUND' if has_history(history) else 'CLEAN HISTORY'}] {domain}: {history}")
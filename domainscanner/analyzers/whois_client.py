@@ -0,0 +1,193 @@
+# domainscanner/analyzers/whois_client.py
+
+import asyncio
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .. import config
+from ..utils.metrics import ERRORS, RETRIES, timed
+from ..utils.rate_limit import backoff_delay, get_bucket
+
+IANA_WHOIS_SERVER = 'whois.iana.org'
+WHOIS_PORT = 43
+
+# Only the fields we need, compiled once
+_NOT_FOUND_RE = re.compile(
+    rb'^(?:No match for|NOT FOUND|No Data Found|No entries found|Domain not found'
+    rb'|The queried object does not exist|Status:\s*(?:free|AVAILABLE))',
+    re.IGNORECASE | re.MULTILINE,
+)
+_STATUS_RE = re.compile(rb'^\s*(?:Domain )?Status:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+_EXPIRATION_RE = re.compile(
+    rb'^\s*(?:Registry Expiry Date|Registrar Registration Expiration Date|Expiration Date'
+    rb'|Expiry Date|paid-till):\s*(\S+)',
+    re.IGNORECASE | re.MULTILINE,
+)
+_REFER_RE = re.compile(rb'^(?:refer|whois):\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+
+
+def parse_server(server: str) -> Tuple[str, int]:
+    """Parses a 'host' or 'host:port' WHOIS server entry."""
+    host, _, port = server.partition(':')
+    return host, int(port) if port else WHOIS_PORT
+
+
+def parse_whois_response(raw: bytes) -> Tuple[bool, Optional[str], Optional[str]]:
+    """
+    Extracts availability, first status and expiration date from a raw WHOIS response.
+    Like python-whois, a record without status or expiration date counts as available.
+
+    Returns:
+        A tuple of (is_available, status, expiration_date).
+    """
+    if _NOT_FOUND_RE.search(raw):
+        return True, None, None
+    status = _STATUS_RE.search(raw)
+    expiration = _EXPIRATION_RE.search(raw)
+    status = status.group(1).decode('utf-8', 'replace') if status else None
+    expiration = expiration.group(1).decode('utf-8', 'replace') if expiration else None
+    return not status or not expiration, status, expiration
+
+
+class AsyncWhoisClient:
+    """
+    Minimal asyncio port-43 WHOIS client.
+
+    Servers are looked up in config.WHOIS_SERVERS first; unknown TLDs are
+    resolved once through the IANA referral and cached for the client's
+    lifetime. Every server gets its own concurrency cap.
+    """
+
+    def __init__(self, servers: Optional[Dict[str, Tuple[str, int]]] = None,
+                 timeout: Optional[float] = None, retries: Optional[int] = None):
+        self.servers = {
+            tld: parse_server(server) for tld, server in config.WHOIS_SERVERS.items()
+        }
+        if servers:
+            self.servers.update(servers)
+        self.timeout = timeout or config.WHOIS_TIMEOUT
+        self.retries = retries if retries is not None else config.WHOIS_RETRIES
+        self._semaphores: Dict[Tuple[str, int], asyncio.Semaphore] = {}
+        self._referral_locks: Dict[str, asyncio.Lock] = {}
+
+    def _semaphore(self, server: Tuple[str, int]) -> asyncio.Semaphore:
+        if server not in self._semaphores:
+            limit = config.WHOIS_SERVER_CONCURRENCY.get(
+                server[0], config.WHOIS_SERVER_CONCURRENCY['default']
+            )
+            self._semaphores[server] = asyncio.Semaphore(limit)
+        return self._semaphores[server]
+
+    async def _query(self, server: Tuple[str, int], query: str) -> bytes:
+        """Sends one query and reads the response until the server closes the connection."""
+        async with self._semaphore(server):
+            await asyncio.sleep(get_bucket(server[0]).reserve())
+            with timed('whois', server[0]):
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(*server), self.timeout
+                )
+                try:
+                    writer.write(query.encode('idna') + b'\r\n')
+                    await writer.drain()
+                    return await asyncio.wait_for(reader.read(), self.timeout)
+                finally:
+                    writer.close()
+
+    async def server_for(self, domain: str) -> Tuple[str, int]:
+        """Returns the WHOIS server for the domain's TLD, using the cached IANA referral."""
+        tld = '.' + domain.rsplit('.', 1)[-1].lower()
+        if tld in self.servers:
+            return self.servers[tld]
+        lock = self._referral_locks.setdefault(tld, asyncio.Lock())
+        async with lock:
+            if tld not in self.servers:
+                raw = await self._query((IANA_WHOIS_SERVER, WHOIS_PORT), tld.lstrip('.'))
+                match = _REFER_RE.search(raw)
+                if not match:
+                    raise LookupError(f"No WHOIS server known for {tld}")
+                self.servers[tld] = (match.group(1).decode('ascii'), WHOIS_PORT)
+        return self.servers[tld]
+
+    async def check_domain(self, domain: str) -> Tuple[str, bool, str]:
+        """
+        Checks if a single domain is available.
+        Returns the domain, a boolean indicating availability and the outcome
+        ('available', 'taken' or 'error'), like check_single_domain_detailed.
+        """
+        host = ''
+        for i in range(self.retries):
+            try:
+                server = await self.server_for(domain)
+                host = server[0]
+                raw = await self._query(server, domain)
+                if not raw.strip():
+                    raise ConnectionError(f"Empty WHOIS response from {server[0]}")
+                is_available, _, _ = parse_whois_response(raw)
+                return domain, is_available, 'available' if is_available else 'taken'
+            except (OSError, asyncio.TimeoutError, LookupError, UnicodeError):
+                if i < self.retries - 1:
+                    RETRIES.labels('whois', host).inc()
+                    await asyncio.sleep(backoff_delay(i))
+        # All retries failed, assume taken or problematic
+        ERRORS.labels('whois', host).inc()
+        return domain, False, 'error'
+
+    async def check_domains(self, domains: List[str],
+                            on_result: Optional[Callable] = None) -> List[Tuple[str, bool, str]]:
+        """
+        Checks many domains concurrently, bounded by the per-server caps.
+        `on_result` is called with every result as soon as it is known.
+        """
+        async def check(domain):
+            result = await self.check_domain(domain)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return await asyncio.gather(*[check(domain) for domain in domains])
+
+
+def check_domains_detailed(domains: List[str], servers: Optional[Dict[str, Tuple[str, int]]] = None,
+                           on_result: Optional[Callable] = None) -> List[Tuple[str, bool, str]]:
+    """
+    Synchronous entry point: checks a list of domains with a fresh client.
+
+    Args:
+        domains: A list of domain names.
+        servers: Optional overrides of the TLD -> (host, port) map, e.g. a local stub.
+        on_result: Optional callback receiving every result as it completes.
+
+    Returns:
+        A list of (domain, is_available, outcome) tuples.
+    """
+    if not domains:
+        return []
+    return asyncio.run(AsyncWhoisClient(servers).check_domains(list(domains), on_result))
+
+
+def check_single_domain(domain: str) -> Tuple[str, bool]:
+    """
+    Drop-in replacement for availability.check_single_domain.
+    Returns the domain and a boolean indicating availability.
+    """
+    domain_name, is_available, _ = check_domains_detailed([domain])[0]
+    return domain_name, is_available
+
+
+if __name__ == '__main__':
+    from ..utils.stub_servers import StubWhoisServer
+
+    registered = {'google.com', 'facebook.ai'}
+    test_domains = [
+        'google.com',
+        'thisisdefinitelyanavailabledomain12345.com',
+        'another-random-available-domain-xyz.io',
+        'facebook.ai',
+    ]
+    with StubWhoisServer(registered) as address:
+        stub_servers = {tld: address for tld in config.DEFAULT_TLDS}
+        results = check_domains_detailed(test_domains, stub_servers)
+
+    print("\n--- Results ---")
+    for domain, is_available, outcome in results:
+        print(f"[{'AVAILABLE' if is_available else 'TAKEN'}] {domain} ({outcome})")
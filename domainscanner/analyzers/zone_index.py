@@ -0,0 +1,277 @@
+# domainscanner/analyzers/zone_index.py
+"""
+Offline "is this name delegated?" lookups from TLD zone file snapshots.
+
+A zone file is turned into a compact index of the sorted, deduplicated
+second-level labels that have NS records. The index is memory-mapped, so
+only the pages touched by lookups are resident, whatever the zone size.
+
+Index layout (little endian):
+    header    magic, name count, data length, offset width, TLD
+    buckets   65537 x uint64, first name index for every 2-byte prefix
+    offsets   (count + 1) x uint32/uint64, start of every name in data
+    data      the names, concatenated
+"""
+
+import array
+import gzip
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .. import config
+
+MAGIC = b'DSZIDX1\x00'
+_HEADER = struct.Struct('<8sQQQ16s')
+_BUCKETS = 65537
+
+
+def _bucket_key(name: bytes) -> int:
+    """The first two bytes of a name; shorter names sort before longer ones."""
+    return (name[0] << 8) | (name[1] if len(name) > 1 else 0)
+
+
+def iter_zone_labels(zone_path: str, tld: str) -> Iterator[bytes]:
+    """
+    Yields the second-level label of every NS record in a zone file,
+    e.g. b'google' for "GOOGLE.COM. 172800 IN NS ns1.google.com.".
+    Gzipped zone files are read transparently.
+    """
+    tld = tld.lower().strip('.')
+    suffix = '.' + tld
+    origin = tld
+    owner = None
+    opener = gzip.open if zone_path.endswith('.gz') else open
+    with opener(zone_path, 'rt', encoding='ascii', errors='replace') as f:
+        for line in f:
+            line = line.split(';', 1)[0]
+            if not line.strip():
+                continue
+            tokens = line.split()
+            if tokens[0].upper() == '$ORIGIN':
+                origin = tokens[1].lower().rstrip('.')
+                continue
+            if tokens[0].startswith('$'):
+                continue
+            if not line[0].isspace():
+                name = tokens[0].lower()
+                owner = name.rstrip('.') if name.endswith('.') else f"{name}.{origin}"
+                tokens = tokens[1:]
+            if owner is None or 'NS' not in (token.upper() for token in tokens[:4]):
+                continue
+            if not owner.endswith(suffix):
+                continue
+            label = owner[:-len(suffix)]
+            if label and '.' not in label:
+                yield label.encode('ascii')
+
+
+def _sorted_runs(labels: Iterable[bytes], chunk_size: int, workdir: str) -> List[str]:
+    """Sorts the labels in chunks that fit in memory and writes each run to disk."""
+    runs = []
+    chunk = []
+
+    def flush():
+        chunk.sort()
+        path = os.path.join(workdir, f"run{len(runs)}")
+        with open(path, 'wb') as f:
+            f.write(b'\n'.join(chunk) + b'\n')
+        runs.append(path)
+        chunk.clear()
+
+    for label in labels:
+        chunk.append(label)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return runs
+
+
+def _iter_run(path: str) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        for line in f:
+            yield line.rstrip(b'\n')
+
+
+def build_zone_index(zone_path: str, index_path: str, tld: str, chunk_size: int = 5000000) -> int:
+    """
+    Builds a zone index with an external merge sort, so RSS stays bounded by
+    chunk_size names even for zones with 150M+ delegations.
+
+    Args:
+        zone_path: The zone file (optionally .gz).
+        index_path: Where to write the index.
+        tld: The zone's TLD, e.g. 'com'.
+        chunk_size: The number of names sorted in memory at once.
+
+    Returns:
+        The number of unique names in the index.
+    """
+    buckets = array.array('Q', [0]) * _BUCKETS
+    with tempfile.TemporaryDirectory() as workdir:
+        runs = _sorted_runs(iter_zone_labels(zone_path, tld), chunk_size, workdir)
+        data_path = os.path.join(workdir, 'data')
+        offsets_path = os.path.join(workdir, 'offsets')
+        count = 0
+        data_length = 0
+        previous = None
+        previous_key = -1
+        offsets = array.array('Q')
+        with open(data_path, 'wb') as data_file, open(offsets_path, 'wb') as offsets_file:
+            for name in heapq.merge(*[_iter_run(path) for path in runs]):
+                if name == previous:
+                    continue
+                key = _bucket_key(name)
+                # Every bucket up to this key starts at the current name
+                for k in range(previous_key + 1, key + 1):
+                    buckets[k] = count
+                previous_key = key
+                previous = name
+                offsets.append(data_length)
+                data_file.write(name)
+                data_length += len(name)
+                count += 1
+                if len(offsets) >= 1 << 20:
+                    offsets.tofile(offsets_file)
+                    offsets = array.array('Q')
+            offsets.append(data_length)
+            offsets.tofile(offsets_file)
+        for k in range(previous_key + 1, _BUCKETS):
+            buckets[k] = count
+
+        offset_width = 4 if data_length < 1 << 32 else 8
+        with open(index_path, 'wb') as out:
+            out.write(_HEADER.pack(MAGIC, count, data_length, offset_width,
+                                   tld.lower().strip('.').encode('ascii')))
+            buckets.tofile(out)
+            with open(offsets_path, 'rb') as offsets_file:
+                while True:
+                    block = array.array('Q')
+                    try:
+                        block.fromfile(offsets_file, 1 << 20)
+                    except EOFError:
+                        pass
+                    if not block:
+                        break
+                    if offset_width == 4:
+                        block = array.array('I', block)
+                    block.tofile(out)
+            with open(data_path, 'rb') as data_file:
+                while True:
+                    chunk = data_file.read(1 << 24)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+    return count
+
+
+class ZoneIndex:
+    """Read-only, memory-mapped view of an index built by build_zone_index."""
+
+    def __init__(self, index_path: str):
+        self._file = open(index_path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, data_length, offset_width, tld = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{index_path} is not a zone index")
+        self.tld = tld.rstrip(b'\x00').decode('ascii')
+        view = memoryview(self._mmap)
+        start = _HEADER.size
+        self._buckets = view[start:start + _BUCKETS * 8].cast('Q')
+        start += _BUCKETS * 8
+        self._offsets = view[start:start + (self.count + 1) * offset_width].cast(
+            'I' if offset_width == 4 else 'Q'
+        )
+        start += (self.count + 1) * offset_width
+        self._data = view[start:start + data_length]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, label) -> bool:
+        if isinstance(label, str):
+            label = label.lower().encode('ascii', 'replace')
+        if not label:
+            return False
+        key = _bucket_key(label)
+        lo, hi = self._buckets[key], self._buckets[key + 1]
+        offsets, data = self._offsets, self._data
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = data[offsets[mid]:offsets[mid + 1]]
+            if name == label:
+                return True
+            if name.tobytes() < label:
+                lo = mid + 1
+            else:
+                hi = mid
+        return False
+
+    def close(self):
+        self._buckets.release()
+        self._offsets.release()
+        self._data.release()
+        self._mmap.close()
+        self._file.close()
+
+
+_indexes: Dict[str, ZoneIndex] = {}
+
+
+def get_zone_index(tld: str) -> Optional[ZoneIndex]:
+    """Returns the index configured for a TLD in config.ZONE_INDEXES, if any."""
+    path = config.ZONE_INDEXES.get(tld)
+    if not path or not os.path.exists(path):
+        return None
+    if tld not in _indexes:
+        _indexes[tld] = ZoneIndex(path)
+    return _indexes[tld]
+
+
+def split_by_zone(domains: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Splits domains into the ones found in a local zone index (registered)
+    and the ones that still need a network check, either because they are
+    missing from their zone or because no index exists for their TLD.
+
+    Returns:
+        A tuple of (taken_domains, domains_to_check).
+    """
+    taken, to_check = [], []
+    for domain in domains:
+        label, _, tld = domain.lower().partition('.')
+        index = get_zone_index('.' + tld)
+        if index is not None and label in index:
+            taken.append(domain)
+        else:
+            to_check.append(domain)
+    return taken, to_check
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query an offline zone index.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Ingest a zone file (optionally .gz).")
+    build.add_argument('zone_file')
+    build.add_argument('index_file')
+    build.add_argument('--tld', required=True, help="The zone's TLD, e.g. com")
+    build.add_argument('--chunk-size', type=int, default=5000000)
+    query = subparsers.add_parser('query', help="Look names up in an index.")
+    query.add_argument('index_file')
+    query.add_argument('names', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        total = build_zone_index(args.zone_file, args.index_file, args.tld, args.chunk_size)
+        print(f"[SUCCESS] Indexed {total} names into {args.index_file}")
+    else:
+        index = ZoneIndex(args.index_file)
+        for name in args.names:
+            label = name.lower().split('.')[0]
+            print(f"[{'DELEGATED' if label in index else 'NOT IN ZONE'}] {name}")
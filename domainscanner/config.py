@@ -5,6 +5,7 @@ GODADDY_API_KEY = ""
 GODADDY_API_SECRET = ""
 NAMECHEAP_API_KEY = ""
 NAMECHEAP_USER_NAME = ""
+NAMECHEAP_CLIENT_IP = "" # Whitelisted IP address the Namecheap API is called from
 MOZ_ACCESS_ID = ""
 MOZ_SECRET_KEY = ""
 
@@ -19,4 +20,214 @@ MAX_DOMAIN_LENGTH = 15 # The maximum number of characters for the domain name (e
 DEFAULT_TLDS = ['.com', '.io', '.ai']
 TREND_KEYWORDS_FILE = 'data/trend_words.txt'
 DICTIONARY_FILE = 'data/dictionary.txt'
-NEWS_SOURCES = ['https://techcrunch.com/'] 
\ No newline at end of file
+NEWS_SOURCES = ['https://techcrunch.com/feed/'] # RSS or Atom feeds
+STOPWORDS_FILE = 'data/stopwords.txt' # Words never used as news keywords
+NEWS_STATE_FILE = 'data/news.sqlite3' # Feed validators, seen item GUIDs and decayed keyword counts
+NEWS_FETCH_WORKERS = 16 # Feeds fetched concurrently
+NEWS_KEYWORD_HALF_LIFE = 86400 # Seconds after which a headline mention counts half
+NEWS_MIN_KEYWORD_SCORE = 0.5 # Decayed mention count a keyword needs to drive generation
+NEWS_TRENDING_LIMIT = 500 # Most mentioned keywords used per run
+NEWS_PRUNE_SCORE = 0.01 # Keywords decayed below this count are forgotten
+NEWS_SEEN_ITEM_RETENTION = 30 * 86400 # Seconds a feed item GUID is remembered
+
+# DNS pre-filter settings (runs before WHOIS)
+DNS_PREFILTER_ENABLED = True
+DNS_RESOLVER = '8.8.8.8'
+DNS_RESOLVER_PORT = 53
+DNS_CONCURRENCY = 500 # Maximum number of in-flight DNS queries
+DNS_TIMEOUT = 2.0 # Seconds to wait for a single DNS response
+DNS_RETRIES = 2
+
+# Result cache settings (skips repeated WHOIS / Wayback lookups across runs)
+CACHE_ENABLED = True
+CACHE_FILE = 'data/cache.sqlite3'
+CACHE_TTLS = { # Seconds each outcome stays valid
+    'taken': 7 * 24 * 3600,
+    'available': 24 * 3600,
+    'error': 30 * 60,
+    'expiring': 3600, # Registered, but pending delete (RDAP); may be released any day
+    'scored': 7 * 24 * 3600, # SEO metrics
+}
+CACHE_MAX_ENTRIES = 500000
+
+# Availability settings
+AVAILABILITY_BACKEND = 'python-whois' # One of AVAILABILITY_BACKENDS
+REGISTRAR_BACKENDS = ['godaddy', 'namecheap'] # Bulk registrar APIs, see registrars.availability.REGISTRARS
+AVAILABILITY_BACKENDS = ['python-whois', 'async-whois', 'rdap'] + REGISTRAR_BACKENDS
+WHOIS_SERVERS = { # TLD -> WHOIS server; other TLDs are resolved through whois.iana.org
+    '.com': 'whois.verisign-grs.com',
+    '.net': 'whois.verisign-grs.com',
+    '.io': 'whois.nic.io',
+    '.ai': 'whois.nic.ai',
+}
+WHOIS_SERVER_CONCURRENCY = { # Maximum parallel connections per WHOIS server
+    'default': 4,
+    'whois.verisign-grs.com': 10,
+}
+WHOIS_TIMEOUT = 10.0 # Seconds
+WHOIS_RETRIES = 3
+
+# RDAP settings (AVAILABILITY_BACKEND = 'rdap')
+RDAP_BOOTSTRAP_URL = 'https://data.iana.org/rdap/dns.json' # IANA registry of the RDAP server of every TLD
+RDAP_BOOTSTRAP_FILE = 'data/rdap_dns.json' # Cached copy of the registry
+RDAP_BOOTSTRAP_MAX_AGE = 7 * 24 * 3600 # Seconds before the registry is downloaded again
+RDAP_SERVERS = {} # TLD -> RDAP base URL, overriding the registry (e.g. '.com': 'https://rdap.verisign.com/com/v1/')
+RDAP_SERVER_CONCURRENCY = { # Pooled keep-alive connections per RDAP server
+    'default': 4,
+    'rdap.verisign.com': 10,
+}
+RDAP_TIMEOUT = 10.0 # Seconds
+RDAP_RETRIES = 3
+
+# Registrar availability APIs (AVAILABILITY_BACKEND = 'godaddy' or 'namecheap'; needs the API keys above)
+GODADDY_API_URL = 'https://api.godaddy.com'
+GODADDY_BATCH_SIZE = 500 # Domains per bulk availability request; 500 is the GoDaddy maximum
+NAMECHEAP_API_URL = 'https://api.namecheap.com/xml.response'
+NAMECHEAP_BATCH_SIZE = 50 # Domains per namecheap.domains.check request
+
+# Rate limiting: every remote endpoint gets its own token bucket
+MAX_WORKERS = 20 # Thread pool size per stage; the request rate is set by RATE_LIMITS, not by this
+RATE_LIMITS = { # Endpoint -> (requests per second, burst size)
+    'default': (1.0, 2),
+    'whois': (1.0, 2), # WHOIS servers not listed in WHOIS_SERVERS
+    'whois.verisign-grs.com': (5.0, 10),
+    'whois.nic.io': (1.0, 3),
+    'whois.nic.ai': (1.0, 3),
+    'whois.iana.org': (1.0, 3),
+    'rdap': (2.0, 5), # RDAP servers not listed here
+    'rdap.verisign.com': (10.0, 20),
+    'archive.org': (3.0, 5),
+    'sedo.com': (1.0, 2),
+    'dan.com': (1.0, 2),
+    'expireddomains.net': (1.0, 3),
+    'lsapi.seomoz.com': (1.0, 2), # One bulk request of up to SEO_BATCH_SIZE domains per token
+    'api.godaddy.com': (1.0, 5), # 60 requests per minute
+    'api.namecheap.com': (0.3, 3), # 20 requests per minute
+}
+MAX_ATTEMPTS = 3 # Attempts per domain and stage before giving up
+
+# Concurrency settings
+CONCURRENCY_MODE = 'fixed' # 'fixed' (MAX_WORKERS per stage) or 'adaptive' (AIMD limit per stage, up to MAX_WORKERS)
+CONCURRENCY_MIN_WORKERS = 1 # Floor of the adaptive limits
+CONCURRENCY_MAX_WORKERS = None # Ceiling of the adaptive limits; None keeps MAX_WORKERS as the ceiling
+CONCURRENCY_INITIAL_WORKERS = None # Starting limit; None starts at half the ceiling, so the limit can grow
+CONCURRENCY_BACKOFF = 0.5 # Factor applied to a limit when a call times out or is refused
+CONCURRENCY_LATENCY_TOLERANCE = 2.0 # Backs off when mean latency exceeds this multiple of the baseline
+CONCURRENCY_MIN_WINDOW = 10 # Minimum calls between two increases
+CONCURRENCY_LOG_FILE = 'data/concurrency.jsonl' # Every change of a limit; empty to disable
+RETRY_BASE_DELAY = 3.0 # Seconds; doubled on every retry and jittered
+RETRY_MAX_DELAY = 60.0
+
+# Pipeline settings
+PIPELINE_MODE = 'batch' # 'batch', 'streaming' (stages connected by bounded queues) or 'distributed'
+STREAM_QUEUE_SIZE = 1000 # Capacity of each queue between stages
+STREAM_BATCH_SIZE = 200 # Maximum micro-batch handed to a stage at once
+STREAM_BATCH_TIMEOUT = 2.0 # Seconds a stage waits to fill a micro-batch
+STREAM_AVAILABILITY_WORKERS = 2
+STREAM_HISTORY_WORKERS = 1
+
+# HTTP settings
+HTTP_POOL_SIZE = 20 # Keep-alive connections pooled per host
+HTTP_TIMEOUT = 10 # Seconds
+
+# History settings
+HISTORY_BACKEND = 'available' # 'available' (Wayback availability API) or 'cdx' (CDX server API)
+WAYBACK_AVAILABLE_URL = 'http://archive.org/wayback/available'
+WAYBACK_CDX_URL = 'http://web.archive.org/cdx/search/cdx'
+CDX_MAX_ROWS = 5000 # Upper bound on captures fetched per domain (one per day)
+
+# Generator settings
+DOMAIN_PREFIXES = [''] # Put in front of trend and news keywords
+DOMAIN_SUFFIXES = ['solutions', 'labs', 'future', 'systems', 'tech', 'works', 'group', 'ventures']
+BLOOM_CAPACITY = 10000000 # Expected number of unique candidates per run
+BLOOM_ERROR_RATE = 0.001 # Fraction of unique candidates that may be skipped as duplicates
+
+# Candidate scoring: the network checks see the best names first
+SCORING_ENABLED = True
+SCORING_WORDS_FILE = 'data/common_words.txt' # Vocabulary for word segmentation and the letter bigram model
+SCORING_WEIGHTS = { # Feature -> weight of the candidate score
+    'length': 1.0,
+    'words': 2.0,
+    'pronounceable': 1.5,
+    'digits': -0.5, # Per digit
+    'hyphens': -1.0, # Per hyphen
+    'tld': 1.0,
+}
+TLD_WEIGHTS = {'.com': 1.0, '.ai': 0.8, '.io': 0.7, '.net': 0.5, 'default': 0.3}
+SCORING_TOP_K = None # e.g. 5000 to check only the best candidates of a run
+SCORING_MIN_SCORE = None # e.g. 1.5 to skip candidates scoring lower
+SCORING_CHUNK_SIZE = 100000 # Streaming pipelines rank the candidates in chunks of this size
+EXPIRED_TOP_K = None # Budget of expired domains sent to the availability and SEO checks
+
+# Trademark and blocklist screening, before any network check
+SCREENING_ENABLED = True
+SCREENING_LISTS = { # List name -> file of terms, one per line
+    'trademark': 'data/trademarks.txt',
+    'blocklist': 'data/blocklist.txt',
+}
+SCREENING_CACHE_FILE = 'data/screening.acx' # Compiled automaton, rebuilt when the lists or settings change
+SCREENING_MIN_SUBSTRING_LENGTH = 4 # Shorter terms only match a whole name, or a boundary for SCREENING_BOUNDARY_LISTS
+SCREENING_FUZZY_MIN_LENGTH = 6 # Longer terms also match with one dropped, swapped or doubled letter
+SCREENING_BOUNDARY_LISTS = ['blocklist'] # Lists whose terms only match at the start or end of a name or hyphen-separated part
+SCREENING_ALLOWED_WORDS_FILE = 'data/screening_allowed.txt' # Ordinary words a term may sit inside ('pineapple' for Apple)
+SCREENING_CHUNK_SIZE = 100000 # Names scanned per vectorized batch
+SCREENING_REPORT_LIMIT = 20 # Flagged names printed per run
+
+# Offline zone indexes, built with `python -m domainscanner.analyzers.zone_index build`
+ZONE_INDEXES = { # TLD -> index file; TLDs without an index go straight to the network checks
+    # '.com': 'data/com.zidx',
+}
+
+# Expired domains parser settings
+EXPIRED_DOMAINS_BASE_URL = 'https://www.expireddomains.net'
+EXPIRED_DOMAINS_LISTS = ['deleted-com-domains', 'deleted-net-domains', 'deleted-io-domains']
+EXPIRED_DOMAINS_PAGE_SIZE = 25 # Rows per result page on the site
+EXPIRED_DOMAINS_MAX_PAGES = 20 # Per list
+EXPIRED_DOMAINS_CONCURRENCY = 4 # Pages fetched in parallel
+EXPIRED_PAGE_CACHE_DIR = 'data/page_cache' # Pages kept for conditional GETs
+
+# Checkpoint journal settings (used by `main.py --resume`)
+JOURNAL_ENABLED = True
+JOURNAL_FILE = 'data/journal.jsonl'
+JOURNAL_FSYNC_EVERY = 200 # Records per fsync
+JOURNAL_FSYNC_INTERVAL = 2.0 # Maximum seconds between fsyncs
+
+# Distributed scanning settings (PIPELINE_MODE = 'distributed')
+DISTRIBUTED_QUEUE_URL = 'sqlite:///data/work_queue.db' # Shared work queue; must be reachable by every worker
+DISTRIBUTED_WORKERS = 4 # Local worker processes; 0 to rely on remote workers only
+DISTRIBUTED_SHARDS = 64 # Consistent-hash shards the candidates are split into
+DISTRIBUTED_SHARD_SIZE = 200 # Maximum candidates per queued task
+
+# Metrics settings
+METRICS_PORT = None # e.g. 9108 to serve Prometheus metrics on /metrics while a run is going
+METRICS_SUMMARY_FILE = 'data/metrics.json' # JSON summary written at the end of every run
+
+# Daemon settings (python main.py daemon)
+DAEMON_STATE_FILE = 'data/daemon.sqlite3' # Processed keywords and checked domains with their next check
+DAEMON_POLL_INTERVAL = 60 # Seconds between checks of the word files for changes
+DAEMON_NEWS_INTERVAL = 900 # Seconds between fetches of the news feeds
+DAEMON_BATCH_SIZE = 1000 # Candidates (or due rechecks) checked per batch
+DAEMON_EXPIRATION_LOOKUP = True # Look up the RDAP expiration date of taken domains to time their rechecks
+DAEMON_RECHECK_INTERVAL = 30 * 86400 # Recheck period of taken domains without a known expiration date
+DAEMON_EXPIRY_RECHECK_DELAY = 86400 # Taken domains are rechecked this long after their expiration date
+DAEMON_GRACE_RECHECK_INTERVAL = 86400 # Recheck period of expired domains not deleted yet
+DAEMON_DROP_WATCH_INTERVAL = 600 # Recheck period of domains pending delete
+DAEMON_ERROR_RETRY_INTERVAL = 3600 # Retry delay of failed lookups
+
+# Result store settings
+RESULTS_LOG_FILE = 'data/results.jsonl' # Append-only log of every recorded result
+RESULTS_DB_FILE = 'data/results.sqlite3' # Indexed view of the log, rebuildable from it
+
+# SEO metrics settings (Moz Links API; simulated when MOZ_ACCESS_ID / MOZ_SECRET_KEY are not set)
+SEO_API_URL = 'https://lsapi.seomoz.com/v2/url_metrics'
+SEO_BATCH_SIZE = 50 # Domains per bulk request; 50 is the Moz maximum
+SEO_SIMULATION_SEED = 0 # Seed of the deterministic simulated scores
+
+# Marketplace publishing settings
+MARKETPLACES = { # Bulk listing endpoints; the API key setting names the key above
+    'sedo.com': {'url': 'https://api.sedo.com/api/v1/listings/bulk', 'api_key': 'SEDO_API_KEY', 'batch_size': 50},
+    'dan.com': {'url': 'https://api.dan.com/v1/listings/bulk', 'api_key': 'DAN_API_KEY', 'batch_size': 50},
+}
+PUBLISH_OUTBOX_FILE = 'data/outbox.sqlite3' # Persistent queue of listings not sent yet
+PUBLISH_WORKERS = 2 # Concurrent batches per marketplace
+PUBLISH_DRAIN_TIMEOUT = 300 # Seconds to keep sending at the end of a run; the rest waits for the next run
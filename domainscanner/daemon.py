@@ -0,0 +1,416 @@
+# domainscanner/daemon.py
+"""
+Continuous scanning (`python main.py daemon`).
+
+Instead of regenerating and rechecking everything on every cron run, the
+daemon remembers what it already processed in config.DAEMON_STATE_FILE:
+
+- the keywords of every input (trend words, dictionary, news headlines).
+  The files are polled for changes every config.DAEMON_POLL_INTERVAL
+  seconds and the feeds every config.DAEMON_NEWS_INTERVAL seconds; only
+  keywords not seen before are turned into candidates. The candidates are
+  queued together with their keywords and leave the queue once checked,
+  so an interrupted round resumes where it stopped;
+- every domain it checked, with its outcome. Candidates already checked are
+  skipped, and registered ("taken") domains are rechecked on a schedule
+  derived from their RDAP expiration date (see next_check_time), so a name
+  being deleted is caught within minutes of its drop instead of at the next
+  full rescan.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import config
+
+# Sources of keywords: name -> (file setting or None for the news feeds, use prefixes and suffixes)
+SOURCES = {
+    'trend': ('TREND_KEYWORDS_FILE', True),
+    'dictionary': ('DICTIONARY_FILE', False),
+    'news': (None, True),
+}
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    """Parses an RDAP/ISO 8601 date ('2030-01-01T00:00:00Z') into a timestamp; None if missing or invalid."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def next_check_time(outcome: str, expiration: Optional[float], dropping: bool, now: float) -> Optional[float]:
+    """
+    When to check a domain again; None for never (available, screened out or skipped).
+
+    - Failed lookups are retried after config.DAEMON_ERROR_RETRY_INTERVAL.
+    - Names about to be deleted (the 'expiring' outcome, RDAP 'pending
+      delete' or 'redemption period') are watched every
+      config.DAEMON_DROP_WATCH_INTERVAL.
+    - Names expiring in the future are checked again right after their
+      expiration date (plus config.DAEMON_EXPIRY_RECHECK_DELAY), when they
+      are either renewed or start their grace period.
+    - Expired names in their grace period are checked every
+      config.DAEMON_GRACE_RECHECK_INTERVAL.
+    - Names without a known expiration date are checked every
+      config.DAEMON_RECHECK_INTERVAL.
+    """
+    if outcome == 'error':
+        return now + config.DAEMON_ERROR_RETRY_INTERVAL
+    if outcome not in ('taken', 'expiring'):
+        return None
+    if dropping or outcome == 'expiring':
+        return now + config.DAEMON_DROP_WATCH_INTERVAL
+    if expiration is None:
+        return now + config.DAEMON_RECHECK_INTERVAL
+    if expiration > now:
+        return expiration + config.DAEMON_EXPIRY_RECHECK_DELAY
+    return now + config.DAEMON_GRACE_RECHECK_INTERVAL
+
+
+def generator_fingerprint(use_affixes: bool) -> str:
+    """Hash of the generator settings; when they change, the keywords of a source are expanded again."""
+    settings = (config.DEFAULT_TLDS, config.MAX_DOMAIN_LENGTH)
+    if use_affixes:
+        settings += (config.DOMAIN_PREFIXES, config.DOMAIN_SUFFIXES)
+    return hashlib.sha256(repr(settings).encode('utf-8')).hexdigest()
+
+
+class DaemonState:
+    """
+    Persistent memory of the daemon: the processed keywords per source, the
+    last seen version of every input, and every checked domain with its
+    outcome and next check.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.DAEMON_STATE_FILE
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS inputs (
+                source TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS keywords (
+                source TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                PRIMARY KEY (source, keyword)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS domains (
+                domain TEXT PRIMARY KEY,
+                outcome TEXT NOT NULL,
+                expiration REAL,
+                next_check REAL,
+                checked_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS pending (
+                domain TEXT PRIMARY KEY,
+                queued_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS domains_next_check ON domains (next_check) WHERE next_check IS NOT NULL;
+        """)
+
+    def input_version(self, source: str) -> Optional[Tuple[str, str]]:
+        """Returns the (version, settings fingerprint) processed last for a source."""
+        with self._lock:
+            return self._conn.execute("SELECT version, settings FROM inputs WHERE source = ?",
+                                      (source,)).fetchone()
+
+    def new_keywords(self, source: str, keywords: Iterable[str], settings: str) -> List[str]:
+        """
+        Returns the keywords of a source not processed before, in order and
+        without duplicates. When the generator settings changed, every keyword
+        counts as new again.
+        """
+        keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        with self._lock:
+            previous = self._conn.execute("SELECT settings FROM inputs WHERE source = ?", (source,)).fetchone()
+            if previous is not None and previous[0] != settings:
+                return keywords
+            known = set()
+            for start in range(0, len(keywords), 500):
+                chunk = keywords[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                known.update(row[0] for row in self._conn.execute(
+                    f"SELECT keyword FROM keywords WHERE source = ? AND keyword IN ({placeholders})",
+                    [source] + chunk))
+        return [keyword for keyword in keywords if keyword not in known]
+
+    def accept_input(self, source: str, version: str, settings: str, keywords: Sequence[str],
+                     candidates: Iterable[str]) -> int:
+        """
+        Records a new version of a source and its new keywords, and queues
+        their candidates never checked before, in one transaction. The
+        queue survives a crash: pending() hands the candidates out until
+        record() stores their outcome. Returns how many were queued.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            previous = self._conn.execute("SELECT settings FROM inputs WHERE source = ?", (source,)).fetchone()
+            if previous is not None and previous[0] != settings:
+                self._conn.execute("DELETE FROM keywords WHERE source = ?", (source,))
+            self._conn.executemany("INSERT OR IGNORE INTO keywords (source, keyword, first_seen) VALUES (?, ?, ?)",
+                                   [(source, keyword, now) for keyword in keywords])
+            self._conn.execute("INSERT OR REPLACE INTO inputs (source, version, settings, checked_at) "
+                               "VALUES (?, ?, ?, ?)", (source, version, settings, now))
+            queued = 0
+            for domain in candidates:
+                queued += self._conn.execute(
+                    "INSERT OR IGNORE INTO pending (domain, queued_at) "
+                    "SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM domains WHERE domain = ?)",
+                    (domain, now, domain)).rowcount
+        return queued
+
+    def pending(self, limit: int) -> List[str]:
+        """Returns up to `limit` queued candidates, the oldest first."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT domain FROM pending ORDER BY queued_at, domain LIMIT ?", (limit,))]
+
+    def record(self, results: Iterable[Tuple[str, str, Optional[float], Optional[float]]]):
+        """Stores (domain, outcome, expiration, next_check) results and takes the domains off the queue."""
+        now = time.time()
+        results = list(results)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO domains (domain, outcome, expiration, next_check, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(domain, outcome, expiration, next_check, now)
+                 for domain, outcome, expiration, next_check in results])
+            self._conn.executemany("DELETE FROM pending WHERE domain = ?", [(result[0],) for result in results])
+
+    def due(self, now: float, limit: int) -> List[str]:
+        """Returns up to `limit` domains whose next check is due, the most overdue first."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT domain FROM domains WHERE next_check IS NOT NULL AND next_check <= ? "
+                "ORDER BY next_check LIMIT ?", (now, limit))]
+
+    def next_due(self) -> Optional[float]:
+        """Returns the time of the earliest scheduled check."""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_check) FROM domains WHERE next_check IS NOT NULL").fetchone()
+        return row[0]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT outcome, COUNT(*) FROM domains GROUP BY outcome"))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ScanDaemon:
+    """
+    Long-running scanner: every round it expands the new keywords of the
+    changed inputs into candidates, checks the candidates it never saw and
+    rechecks the registered domains that are due.
+
+    `on_found` is called with every domain that is available, short and has
+    a clean history, after it was sent to the marketplaces.
+    """
+
+    def __init__(self, state: Optional[DaemonState] = None, on_found: Optional[Callable[[str], None]] = None):
+        self.state = state or DaemonState()
+        self.on_found = on_found
+        self._last_polled: Dict[str, float] = {}
+        self._stop = threading.Event()
+
+    # --- Inputs -------------------------------------------------------------
+
+    def _poll_source(self, source: str, now: float):
+        """Queues the candidates of the new keywords of a source, if it is due and changed."""
+        setting, use_affixes = SOURCES[source]
+        interval = config.DAEMON_NEWS_INTERVAL if setting is None else config.DAEMON_POLL_INTERVAL
+        if now - self._last_polled.get(source, 0.0) < interval:
+            return
+        self._last_polled[source] = now
+        settings = generator_fingerprint(use_affixes)
+
+        if setting is None:
+            from .generators.news_generator import fetch_news_keywords
+            keywords = fetch_news_keywords()
+            version = hashlib.sha256('\n'.join(sorted(keywords)).encode('utf-8')).hexdigest()
+        else:
+            path = getattr(config, setting)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return
+            version = f"{stat.st_mtime_ns}:{stat.st_size}"
+            if self.state.input_version(source) == (version, settings):
+                return
+            from .generators.engine import iter_words
+            keywords = iter_words(path)
+
+        from .generators.engine import iter_combinations
+        keywords = self.state.new_keywords(source, keywords, settings)
+        affixes = {'prefixes': config.DOMAIN_PREFIXES, 'suffixes': config.DOMAIN_SUFFIXES} if use_affixes else {}
+        queued = self.state.accept_input(source, version, settings, keywords,
+                                         iter_combinations(keywords, **affixes))
+        if keywords:
+            print(f"[DAEMON] {len(keywords)} new keywords from {source}, {queued} new candidates.")
+
+    def poll_inputs(self, now: Optional[float] = None):
+        """Queues the candidates built from the new keywords of every source that changed."""
+        now = now if now is not None else time.time()
+        for source in SOURCES:
+            self._poll_source(source, now)
+
+    # --- Checks -------------------------------------------------------------
+
+    def _lookup(self, domains: Sequence[str]) -> Dict[str, Tuple[str, Optional[float], bool]]:
+        """
+        RDAP outcome, expiration date and whether the name is being deleted,
+        per domain. Empty without config.DAEMON_EXPIRATION_LOOKUP.
+        """
+        if not domains or not config.DAEMON_EXPIRATION_LOOKUP:
+            return {}
+        from .analyzers.rdap_client import lookup_domains
+        return {record.domain: (record.outcome, parse_date(record.expiration_date), record.is_dropping)
+                for record in lookup_domains(list(domains))}
+
+    def _schedule(self, outcomes: Dict[str, str], lookups: Dict[str, Tuple[str, Optional[float], bool]]):
+        """
+        Records the outcomes with their next check. The RDAP lookup of a taken
+        domain refines it: 'expiring' replaces 'taken', and an RDAP answer
+        contradicting the availability check is checked again like an error.
+        """
+        now = time.time()
+        results = []
+        for domain, outcome in outcomes.items():
+            lookup_outcome, expiration, dropping = lookups.get(domain, (None, None, False))
+            if outcome == 'taken' and lookup_outcome == 'expiring':
+                outcome = 'expiring'
+            schedule_as = outcome
+            if outcome in ('taken', 'expiring') and lookup_outcome == 'available':
+                schedule_as = 'error'
+            results.append((domain, outcome, expiration, next_check_time(schedule_as, expiration, dropping, now)))
+        self.state.record(results)
+
+    def _process_available(self, available: List[str]):
+        """Runs the available domains through the length and history filters and publishes the survivors."""
+        from .analyzers.metrics import filter_by_length
+        from .stages import find_clean_history_domains, publish_domains
+        from .utils.result_store import get_active_result_store
+
+        if not available:
+            return
+        short = filter_by_length(available)
+        clean = set(publish_domains(find_clean_history_domains(short, show_progress=False)))
+        store = get_active_result_store()
+        if store is not None:
+            short_set = set(short)
+            store.record_many('new', [
+                (domain, {'available': True, 'short': domain in short_set,
+                          'clean_history': domain in clean if domain in short_set else None}, None)
+                for domain in available
+            ])
+        for domain in sorted(clean):
+            print(f"[FOUND] {domain}")
+            if self.on_found is not None:
+                self.on_found(domain)
+
+    def scan(self, candidates: List[str]):
+        """Checks new candidates, best first, and schedules the registered ones for rechecks."""
+        from .analyzers.trademark_screen import split_by_screening
+        from .stages import check_availability
+
+        flagged, candidates = split_by_screening(candidates)
+        outcomes = {domain: 'flagged' for domain, _ in flagged}
+        if candidates and config.SCORING_ENABLED:
+            # Candidates below config.SCORING_MIN_SCORE or outside the top-K budget are not checked
+            from .analyzers.scoring import rank_domains
+            ranked = rank_domains(candidates, show_progress=False)
+            ranked_set = set(ranked)
+            outcomes.update({domain: 'skipped' for domain in candidates if domain not in ranked_set})
+            candidates = ranked
+        if candidates:
+            # Every candidate keeps its own outcome, so failed lookups are retried soon
+            checked = check_availability(candidates, show_progress=False)
+            outcomes.update(checked)
+            self._process_available([domain for domain, outcome in checked.items() if outcome == 'available'])
+        taken = [domain for domain, outcome in outcomes.items() if outcome in ('taken', 'expiring')]
+        # A failed RDAP lookup (e.g. a TLD without an RDAP server) only means the
+        # expiration date is unknown; the availability stages already decided
+        self._schedule(outcomes, self._lookup(taken))
+        count = lambda wanted: sum(1 for outcome in outcomes.values() if outcome == wanted)
+        print(f"[DAEMON] Checked {len(outcomes)} new candidates: {count('available')} available, "
+              f"{len(taken)} taken, {count('error')} failed, {count('flagged')} screened out, "
+              f"{count('skipped')} skipped by score.")
+
+    def recheck(self, domains: List[str]):
+        """
+        Checks due domains again, bypassing the result cache. With
+        config.DAEMON_EXPIRATION_LOOKUP one RDAP lookup gives both the
+        availability and the new expiration date; the domains it cannot
+        answer are checked with the availability backend.
+        """
+        lookups = {domain: lookup for domain, lookup in self._lookup(domains).items() if lookup[0] != 'error'}
+        outcomes = {domain: outcome for domain, (outcome, _, _) in lookups.items()}
+        # Domains RDAP could not answer go through the configured availability backend
+        unanswered = [domain for domain in domains if domain not in outcomes]
+        if unanswered:
+            from .stages import check_availability_batch
+            outcomes.update({domain: outcome for domain, _, outcome in
+                             check_availability_batch(unanswered, show_progress=False)})
+        dropped = [domain for domain, outcome in outcomes.items() if outcome == 'available']
+        self._process_available(dropped)
+        self._schedule(outcomes, lookups)
+        print(f"[DAEMON] Rechecked {len(domains)} registered domains: {len(dropped)} dropped.")
+
+    # --- Loop ---------------------------------------------------------------
+
+    def run_once(self):
+        """One round: the queued candidates, including those of the changed inputs, then the due rechecks."""
+        self.poll_inputs()
+        # Candidates queued by an interrupted round are checked first
+        while not self._stop.is_set():
+            candidates = self.state.pending(config.DAEMON_BATCH_SIZE)
+            if not candidates:
+                break
+            self.scan(candidates)
+        due = self.state.due(time.time(), config.DAEMON_BATCH_SIZE)
+        if due:
+            self.recheck(due)
+
+    def run(self, once: bool = False):
+        """Runs rounds until stop() or Ctrl+C, sleeping until the next input poll or due recheck."""
+        print(f"[DAEMON] Watching {', '.join(SOURCES)}; state in {self.state.path}.")
+        try:
+            while not self._stop.is_set():
+                self.run_once()
+                if once:
+                    break
+                next_due = self.state.next_due()
+                wait = config.DAEMON_POLL_INTERVAL
+                if next_due is not None:
+                    wait = min(wait, max(0.0, next_due - time.time()))
+                self._stop.wait(max(wait, 1.0))
+        except KeyboardInterrupt:
+            print("\n[DAEMON] Stopping.")
+        summary = ', '.join(f"{count} {outcome}" for outcome, count in sorted(self.state.counts().items()))
+        print(f"[DAEMON] Domains known: {summary or 'none'}.")
+
+    def stop(self):
+        self._stop.set()
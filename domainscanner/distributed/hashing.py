@@ -0,0 +1,34 @@
+# domainscanner/distributed/hashing.py
+
+import bisect
+import hashlib
+from typing import List
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping domains to shard ids.
+
+    Every shard owns `replicas` virtual points on the ring, so shards get
+    evenly sized slices and changing the number of shards only moves the
+    domains of the slices that changed hands.
+    """
+
+    def __init__(self, num_shards: int, replicas: int = 64):
+        self.num_shards = num_shards
+        points = sorted(
+            (_hash(f"shard-{shard}-{replica}"), shard)
+            for shard in range(num_shards)
+            for replica in range(replicas)
+        )
+        self._keys: List[int] = [key for key, _ in points]
+        self._shards: List[int] = [shard for _, shard in points]
+
+    def shard_for(self, domain: str) -> int:
+        """Returns the shard owning a domain."""
+        index = bisect.bisect(self._keys, _hash(domain.lower())) % len(self._keys)
+        return self._shards[index]
@@ -0,0 +1,247 @@
+# domainscanner/distributed/runner.py
+"""
+Sharded scanning: a coordinator splits the candidate stream into shards by
+consistent hashing and N workers, local processes or processes on other
+hosts, pull shards from a shared work queue, run the analyzer stages and
+report the results back.
+
+Remote workers run:
+    python -m domainscanner.distributed.runner worker --queue sqlite:////shared/queue.db
+
+Local workers are spawned with a copy of the coordinator's settings, so
+they scan exactly as a batch run in the same process would. Remote workers
+use the config.py of their own host.
+"""
+
+import multiprocessing
+import os
+import socket
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .. import config
+from ..utils.journal import get_active_journal
+from .hashing import HashRing
+from .work_queue import WorkQueue, open_work_queue
+
+
+def process_shard(domains: List[str]) -> List[Tuple[str, dict]]:
+    """
+    Runs the new-domain analyzer stages on one shard.
+
+    Returns:
+        (domain, outcomes) for every domain, where outcomes holds 'available',
+        'short' and 'clean_history' (None when the stage was not reached).
+    """
+    # Imported here so the coordinator does not pay for the analyzer imports
+    from ..analyzers.metrics import filter_by_length
+    from ..stages import find_available_domains, find_clean_history_domains
+
+    available = set(find_available_domains(domains, show_progress=False))
+    short = set(filter_by_length(sorted(available)))
+    clean = set(find_clean_history_domains(sorted(short), show_progress=False))
+    return [
+        (domain, {
+            'available': domain in available,
+            'short': domain in short if domain in available else None,
+            'clean_history': domain in clean if domain in short else None,
+        })
+        for domain in domains
+    ]
+
+
+def config_snapshot() -> Dict[str, Any]:
+    """Returns the current value of every setting, including those changed at runtime."""
+    return {name: value for name, value in vars(config).items() if name.isupper()}
+
+
+def run_worker(queue_url: str, worker_id: Optional[str] = None, shards: Optional[Iterable[int]] = None,
+               rate_share: float = 1.0, process_func: Optional[Callable] = None,
+               poll_interval: float = 1.0, availability_backend: Optional[str] = None,
+               settings: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Pulls shards from the queue until the coordinator has closed the input
+    and every task is done.
+
+    Args:
+        queue_url: The work queue URL, see open_work_queue.
+        worker_id: A name for this worker. Defaults to host:pid.
+        shards: Optional shard ids this worker owns; others are left to other workers.
+        rate_share: Fraction of the configured endpoint rates this worker may use,
+            e.g. 1/N for N local workers sharing one egress IP.
+        process_func: The stage function, process_shard by default.
+        poll_interval: Seconds to wait when no task is available.
+        availability_backend: Overrides config.AVAILABILITY_BACKEND for this worker.
+        settings: Settings applied to config first, e.g. the coordinator's config_snapshot().
+
+    Returns:
+        The number of tasks this worker completed.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    process_func = process_func or process_shard
+    for name, value in (settings or {}).items():
+        setattr(config, name, value)
+    if availability_backend:
+        config.AVAILABILITY_BACKEND = availability_backend
+    if rate_share != 1.0:
+        config.RATE_LIMITS = {
+            endpoint: (rate * rate_share, max(1, int(burst * rate_share)))
+            for endpoint, (rate, burst) in config.RATE_LIMITS.items()
+        }
+    shards = list(shards) if shards is not None else None
+    queue = open_work_queue(queue_url)
+    completed = 0
+    while True:
+        task = queue.claim(worker_id, shards)
+        if task is None:
+            if queue.is_finished():
+                break
+            time.sleep(poll_interval)
+            continue
+        queue.complete(task, process_func(task.domains))
+        completed += 1
+    queue.close()
+    return completed
+
+
+def run_coordinator(queue: WorkQueue, candidates: Iterable[str], num_shards: Optional[int] = None,
+                    shard_size: Optional[int] = None, poll_interval: float = 1.0,
+                    workers: Optional[List[multiprocessing.Process]] = None) -> List[Tuple[str, dict]]:
+    """
+    Splits the candidate stream into shards, enqueues them and collects the
+    results reported by the workers.
+
+    Results are journaled as they arrive; when resuming, candidates already
+    decided by an interrupted run are taken from the journal and not queued.
+
+    Args:
+        workers: The local worker processes, if any. The run is aborted when
+            all of them have exited before the queue is finished.
+
+    Returns:
+        (domain, outcomes) for every candidate.
+
+    Raises:
+        RuntimeError: If every local worker exited with work left in the queue.
+    """
+    ring = HashRing(num_shards or config.DISTRIBUTED_SHARDS)
+    shard_size = shard_size or config.DISTRIBUTED_SHARD_SIZE
+    journal = get_active_journal()
+    decided = journal.results('distributed') if journal is not None else {}
+    buffers: Dict[int, List[str]] = defaultdict(list)
+    results = []
+    total = 0
+    for domain in candidates:
+        if domain in decided:
+            results.append((domain, decided[domain]))
+            continue
+        shard = ring.shard_for(domain)
+        buffers[shard].append(domain)
+        total += 1
+        if len(buffers[shard]) >= shard_size:
+            queue.put(shard, buffers.pop(shard))
+    for shard, domains in buffers.items():
+        queue.put(shard, domains)
+    queue.close_input()
+    if results:
+        print(f"Coordinator: {len(results)} candidates resumed from the journal.")
+    print(f"Coordinator: queued {total} candidates.")
+
+    resumed = len(results)
+    last_id = 0
+    while True:
+        # Checked before the queue: workers only exit on their own once it is finished
+        alive = workers is None or any(worker.is_alive() for worker in workers)
+        finished = queue.is_finished()
+        last_id, new_results = queue.results_since(last_id)
+        results.extend(new_results)
+        if new_results:
+            if journal is not None:
+                journal.record_many('distributed', new_results)
+            print(f"Coordinator: {len(results) - resumed}/{total} candidates processed.")
+        if finished and not new_results:
+            return results
+        if not alive and not finished:
+            exit_codes = ', '.join(str(worker.exitcode) for worker in workers)
+            raise RuntimeError(f"All local workers exited (exit codes {exit_codes}) with "
+                               f"{total - (len(results) - resumed)} candidates left in the queue")
+        time.sleep(poll_interval)
+
+
+def run_distributed(candidates: Iterable[str], num_workers: Optional[int] = None,
+                    queue_url: Optional[str] = None, process_func: Optional[Callable] = None,
+                    poll_interval: float = 1.0) -> List[Tuple[str, dict]]:
+    """
+    Runs a coordinator with `num_workers` local worker processes. With zero
+    local workers the coordinator only waits for remote workers.
+
+    Local workers share this host's egress IP, so each one gets 1/N of the
+    configured endpoint rates.
+    """
+    num_workers = config.DISTRIBUTED_WORKERS if num_workers is None else num_workers
+    queue_url = queue_url or config.DISTRIBUTED_QUEUE_URL
+    if queue_url.startswith('sqlite:///'):
+        # Every run starts from an empty queue
+        path = queue_url[len('sqlite:///'):]
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    queue = open_work_queue(queue_url)
+
+    context = multiprocessing.get_context('spawn')
+    settings = config_snapshot()
+    workers = [
+        context.Process(
+            target=run_worker, args=(queue_url, f"local-{i}"),
+            kwargs={'rate_share': 1.0 / num_workers, 'process_func': process_func,
+                    'poll_interval': poll_interval,
+                    # Spawned workers re-import config, so the run's settings are passed on
+                    'settings': settings},
+        )
+        for i in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        # Without local workers the coordinator waits for remote ones as long as it takes
+        results = run_coordinator(queue, candidates, poll_interval=poll_interval, workers=workers or None)
+    except BaseException:
+        # The input will never be closed, so the workers would wait forever
+        for worker in workers:
+            worker.terminate()
+        raise
+    finally:
+        for worker in workers:
+            worker.join()
+        queue.close()
+    return results
+
+
+def _parse_shards(value: str) -> List[int]:
+    """Parses '0-15,32' into a list of shard ids."""
+    shards = []
+    for part in value.split(','):
+        start, _, end = part.partition('-')
+        shards.extend(range(int(start), int(end or start) + 1))
+    return shards
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Distributed scanning worker.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    worker = subparsers.add_parser('worker', help="Pull shards from a shared queue and process them.")
+    worker.add_argument('--queue', default=config.DISTRIBUTED_QUEUE_URL, help="Work queue URL")
+    worker.add_argument('--worker-id')
+    worker.add_argument('--shards', type=_parse_shards, help="Shard ids owned by this worker, e.g. 0-15")
+    worker.add_argument('--rate-share', type=float, default=1.0,
+                        help="Fraction of the configured endpoint rates to use")
+    worker.add_argument('--availability-backend', choices=config.AVAILABILITY_BACKENDS,
+                        help="Overrides config.AVAILABILITY_BACKEND")
+    args = parser.parse_args()
+
+    done = run_worker(args.queue, args.worker_id, args.shards, args.rate_share,
+                      availability_backend=args.availability_backend)
+    print(f"[SUCCESS] Worker finished after {done} tasks.")
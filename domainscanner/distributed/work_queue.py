@@ -0,0 +1,154 @@
+# domainscanner/distributed/work_queue.py
+
+import json
+import sqlite3
+import time
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+
+class Task(NamedTuple):
+    task_id: int
+    shard: int
+    domains: List[str]
+
+
+class WorkQueue:
+    """
+    Interface of the shared work queue between the coordinator and the workers.
+    Implementations must make claim() atomic across processes and hosts.
+    """
+
+    def put(self, shard: int, domains: List[str]):
+        raise NotImplementedError
+
+    def close_input(self):
+        """Marks that the coordinator will not add more tasks."""
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, shards: Optional[Iterable[int]] = None) -> Optional[Task]:
+        """Claims a pending task (optionally only from the given shards), or returns None."""
+        raise NotImplementedError
+
+    def complete(self, task: Task, results: List[Tuple[str, dict]]):
+        """Stores a task's (domain, outcomes) results and marks it done."""
+        raise NotImplementedError
+
+    def is_finished(self) -> bool:
+        """True once the input is closed and every task is done."""
+        raise NotImplementedError
+
+    def results_since(self, last_id: int) -> Tuple[int, List[Tuple[str, dict]]]:
+        """Returns the results stored after `last_id` and the new last id."""
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    File-based work queue for workers sharing a filesystem.
+
+    Claimed tasks carry a lease; a task whose worker died is handed out again
+    once its lease (lease_seconds) has expired.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 600.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                shard INTEGER NOT NULL,
+                domains TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, shard);
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER NOT NULL,
+                domain TEXT NOT NULL,
+                outcomes TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    def put(self, shard: int, domains: List[str]):
+        self._conn.execute("INSERT INTO tasks (shard, domains) VALUES (?, ?)", (shard, json.dumps(domains)))
+
+    def close_input(self):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('input_closed', '1')")
+
+    def claim(self, worker_id: str, shards: Optional[Iterable[int]] = None) -> Optional[Task]:
+        now = time.time()
+        shard_filter, params = '', [now]
+        if shards is not None:
+            shards = list(shards)
+            shard_filter = f" AND shard IN ({','.join('?' * len(shards))})"
+            params.extend(shards)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                "SELECT id, shard, domains FROM tasks WHERE "
+                "(status = 'pending' OR (status = 'claimed' AND lease_until < ?))"
+                f"{shard_filter} ORDER BY id LIMIT 1",
+                params,
+            ).fetchone()
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+            self._conn.execute(
+                "UPDATE tasks SET status = 'claimed', worker = ?, lease_until = ? WHERE id = ?",
+                (worker_id, now + self.lease_seconds, row[0]),
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return Task(row[0], row[1], json.loads(row[2]))
+
+    def complete(self, task: Task, results: List[Tuple[str, dict]]):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A task re-claimed after an expired lease may be completed twice; keep the first
+            status = self._conn.execute("SELECT status FROM tasks WHERE id = ?", (task.task_id,)).fetchone()
+            if status and status[0] != 'done':
+                self._conn.executemany(
+                    "INSERT INTO results (task_id, domain, outcomes) VALUES (?, ?, ?)",
+                    [(task.task_id, domain, json.dumps(outcomes)) for domain, outcomes in results],
+                )
+                self._conn.execute("UPDATE tasks SET status = 'done' WHERE id = ?", (task.task_id,))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def is_finished(self) -> bool:
+        closed = self._conn.execute("SELECT value FROM meta WHERE key = 'input_closed'").fetchone()
+        if not closed:
+            return False
+        remaining = self._conn.execute("SELECT COUNT(*) FROM tasks WHERE status != 'done'").fetchone()[0]
+        return remaining == 0
+
+    def results_since(self, last_id: int) -> Tuple[int, List[Tuple[str, dict]]]:
+        rows = self._conn.execute(
+            "SELECT id, domain, outcomes FROM results WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+        if rows:
+            last_id = rows[-1][0]
+        return last_id, [(domain, json.loads(outcomes)) for _, domain, outcomes in rows]
+
+    def close(self):
+        self._conn.close()
+
+
+def open_work_queue(url: str) -> WorkQueue:
+    """
+    Opens a work queue from a URL. Only 'sqlite:///path/to/queue.db' is
+    built in; other backends can be added here behind the WorkQueue interface.
+    """
+    if url.startswith('sqlite:///'):
+        return SQLiteWorkQueue(url[len('sqlite:///'):])
+    raise ValueError(f"Unsupported work queue URL: {url}")
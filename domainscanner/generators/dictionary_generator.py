@@ -1,24 +1,22 @@
 # domainscanner/generators/dictionary_generator.py
 
 from .. import config
+from .engine import iter_combinations, iter_words
 
-def generate_dictionary_domains():
+def iter_dictionary_domains():
     """
-    Generates domain names by taking words from a dictionary file.
+    Lazily yields domain names by reading words from a dictionary file line by line.
     """
     try:
-        with open(config.DICTIONARY_FILE, 'r') as f:
-            words = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        yield from iter_combinations(iter_words(config.DICTIONARY_FILE))
     except FileNotFoundError:
         print(f"Error: Dictionary file not found at {config.DICTIONARY_FILE}")
-        return []
 
-    generated_domains = []
-    for word in words:
-        for tld in config.DEFAULT_TLDS:
-            generated_domains.append(f"{word}{tld}")
-    
-    return generated_domains
+def generate_dictionary_domains():
+    """
+    Generates domain names by taking words from a dictionary file.
+    """
+    return list(iter_dictionary_domains())
 
 if __name__ == '__main__':
     print("Generating domains from dictionary file...")
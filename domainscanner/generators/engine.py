@@ -0,0 +1,107 @@
+# domainscanner/generators/engine.py
+
+import hashlib
+import math
+from typing import Iterable, Iterator, Optional, Sequence
+
+from .. import config
+
+
+class BloomFilter:
+    """
+    Memory-bounded set membership with a configurable false positive rate.
+    Used to dedupe candidates across generators without storing every string.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> bool:
+        """Adds an item. Returns True if it was (probably) already present."""
+        present = True
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False
+                self.bits[byte] |= 1 << bit
+        return present
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p // 8] & (1 << (p % 8)) for p in self._positions(item))
+
+
+def iter_words(path: str) -> Iterator[str]:
+    """Lazily yields the non-empty, non-comment lines of a word file."""
+    with open(path, 'r') as f:
+        for line in f:
+            word = line.strip()
+            if word and not word.startswith('#'):
+                yield word
+
+
+def iter_combinations(keywords: Iterable[str], prefixes: Sequence[str] = ('',),
+                      suffixes: Sequence[str] = ('',), tlds: Optional[Sequence[str]] = None,
+                      max_length: Optional[int] = None) -> Iterator[str]:
+    """
+    Lazily enumerates prefix + keyword + suffix + tld for every keyword.
+
+    Names longer than max_length (excluding the TLD) are pruned during
+    enumeration, so they never reach the network checks.
+
+    Args:
+        keywords: The keywords; may be a generator (e.g. iter_words).
+        prefixes: Strings put in front of each keyword.
+        suffixes: Strings appended to each keyword.
+        tlds: The TLDs. Defaults to config.DEFAULT_TLDS.
+        max_length: The maximum name length. Defaults to config.MAX_DOMAIN_LENGTH.
+
+    Yields:
+        Domain names.
+    """
+    tlds = tlds or config.DEFAULT_TLDS
+    max_length = max_length or config.MAX_DOMAIN_LENGTH
+    # Sorted by length so the inner loops can stop at the first name that is too long
+    prefixes = sorted(prefixes, key=len)
+    suffixes = sorted(suffixes, key=len)
+    for keyword in keywords:
+        keyword = keyword.lower()
+        for prefix in prefixes:
+            if len(prefix) + len(keyword) > max_length:
+                break
+            for suffix in suffixes:
+                if len(prefix) + len(keyword) + len(suffix) > max_length:
+                    break
+                base_name = f"{prefix}{keyword}{suffix}"
+                for tld in tlds:
+                    yield f"{base_name}{tld}"
+
+
+def iter_unique(domains: Iterable[str], capacity: Optional[int] = None,
+                error_rate: Optional[float] = None) -> Iterator[str]:
+    """
+    Skips domains already seen, using a Bloom filter sized from config.
+    A small fraction (error_rate) of unique domains may be skipped as well.
+    """
+    seen = BloomFilter(capacity or config.BLOOM_CAPACITY, error_rate or config.BLOOM_ERROR_RATE)
+    for domain in domains:
+        if not seen.add(domain):
+            yield domain
+
+
+if __name__ == '__main__':
+    import itertools
+
+    domains = iter_combinations(['ai', 'crypto', 'green', 'ai'], suffixes=config.DOMAIN_SUFFIXES)
+    unique = list(iter_unique(domains, capacity=1000))
+    print(f"Generated {len(unique)} unique domains.")
+    for domain in itertools.islice(unique, 10):
+        print(domain)
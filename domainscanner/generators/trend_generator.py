@@ -1,28 +1,23 @@
 # src/generators/trend_generator.py
 
 from .. import config
+from .engine import iter_combinations, iter_words
 
-def generate_trend_domains():
+def iter_trend_domains():
     """
-    Generates domain names by combining trending keywords with common suffixes.
+    Lazily yields domain names by combining trending keywords with common suffixes.
     """
     try:
-        with open(config.TREND_KEYWORDS_FILE, 'r') as f:
-            trends = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        yield from iter_combinations(iter_words(config.TREND_KEYWORDS_FILE),
+                                     prefixes=config.DOMAIN_PREFIXES, suffixes=config.DOMAIN_SUFFIXES)
     except FileNotFoundError:
         print(f"Error: Trend keywords file not found at {config.TREND_KEYWORDS_FILE}")
-        return []
 
-    suffixes = ['solutions', 'labs', 'future', 'systems', 'tech', 'works', 'group', 'ventures']
-    
-    generated_domains = []
-    for trend in trends:
-        for suffix in suffixes:
-            base_name = f"{trend}{suffix}"
-            for tld in config.DEFAULT_TLDS:
-                generated_domains.append(f"{base_name}{tld}")
-    
-    return generated_domains
+def generate_trend_domains():
+    """
+    Generates domain names by combining trending keywords with common suffixes.
+    """
+    return list(iter_trend_domains())
 
 if __name__ == '__main__':
     print("Generating domains from trend words...")
@@ -1,58 +1,186 @@
 # src/parsers/expired_domains_parser.py
 
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional
+
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .. import config
+from ..utils.http import get_session
+from ..utils.metrics import timed
+from ..utils.rate_limit import backoff_delay, get_bucket
+
+try:
+    import lxml  # noqa: F401 -- only used as the BeautifulSoup backend
+    _PARSER = 'lxml'
+except ImportError:
+    _PARSER = 'html.parser'
+
+# Only build the tree for the results table
+_TABLE_STRAINER = SoupStrainer('table', {'class': 'base1'})
+
+ENDPOINT = 'expireddomains.net'
 
-def get_expired_domains():
+
+def _cache_paths(url: str):
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    base = os.path.join(config.EXPIRED_PAGE_CACHE_DIR, key)
+    return base + '.html', base + '.json'
+
+
+def _fetch_page(url: str) -> Optional[bytes]:
     """
-    Parses ExpiredDomains.net to get a list of recently expired or deleted domains.
-    
-    NOTE: This is a basic implementation for demonstration.
-    Scraping websites can be against their terms of service.
-    A more robust solution would use an official API if available.
+    Fetches a page with a conditional GET. Unchanged pages (304) are served
+    from the local page cache. Returns None on network errors.
     """
-    
-    # This URL is for .com domains deleted and available for registration
-    url = "https://www.expireddomains.net/deleted-com-domains/"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
+    body_path, meta_path = _cache_paths(url)
+    headers = {}
+    if os.path.exists(body_path) and os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    get_bucket(ENDPOINT).acquire()
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status() # Raise an exception for bad status codes
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find the table containing the domains
-        # The exact selectors might change if the website layout changes
-        domain_table = soup.find('table', {'class': 'base1'})
-        
-        if not domain_table:
-            print("Could not find the domain table on the page.")
-            return []
-            
-        domains = []
-        # Find all 'a' tags that are links to domain details
-        for link in domain_table.find_all('a', title=True):
-            domain_name = link.text
-            if '.' in domain_name: # Basic check to see if it's a domain
-                domains.append(domain_name)
-                
-        return domains
-        
+        with timed('expired_page', ENDPOINT):
+            response = get_session().get(url, headers=headers, timeout=config.HTTP_TIMEOUT)
+        if response.status_code == 304:
+            with open(body_path, 'rb') as f:
+                return f.read()
+        response.raise_for_status()
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data from {url}: {e}")
+        return None
+
+    if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+        os.makedirs(config.EXPIRED_PAGE_CACHE_DIR, exist_ok=True)
+        with open(body_path, 'wb') as f:
+            f.write(response.content)
+        with open(meta_path, 'w') as f:
+            json.dump({
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }, f)
+    return response.content
+
+
+def _parse_domains(html: bytes) -> List[str]:
+    """Extracts the domain names from the results table of a page."""
+    soup = BeautifulSoup(html, _PARSER, parse_only=_TABLE_STRAINER)
+    # The exact selectors might change if the website layout changes
+    domain_table = soup.find('table', {'class': 'base1'})
+    if not domain_table:
         return []
+    domains = []
+    # Find all 'a' tags that are links to domain details
+    for link in domain_table.find_all('a', title=True):
+        domain_name = link.text
+        if '.' in domain_name: # Basic check to see if it's a domain
+            domains.append(domain_name)
+    return domains
+
+
+def _page_url(base_url: str, list_name: str, page: int) -> str:
+    url = f"{base_url.rstrip('/')}/{list_name}/"
+    if page:
+        url += f"?start={page * config.EXPIRED_DOMAINS_PAGE_SIZE}"
+    return url
+
+
+def iter_expired_domains(base_url: Optional[str] = None) -> Iterator[str]:
+    """
+    Walks every page of every list in config.EXPIRED_DOMAINS_LISTS
+    concurrently and yields domains as soon as their page is parsed.
+
+    NOTE: Scraping websites can be against their terms of service.
+    A more robust solution would use an official API if available.
+
+    Args:
+        base_url: Optional site root, e.g. a local stub server.
+    """
+    base_url = base_url or config.EXPIRED_DOMAINS_BASE_URL
+    max_pages = config.EXPIRED_DOMAINS_MAX_PAGES
+    next_page = {}
+    exhausted = set()
+    seen = set()
+
+    def fetch_and_parse(url):
+        # None only when every attempt failed, unlike an empty page past the end of the list
+        for attempt in range(config.MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(backoff_delay(attempt - 1))
+            html = _fetch_page(url)
+            if html is not None:
+                return _parse_domains(html)
+        return None
+
+    with ThreadPoolExecutor(max_workers=config.EXPIRED_DOMAINS_CONCURRENCY) as executor:
+        in_flight = {}
+
+        def submit(list_name):
+            page = next_page[list_name]
+            next_page[list_name] += 1
+            future = executor.submit(fetch_and_parse, _page_url(base_url, list_name, page))
+            in_flight[future] = (list_name, page)
+
+        # Start a window of pages per list; more are requested as pages come back full
+        for list_name in config.EXPIRED_DOMAINS_LISTS:
+            next_page[list_name] = 0
+            for _ in range(min(config.EXPIRED_DOMAINS_CONCURRENCY, max_pages)):
+                submit(list_name)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                list_name, page = in_flight.pop(future)
+                domains = future.result()
+                if domains is None:
+                    print(f"[WARNING] Page {page + 1} of {list_name} could not be fetched after "
+                          f"{config.MAX_ATTEMPTS} attempts; its rows are missing and the list is cut short.")
+                    exhausted.add(list_name)
+                elif len(domains) < config.EXPIRED_DOMAINS_PAGE_SIZE:
+                    # Past the last page: stop walking this list
+                    exhausted.add(list_name)
+                elif list_name not in exhausted and next_page[list_name] < max_pages:
+                    submit(list_name)
+                for domain in domains or []:
+                    if domain not in seen:
+                        seen.add(domain)
+                        yield domain
+
+
+def get_expired_domains(base_url: Optional[str] = None) -> List[str]:
+    """
+    Parses ExpiredDomains.net to get a list of recently expired or deleted domains.
+    """
+    return list(iter_expired_domains(base_url))
+
 
 if __name__ == '__main__':
-    print("Fetching expired .com domains...")
-    expired_domains = get_expired_domains()
-    if expired_domains:
-        print(f"Found {len(expired_domains)} domains.")
-        # Print the first 10 for a sample
-        for domain in expired_domains[:10]:
-            print(domain)
-    else:
-        print("No domains found or an error occurred.") 
\ No newline at end of file
+    import tempfile
+    import time
+
+    from ..utils.stub_servers import StubExpiredDomainsServer
+
+    listings = {
+        list_name: [f"stub{list_name[8:11]}{i}.{list_name[8:11]}" for i in range(1000)]
+        for list_name in config.EXPIRED_DOMAINS_LISTS
+    }
+    config.EXPIRED_PAGE_CACHE_DIR = tempfile.mkdtemp()
+    config.RATE_LIMITS[ENDPOINT] = (1000.0, 1000)
+    with StubExpiredDomainsServer(listings, config.EXPIRED_DOMAINS_PAGE_SIZE) as (host, port):
+        for run in ('cold', 'warm'):
+            start = time.perf_counter()
+            expired_domains = get_expired_domains(f"http://{host}:{port}")
+            elapsed = time.perf_counter() - start
+            print(f"[{run}] Found {len(expired_domains)} domains in {elapsed:.2f}s "
+                  f"({len(expired_domains) / elapsed:.0f} rows/s, parser: {_PARSER}).")
+    print(expired_domains[:10])
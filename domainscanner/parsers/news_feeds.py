@@ -0,0 +1,303 @@
+# domainscanner/parsers/news_feeds.py
+"""
+News feed ingestion. The feeds of config.NEWS_SOURCES are fetched
+concurrently over the shared connection pool with conditional GETs, so an
+unchanged feed costs one 304 answer. Only items whose GUID was not seen
+before are tokenized, and their keywords are added to running counts that
+decay with a half-life of config.NEWS_KEYWORD_HALF_LIFE seconds. The
+keywords mentioned most often lately, rather than every word of the
+current headlines, drive the news generator.
+
+The decayed counts use forward decay: a mention at time t adds
+2 ** ((t - epoch) / half_life) to the weight of its keyword, and the
+current score is weight * 2 ** (-(now - epoch) / half_life). Weights never
+have to be updated as time passes, ranking by weight is ranking by score,
+and the epoch is moved forward before the weights get too large.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from .. import config
+from ..generators.engine import iter_words
+from ..utils.http import get_session
+from ..utils.metrics import timed
+from ..utils.rate_limit import get_bucket
+
+_WORD_RE = re.compile(r'\w+')
+# Weights are rebased once the epoch is this many half-lives old, far below the float range
+_MAX_EPOCH_AGE = 64
+
+_stop_words = None
+
+
+def get_stop_words() -> FrozenSet[str]:
+    """Returns the bundled stopword list (config.STOPWORDS_FILE), read once."""
+    global _stop_words
+    if _stop_words is None:
+        try:
+            _stop_words = frozenset(word.lower() for word in iter_words(config.STOPWORDS_FILE))
+        except FileNotFoundError:
+            print(f"[WARNING] Stopword list not found at {config.STOPWORDS_FILE}; keeping every keyword.")
+            _stop_words = frozenset()
+    return _stop_words
+
+
+def extract_keywords(headline: str) -> FrozenSet[str]:
+    """Returns the distinct keywords of a headline: words longer than 3 letters, not numbers or stopwords."""
+    stop_words = get_stop_words()
+    return frozenset(word for word in _WORD_RE.findall(headline.lower())
+                     if len(word) > 3 and not word.isdigit() and word not in stop_words)
+
+
+class FeedResponse(NamedTuple):
+    url: str
+    status: Optional[int]  # None when the request failed
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_feed(content: bytes) -> List[Tuple[str, str]]:
+    """
+    Returns the (guid, title) of every item of an RSS or Atom document.
+    Items without a GUID are identified by their link, then by their title.
+    Raises xml.etree.ElementTree.ParseError if the document is not XML.
+    """
+    root = ET.fromstring(content)
+    items = []
+    for element in root.iter():
+        if _local_name(element.tag) not in ('item', 'entry'):
+            continue
+        fields = {}
+        for child in element:
+            name = _local_name(child.tag)
+            if name == 'link' and child.get('href'):
+                fields.setdefault('link', child.get('href'))
+            elif child.text and child.text.strip():
+                fields.setdefault(name, child.text.strip())
+        title = fields.get('title')
+        if title:
+            items.append((fields.get('guid') or fields.get('id') or fields.get('link') or title, title))
+    return items
+
+
+def _fetch_feed(url: str, etag: Optional[str], last_modified: Optional[str]) -> FeedResponse:
+    """Fetches a feed with a conditional GET; a 304 answer comes back without content."""
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    host = urlparse(url).netloc
+    get_bucket(host).acquire()
+    try:
+        with timed('news_feed', host):
+            response = get_session().get(url, headers=headers, timeout=config.HTTP_TIMEOUT)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching news from {url}: {e}")
+        return FeedResponse(url, None, b'', etag, last_modified)
+    return FeedResponse(url, response.status_code, response.content,
+                        response.headers.get('ETag', etag), response.headers.get('Last-Modified', last_modified))
+
+
+class NewsState:
+    """
+    Persistent state of the news ingestion: the validators of every feed,
+    the GUIDs of the items already tokenized and the decayed keyword counts.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.NEWS_STATE_FILE
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS feeds (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS items (
+                feed TEXT NOT NULL,
+                guid TEXT NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (feed, guid)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS items_seen_at ON items (seen_at);
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword TEXT PRIMARY KEY,
+                weight REAL NOT NULL,
+                last_seen REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS keywords_weight ON keywords (weight);
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('epoch', ?)", (time.time(),))
+
+    def _epoch(self) -> float:
+        return self._conn.execute("SELECT value FROM meta WHERE name = 'epoch'").fetchone()[0]
+
+    def _growth(self, now: float) -> float:
+        """2 ** ((now - epoch) / half_life): the weight of one mention made now."""
+        return 2.0 ** ((now - self._epoch()) / config.NEWS_KEYWORD_HALF_LIFE)
+
+    def validators(self) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Returns the (ETag, Last-Modified) of every feed fetched before."""
+        with self._lock:
+            return {url: (etag, last_modified) for url, etag, last_modified in
+                    self._conn.execute("SELECT url, etag, last_modified FROM feeds")}
+
+    def record_feed(self, response: FeedResponse, items: Iterable[Tuple[str, str]]) -> List[str]:
+        """Stores the validators of a fetched feed and returns the titles of its items not seen before."""
+        now = time.time()
+        new_titles = []
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO feeds (url, etag, last_modified, fetched_at) "
+                               "VALUES (?, ?, ?, ?)", (response.url, response.etag, response.last_modified, now))
+            for guid, title in items:
+                cursor = self._conn.execute("INSERT OR IGNORE INTO items (feed, guid, seen_at) VALUES (?, ?, ?)",
+                                            (response.url, guid, now))
+                if cursor.rowcount:
+                    new_titles.append(title)
+        return new_titles
+
+    def add_mentions(self, counts: Counter, now: Optional[float] = None):
+        """Adds `count` mentions made at `now` to every keyword of `counts`."""
+        now = now if now is not None else time.time()
+        with self._lock, self._conn:
+            if (now - self._epoch()) / config.NEWS_KEYWORD_HALF_LIFE > _MAX_EPOCH_AGE:
+                self._rebase(now)
+            growth = self._growth(now)
+            self._conn.executemany(
+                "INSERT INTO keywords (keyword, weight, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT (keyword) DO UPDATE SET weight = weight + excluded.weight, last_seen = excluded.last_seen",
+                [(keyword, count * growth, now) for keyword, count in counts.items()])
+
+    def _rebase(self, now: float):
+        """Moves the epoch to `now`, scaling every weight down to its current score."""
+        factor = 1.0 / self._growth(now)
+        self._conn.execute("UPDATE keywords SET weight = weight * ?", (factor,))
+        self._conn.execute("UPDATE meta SET value = ? WHERE name = 'epoch'", (now,))
+
+    def trending(self, limit: Optional[int] = None, min_score: float = 0.0,
+                 now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Returns up to `limit` (keyword, decayed count) pairs scoring at least `min_score`, highest first."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            growth = self._growth(now)
+            rows = self._conn.execute(
+                "SELECT keyword, weight FROM keywords WHERE weight >= ? ORDER BY weight DESC, keyword LIMIT ?",
+                (min_score * growth, -1 if limit is None else limit)).fetchall()
+        return [(keyword, weight / growth) for keyword, weight in rows]
+
+    def prune(self, now: Optional[float] = None):
+        """Forgets the GUIDs older than config.NEWS_SEEN_ITEM_RETENTION and the keywords decayed to nothing."""
+        now = now if now is not None else time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM items WHERE seen_at < ?", (now - config.NEWS_SEEN_ITEM_RETENTION,))
+            self._conn.execute("DELETE FROM keywords WHERE weight < ?",
+                               (config.NEWS_PRUNE_SCORE * self._growth(now),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def ingest_feeds(urls: List[str], state: NewsState) -> Dict[str, int]:
+    """
+    Fetches the feeds concurrently (config.NEWS_FETCH_WORKERS at a time) and
+    counts the keywords of their new items. Returns the number of feeds
+    fetched, unchanged and failed, and of new items.
+    """
+    stats = {'fetched': 0, 'unchanged': 0, 'failed': 0, 'new_items': 0}
+    if not urls:
+        return stats
+    validators = state.validators()
+    counts = Counter()
+    with ThreadPoolExecutor(max_workers=min(config.NEWS_FETCH_WORKERS, len(urls))) as executor:
+        futures = [executor.submit(_fetch_feed, url, *validators.get(url, (None, None))) for url in urls]
+        # Parsed and counted as the answers arrive, while the slower feeds are still downloading
+        for future in as_completed(futures):
+            response = future.result()
+            if response.status is None:
+                stats['failed'] += 1
+                continue
+            if response.status == 304:
+                stats['unchanged'] += 1
+                continue
+            try:
+                items = parse_feed(response.content)
+            except ET.ParseError as e:
+                print(f"[WARNING] {response.url} is not an RSS or Atom feed: {e}")
+                stats['failed'] += 1
+                continue
+            stats['fetched'] += 1
+            for title in state.record_feed(response, items):
+                stats['new_items'] += 1
+                counts.update(extract_keywords(title))
+    state.add_mentions(counts)
+    state.prune()
+    return stats
+
+
+def get_trending_keywords(urls: Optional[List[str]] = None) -> List[str]:
+    """
+    Ingests the feeds (config.NEWS_SOURCES by default) and returns the
+    trending keywords, highest decayed count first: at most
+    config.NEWS_TRENDING_LIMIT of them, scoring at least config.NEWS_MIN_KEYWORD_SCORE.
+    """
+    urls = config.NEWS_SOURCES if urls is None else urls
+    state = NewsState()
+    try:
+        stats = ingest_feeds(urls, state)
+        keywords = state.trending(config.NEWS_TRENDING_LIMIT, config.NEWS_MIN_KEYWORD_SCORE)
+    finally:
+        state.close()
+    print(f"News: {stats['fetched']} feeds fetched, {stats['unchanged']} unchanged, {stats['failed']} failed; "
+          f"{stats['new_items']} new headlines, {len(keywords)} trending keywords.")
+    return [keyword for keyword, _ in keywords]
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    from ..utils.stub_servers import StubRSSServer
+
+    topics = ['quantum', 'robotics', 'fusion', 'genome', 'battery', 'satellite', 'vaccine', 'chipset']
+    feeds = {f"feed{i}": [f"{topics[(i + j) % len(topics)].capitalize()} startup raises funding round {j}"
+                          for j in range(30)] for i in range(200)}
+    config.NEWS_STATE_FILE = os.path.join(tempfile.mkdtemp(), 'news.sqlite3')
+    config.STOPWORDS_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'stopwords.txt')
+    with StubRSSServer(feeds, latency=0.05) as (host, port):
+        config.RATE_LIMITS[f"{host}:{port}"] = (1000.0, 1000)
+        urls = [f"http://{host}:{port}/{name}.xml" for name in feeds]
+        for run in ('cold', 'warm'):
+            start = time.perf_counter()
+            keywords = get_trending_keywords(urls)
+            print(f"[{run}] {len(urls)} feeds in {time.perf_counter() - start:.2f}s; top keywords: {keywords[:8]}")
@@ -1,36 +1,245 @@
-from typing import List
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import requests
+
 from .. import config
+from ..utils.http import get_session
+from ..utils.metrics import ERRORS, QUEUE_DEPTH, RETRIES, timed
+from ..utils.rate_limit import RetryableError, backoff_delay, get_bucket
+from .outbox import Outbox
 
-def list_domain_on_marketplaces(domain: str):
+_active_publisher = None
+
+
+class ListingRejectedError(Exception):
+    """Raised when a marketplace refuses a batch for good (e.g. invalid request or credentials)."""
+
+
+class MarketplaceClient:
     """
-    Simulates listing a single domain on various marketplaces.
-    In a real implementation, this would make API calls to Sedo, Dan.com, etc.
+    Bulk listing API of one marketplace, configured in config.MARKETPLACES.
+    Without an API key, listings are simulated.
+    """
+
+    def __init__(self, name: str, url: str, api_key: str, batch_size: int):
+        self.name = name
+        self.url = url
+        self.api_key = api_key
+        self.batch_size = batch_size
+
+    @property
+    def display_name(self) -> str:
+        return self.name.capitalize()
+
+    def submit(self, domains: Sequence[str]) -> Dict[str, str]:
+        """
+        Lists a batch of domains with one request. Every listing carries an
+        idempotency key, so a batch sent twice is only listed once.
+
+        Returns:
+            domain -> listing id for every domain the marketplace accepted.
+        Raises:
+            RetryableError on network errors, rate limiting and server errors.
+            ListingRejectedError when the marketplace refuses the batch.
+        """
+        if not self.api_key:
+            for domain in domains:
+                print(f"[SIMULATING] Listing {domain} on {self.display_name} (API key not set).")
+            return {domain: f"simulated-{domain}" for domain in domains}
+
+        payload = {'listings': [
+            {'domain': domain, 'idempotency_key': f"{self.name}:{domain}"} for domain in domains
+        ]}
+        try:
+            response = get_session().post(self.url, json=payload, timeout=config.HTTP_TIMEOUT,
+                                          headers={'Authorization': f"Bearer {self.api_key}"})
+        except requests.exceptions.RequestException as e:
+            raise RetryableError(f"{self.display_name} listing request failed: {e}") from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableError(f"{self.display_name} answered {response.status_code}")
+        if response.status_code >= 400:
+            raise ListingRejectedError(f"{self.display_name} rejected the batch: {response.status_code}")
+        try:
+            results = response.json()['results']
+        except (ValueError, KeyError) as e:
+            raise RetryableError(f"Invalid {self.display_name} response: {e}") from e
+        return {result['domain']: str(result['listing_id']) for result in results if result.get('listing_id')}
+
+
+def get_marketplace_clients() -> List[MarketplaceClient]:
+    """Builds a client for every marketplace in config.MARKETPLACES."""
+    return [
+        MarketplaceClient(name, settings['url'], getattr(config, settings['api_key'], ''),
+                          settings.get('batch_size', 50))
+        for name, settings in config.MARKETPLACES.items()
+    ]
+
+
+class MarketplacePublisher:
+    """
+    Publishes domains in the background so scanning never waits on the
+    marketplaces.
+
+    submit() only writes the domain to the persistent outbox. Worker threads
+    (config.PUBLISH_WORKERS per marketplace) claim pending listings in batches,
+    send them within the marketplace's rate limit and retry failed batches
+    with backoff. Listings still pending when the process stops are sent by
+    the next run. Listings of a marketplace without an API key are only
+    simulated, and are sent for real by the first run that has the key.
     """
-    print(f"\n--- 📤 Publishing Domain: {domain} ---")
 
-    # Simulate listing on Sedo
-    if config.SEDO_API_KEY:
-        # Real implementation would use the API key to authenticate and list
-        print(f"[SUCCESS] Listed {domain} on Sedo.com.")
-    else:
-        print(f"[SIMULATING] Listing {domain} on Sedo.com (SEDO_API_KEY not set).")
+    def __init__(self, clients: Optional[List[MarketplaceClient]] = None, outbox: Optional[Outbox] = None,
+                 workers: Optional[int] = None):
+        self.clients = clients if clients is not None else get_marketplace_clients()
+        self.outbox = outbox or Outbox()
+        self.workers = workers or config.PUBLISH_WORKERS
+        self._wakeup = threading.Event()
+        self._closing = threading.Event()
+        self._abandon = threading.Event()
+        self._threads: List[threading.Thread] = []
 
-    # Simulate listing on Dan.com
-    if config.DAN_API_KEY:
-        print(f"[SUCCESS] Listed {domain} on Dan.com.")
-    else:
-        print(f"[SIMULATING] Listing {domain} on Dan.com (DAN_API_KEY not set).")
+    def start(self):
+        for client in self.clients:
+            if client.api_key:
+                requeued = self.outbox.requeue_simulated(client.name)
+                if requeued:
+                    print(f"{client.display_name} API key set: sending {requeued} listings only simulated before.")
+            for worker in range(self.workers):
+                thread = threading.Thread(target=self._work, args=(client,),
+                                          name=f'publisher-{client.name}-{worker}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
 
-    # In a real scenario, you might have different logic for each marketplace
-    # and handle their specific responses and error conditions.
-    return
+    def submit(self, domain: str):
+        """Queues a domain for every marketplace; returns immediately."""
+        if self.outbox.enqueue(domain, [client.name for client in self.clients]):
+            self._wakeup.set()
+
+    def _work(self, client: MarketplaceClient):
+        while not self._abandon.is_set():
+            rows = self.outbox.claim(client.name, client.batch_size)
+            if not rows:
+                if self._closing.is_set() and not self.outbox.pending_count(client.name):
+                    return
+                next_due = self.outbox.next_due(client.name)
+                timeout = min(1.0, max(0.0, next_due - time.time())) if next_due else 1.0
+                self._wakeup.wait(timeout)
+                if not self._closing.is_set():
+                    self._wakeup.clear()
+                continue
+            QUEUE_DEPTH.labels(f'publish:{client.name}').set(self.outbox.pending_count(client.name))
+            self._send(client, rows)
+
+    def _send(self, client: MarketplaceClient, rows):
+        domains = [domain for domain, _ in rows]
+        get_bucket(client.name).acquire()
+        try:
+            with timed('publish', client.name):
+                listing_ids = client.submit(domains)
+        except RetryableError as e:
+            RETRIES.labels('publish', client.name).inc()
+            attempt = max(attempts for _, attempts in rows)
+            self.outbox.mark_retry(client.name, domains, backoff_delay(attempt), str(e))
+            return
+        except ListingRejectedError as e:
+            ERRORS.labels('publish', client.name).inc(len(domains))
+            print(f"[ERROR] {e}")
+            self.outbox.mark_failed(client.name, domains, str(e))
+            return
+        if not client.api_key:
+            self.outbox.mark_simulated(client.name, list(listing_ids))
+            return
+        self.outbox.mark_listed(client.name, listing_ids)
+        missing = [domain for domain in domains if domain not in listing_ids]
+        if missing:
+            attempt = max(attempts for _, attempts in rows)
+            self.outbox.mark_retry(client.name, missing, backoff_delay(attempt), "Not in the response")
+        for domain in listing_ids:
+            print(f"[SUCCESS] Listed {domain} on {client.display_name}.")
+
+    def close(self, wait: bool = True, timeout: Optional[float] = None):
+        """
+        Stops the workers. With wait, pending listings are sent first, for at
+        most `timeout` seconds (config.PUBLISH_DRAIN_TIMEOUT); whatever is
+        left stays in the outbox for the next run.
+        """
+        self._closing.set()
+        if not wait:
+            self._abandon.set()
+        self._wakeup.set()
+        deadline = time.monotonic() + (timeout if timeout is not None else config.PUBLISH_DRAIN_TIMEOUT)
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._abandon.set()
+        for thread in self._threads:
+            thread.join()
+        for marketplace, counts in sorted(self.outbox.counts().items()):
+            summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+            print(f"Publishing on {marketplace}: {summary}.")
+        self.outbox.close()
+
+
+def start_publisher() -> MarketplacePublisher:
+    """Starts the background publisher of the current run."""
+    global _active_publisher
+    _active_publisher = MarketplacePublisher()
+    _active_publisher.start()
+    return _active_publisher
+
+
+def get_active_publisher() -> Optional[MarketplacePublisher]:
+    """Returns the background publisher of the current run, or None if none was started."""
+    return _active_publisher
+
+
+def close_publisher(wait: bool = True):
+    global _active_publisher
+    if _active_publisher is not None:
+        _active_publisher.close(wait)
+        _active_publisher = None
+
+
+def list_domain_on_marketplaces(domain: str):
+    """
+    Lists a single domain on every configured marketplace. With a background
+    publisher running, the domain is only queued; otherwise it is listed
+    right away.
+    """
+    publisher = get_active_publisher()
+    if publisher is not None:
+        publisher.submit(domain)
+        return
+
+    print(f"\n--- 📤 Publishing Domain: {domain} ---")
+    for client in get_marketplace_clients():
+        get_bucket(client.name).acquire()
+        try:
+            if domain not in client.submit([domain]):
+                print(f"[ERROR] {client.display_name} did not accept {domain}.")
+        except (RetryableError, ListingRejectedError) as e:
+            print(f"[ERROR] Could not list {domain} on {client.display_name}: {e}")
 
 if __name__ == '__main__':
+    import os
+    import tempfile
+
+    from ..utils.stub_servers import StubMarketplaceServer
+
     test_domains = ['mynewapp.io', 'supercrypto.ai']
     print("--- Testing Marketplace Lister ---")
     for d in test_domains:
         list_domain_on_marketplaces(d)
-    
-    print("\n--- Testing with simulated API Key ---")
-    config.SEDO_API_KEY = "dummy-key" # Simulate having a key
-    list_domain_on_marketplaces('real-deal.com') 
\ No newline at end of file
+
+    print("\n--- Testing the background publisher against stub marketplaces ---")
+    with StubMarketplaceServer() as (sedo_host, sedo_port), StubMarketplaceServer() as (dan_host, dan_port), \
+            tempfile.TemporaryDirectory() as tmp:
+        config.MARKETPLACES['sedo.com']['url'] = f"http://{sedo_host}:{sedo_port}/listings/bulk"
+        config.MARKETPLACES['dan.com']['url'] = f"http://{dan_host}:{dan_port}/listings/bulk"
+        config.SEDO_API_KEY = config.DAN_API_KEY = "dummy-key"  # Simulate having keys
+        config.PUBLISH_OUTBOX_FILE = os.path.join(tmp, 'outbox.sqlite3')
+        start_publisher()
+        for d in test_domains + ['real-deal.com']:
+            list_domain_on_marketplaces(d)
+        close_publisher()
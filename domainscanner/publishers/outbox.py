@@ -0,0 +1,164 @@
+# domainscanner/publishers/outbox.py
+
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from .. import config
+
+PENDING = 'pending'
+SENDING = 'sending'
+LISTED = 'listed'
+FAILED = 'failed'
+SIMULATED = 'simulated'  # "Listed" without an API key; sent for real once the key is set
+
+
+class Outbox:
+    """
+    Persistent outbox of marketplace listings, one row per (marketplace, domain).
+
+    A domain is only ever enqueued once per marketplace, so re-running a scan
+    never lists it twice. Rows being sent when the process died are put back
+    to pending on the next start; the submission carries an idempotency key,
+    so the marketplace ignores a listing it already received.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.PUBLISH_OUTBOX_FILE
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS listings (
+                marketplace TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                listing_id TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (marketplace, domain)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS listings_pending ON listings (marketplace, status, next_attempt_at);
+        """)
+        with self._conn:
+            self._conn.execute("UPDATE listings SET status = ? WHERE status = ?", (PENDING, SENDING))
+
+    def enqueue(self, domain: str, marketplaces: Sequence[str]) -> int:
+        """Adds a domain for every marketplace it is not queued or listed on yet. Returns how many were added."""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO listings (marketplace, domain, status, next_attempt_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(marketplace, domain, PENDING, now, now) for marketplace in marketplaces],
+            )
+            return cursor.rowcount
+
+    def claim(self, marketplace: str, limit: int) -> List[Tuple[str, int]]:
+        """
+        Marks up to `limit` due listings of a marketplace as being sent.
+        Returns their (domain, attempts so far).
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT domain, attempts FROM listings WHERE marketplace = ? AND status = ? AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (marketplace, PENDING, now, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE listings SET status = ?, updated_at = ? WHERE marketplace = ? AND domain = ?",
+                [(SENDING, now, marketplace, domain) for domain, _ in rows],
+            )
+        return rows
+
+    def mark_listed(self, marketplace: str, listing_ids: dict):
+        """Records the listing id of every domain -> listing id the marketplace accepted."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE listings SET status = ?, listing_id = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE marketplace = ? AND domain = ?",
+                [(LISTED, listing_id, now, marketplace, domain) for domain, listing_id in listing_ids.items()],
+            )
+
+    def mark_simulated(self, marketplace: str, domains: Sequence[str]):
+        """Records listings only simulated because the marketplace had no API key."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE listings SET status = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE marketplace = ? AND domain = ?",
+                [(SIMULATED, now, marketplace, domain) for domain in domains],
+            )
+
+    def requeue_simulated(self, marketplace: str) -> int:
+        """Puts the simulated listings of a marketplace back to pending. Returns how many there were."""
+        now = time.time()
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE listings SET status = ?, attempts = 0, next_attempt_at = ?, updated_at = ? "
+                "WHERE marketplace = ? AND status = ?",
+                (PENDING, now, now, marketplace, SIMULATED),
+            ).rowcount
+
+    def mark_retry(self, marketplace: str, domains: Sequence[str], delay: float, error: str):
+        """Puts a failed batch back to pending, due again after `delay` seconds, or fails it for good."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE listings SET attempts = attempts + 1, error = ?, updated_at = ?, "
+                "status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END, next_attempt_at = ? "
+                "WHERE marketplace = ? AND domain = ?",
+                [(error, now, config.MAX_ATTEMPTS, FAILED, PENDING, now + delay, marketplace, domain)
+                 for domain in domains],
+            )
+
+    def mark_failed(self, marketplace: str, domains: Sequence[str], error: str):
+        """Fails listings the marketplace rejected; they are not retried."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE listings SET status = ?, attempts = attempts + 1, error = ?, updated_at = ? "
+                "WHERE marketplace = ? AND domain = ?",
+                [(FAILED, error, now, marketplace, domain) for domain in domains],
+            )
+
+    def pending_count(self, marketplace: Optional[str] = None) -> int:
+        """Listings not yet listed or failed for good (of one marketplace, or all)."""
+        query = "SELECT COUNT(*) FROM listings WHERE status IN (?, ?)"
+        params = [PENDING, SENDING]
+        if marketplace is not None:
+            query += " AND marketplace = ?"
+            params.append(marketplace)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    def next_due(self, marketplace: str) -> Optional[float]:
+        """When the earliest pending listing of a marketplace is due, or None if there is none."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM listings WHERE marketplace = ? AND status = ?",
+                (marketplace, PENDING),
+            ).fetchone()[0]
+
+    def counts(self) -> dict:
+        """Returns {marketplace: {status: count}}."""
+        counts = {}
+        with self._lock:
+            for marketplace, status, count in self._conn.execute(
+                    "SELECT marketplace, status, COUNT(*) FROM listings GROUP BY marketplace, status"):
+                counts.setdefault(marketplace, {})[status] = count
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,206 @@
+# domainscanner/registrars/availability.py
+"""
+Bulk availability checks through the registrar APIs (GoDaddy, Namecheap).
+
+One request checks a whole batch of domains, so a few hundred candidates
+cost a handful of API calls instead of one WHOIS round-trip each. Batches
+are sent concurrently over the shared keep-alive session, within the
+registrar's rate limit. Select a registrar with
+config.AVAILABILITY_BACKEND = 'godaddy' or 'namecheap'.
+"""
+
+import xml.etree.ElementTree as ET
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from .. import config
+from ..utils.http import get_session
+from ..utils.metrics import timed
+from ..utils.rate_limit import RetryableError, run_rate_limited
+
+
+class RegistrarRejectedError(Exception):
+    """Raised when a registrar refuses a request for good (e.g. invalid API key or IP not whitelisted)."""
+
+
+class RegistrarClient(ABC):
+    """Bulk availability API of one registrar."""
+
+    name = ''
+    api_url_setting = ''
+    batch_size_setting = ''
+
+    @property
+    def api_url(self) -> str:
+        return getattr(config, self.api_url_setting)
+
+    @property
+    def batch_size(self) -> int:
+        return getattr(config, self.batch_size_setting)
+
+    @property
+    def endpoint(self) -> str:
+        """The rate limit endpoint of the API."""
+        return urlparse(self.api_url).hostname or 'default'
+
+    @abstractmethod
+    def has_credentials(self) -> bool:
+        """Whether the API credentials are set in config."""
+
+    @abstractmethod
+    def fetch_batch(self, domains: Sequence[str]) -> dict:
+        """
+        Checks a batch of domains with one request.
+        Returns lowercased domain -> is_available for the domains the registrar answered.
+        Network, HTTP and parsing errors propagate to check_batch_once; answers
+        that retrying cannot fix raise RegistrarRejectedError.
+        """
+
+    def check_batch_once(self, domains: Sequence[str]) -> List[Tuple[str, bool, str]]:
+        """
+        Checks a batch of domains with one request. Returns (domain,
+        is_available, outcome) tuples in the order of `domains`; domains the
+        registrar could not answer for get the 'error' outcome.
+        """
+        try:
+            with timed('registrar', self.endpoint):
+                answers = self.fetch_batch(domains)
+        except RegistrarRejectedError as e:
+            # Not retried: the same request would be refused again
+            print(f"[ERROR] {self.name} refused the availability request: {e}")
+            return [(domain, False, 'error') for domain in domains]
+        except (requests.exceptions.RequestException, ValueError, KeyError, ET.ParseError) as e:
+            raise RetryableError(f"{self.name} availability request for {len(domains)} domains failed: {e}") from e
+        results = []
+        for domain in domains:
+            is_available = answers.get(domain.lower())
+            if is_available is None:
+                results.append((domain, False, 'error'))
+            else:
+                results.append((domain, is_available, 'available' if is_available else 'taken'))
+        return results
+
+
+class GoDaddyClient(RegistrarClient):
+    """GoDaddy POST /v1/domains/available, up to 500 domains per request."""
+
+    name = 'GoDaddy'
+    api_url_setting = 'GODADDY_API_URL'
+    batch_size_setting = 'GODADDY_BATCH_SIZE'
+
+    def has_credentials(self) -> bool:
+        return bool(config.GODADDY_API_KEY and config.GODADDY_API_SECRET)
+
+    def fetch_batch(self, domains: Sequence[str]) -> dict:
+        response = get_session().post(
+            f"{self.api_url.rstrip('/')}/v1/domains/available", params={'checkType': 'FAST'},
+            json=list(domains), timeout=config.HTTP_TIMEOUT,
+            headers={'Authorization': f"sso-key {config.GODADDY_API_KEY}:{config.GODADDY_API_SECRET}"},
+        )
+        response.raise_for_status()
+        # Domains the registrar could not check are listed under 'errors' and left out
+        return {result['domain'].lower(): bool(result['available']) for result in response.json()['domains']}
+
+
+class NamecheapClient(RegistrarClient):
+    """Namecheap namecheap.domains.check, a comma-separated DomainList per request."""
+
+    name = 'Namecheap'
+    api_url_setting = 'NAMECHEAP_API_URL'
+    batch_size_setting = 'NAMECHEAP_BATCH_SIZE'
+
+    def has_credentials(self) -> bool:
+        return bool(config.NAMECHEAP_API_KEY and config.NAMECHEAP_USER_NAME and config.NAMECHEAP_CLIENT_IP)
+
+    def fetch_batch(self, domains: Sequence[str]) -> dict:
+        response = get_session().post(self.api_url, timeout=config.HTTP_TIMEOUT, data={
+            'ApiUser': config.NAMECHEAP_USER_NAME,
+            'ApiKey': config.NAMECHEAP_API_KEY,
+            'UserName': config.NAMECHEAP_USER_NAME,
+            'ClientIp': config.NAMECHEAP_CLIENT_IP,
+            'Command': 'namecheap.domains.check',
+            'DomainList': ','.join(domains),
+        })
+        response.raise_for_status()
+        root = ET.fromstring(response.content)
+        if root.get('Status') != 'OK':
+            errors = '; '.join(error.text or '' for error in root.iterfind('.//{*}Error'))
+            # Status="ERROR" answers a bad key, user or client IP, not a transient failure
+            raise RegistrarRejectedError(errors or 'unknown error')
+        return {
+            result.get('Domain', '').lower(): result.get('Available', '').lower() == 'true'
+            for result in root.iterfind('.//{*}DomainCheckResult')
+        }
+
+
+# Keyed by the names in config.REGISTRAR_BACKENDS
+REGISTRARS = {
+    'godaddy': GoDaddyClient,
+    'namecheap': NamecheapClient,
+}
+
+
+def get_registrar(name: Optional[str] = None) -> RegistrarClient:
+    """Returns the client of a registrar in REGISTRARS (config.AVAILABILITY_BACKEND by default)."""
+    return REGISTRARS[name or config.AVAILABILITY_BACKEND]()
+
+
+def check_domains_detailed(domains: List[str], registrar: Optional[RegistrarClient] = None,
+                           show_progress: bool = True,
+                           on_result: Optional[Callable] = None) -> List[Tuple[str, bool, str]]:
+    """
+    Checks many domains in batches of the registrar's maximum size.
+
+    Args:
+        domains: A list of domain names.
+        registrar: The registrar to ask, get_registrar() by default.
+        show_progress: Whether to show a progress bar.
+        on_result: Optional callback invoked with every (domain, is_available, outcome) result.
+
+    Returns:
+        A list of (domain, is_available, outcome) tuples.
+    """
+    registrar = registrar or get_registrar()
+    size = registrar.batch_size
+    batches = [tuple(domains[i:i + size]) for i in range(0, len(domains), size)]
+
+    def on_batch(batch_results):
+        for result in batch_results:
+            on_result(result)
+
+    batch_results = run_rate_limited(
+        registrar.check_batch_once, batches, lambda batch: registrar.endpoint,
+        lambda batch: [(domain, False, 'error') for domain in batch],
+        f"Checking Availability ({registrar.name})", show_progress=show_progress,
+        on_result=on_batch if on_result is not None else None, stage='registrar',
+    )
+    return [result for results in batch_results for result in results]
+
+
+def check_single_domain(domain: str, registrar: Optional[RegistrarClient] = None) -> Tuple[str, bool]:
+    """
+    Checks if a single domain is available through the registrar API.
+    Returns the domain and a boolean indicating availability.
+    """
+    _, is_available, _ = check_domains_detailed([domain], registrar, show_progress=False)[0]
+    return domain, is_available
+
+
+if __name__ == '__main__':
+    from ..utils.stub_servers import StubRegistrarServer
+
+    test_domains = ['google.com', 'thisisdefinitelyanavailabledomain12345.com', 'facebook.ai']
+    with StubRegistrarServer(['google.com', 'facebook.ai']) as (host, port):
+        config.GODADDY_API_URL = f"http://{host}:{port}"
+        config.NAMECHEAP_API_URL = f"http://{host}:{port}/xml.response"
+        config.GODADDY_API_KEY, config.GODADDY_API_SECRET = 'stub-key', 'stub-secret'
+        config.NAMECHEAP_API_KEY, config.NAMECHEAP_USER_NAME, config.NAMECHEAP_CLIENT_IP = \
+            'stub-key', 'stub-user', '127.0.0.1'
+        for name in REGISTRARS:
+            print(f"\n--- Checking availability with {name} (local stub API) ---")
+            for domain, is_available, outcome in check_domains_detailed(
+                    test_domains, get_registrar(name), show_progress=False):
+                print(f"[{outcome.upper()}] {domain}")
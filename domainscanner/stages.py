@@ -0,0 +1,262 @@
+# domainscanner/stages.py
+"""
+Analyzer stages shared by the batch, streaming and distributed pipelines.
+
+Backends and generators are imported by the stage that uses them, so a run
+only loads what its pipeline and configuration need.
+"""
+
+import functools
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from tqdm import tqdm
+
+from . import config
+from .analyzers.dns_prefilter import prefilter_domains
+from .analyzers.zone_index import split_by_zone
+from .analyzers.trademark_screen import split_by_screening
+from .utils.cache import get_default_cache
+from .utils.concurrency import get_limit
+from .utils.journal import get_active_journal
+from .utils.metrics import CACHE_HITS, CACHE_MISSES
+from .utils.rate_limit import run_rate_limited
+
+def run_parallel(func, items, description="", on_result=None, stage=None):
+    """
+    Helper function to run a function in parallel on a list of items.
+    In adaptive concurrency mode, at most the current limit of the stage
+    (the description by default) runs at once; a call raising an exception
+    counts as a failure and makes the limit back off.
+    """
+    limiter = get_limit(stage or description)
+    if limiter is not None:
+        return _run_adaptive(func, items, description, on_result, limiter)
+    results = []
+    with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
+        # Create a future for each item
+        futures = [executor.submit(func, item) for item in items]
+        # Process as they complete, with a progress bar
+        for future in tqdm(as_completed(futures), total=len(items), desc=description):
+            result = future.result()
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+def _run_adaptive(func, items, description, on_result, limiter):
+    items = list(items)
+    results = []
+    pending = iter(items)
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=limiter.maximum) as executor, \
+            tqdm(total=len(items), desc=description) as progress:
+        while True:
+            # Top up to the current limit, which may have changed since the last round
+            for item in itertools.islice(pending, max(0, limiter.limit - len(in_flight))):
+                in_flight[executor.submit(func, item)] = limiter.started()
+            if not in_flight:
+                return results
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                started = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception:
+                    limiter.finished(started, ok=False)
+                    raise
+                limiter.finished(started)
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+                progress.update(1)
+
+def run_journaled(func, items, stage, description=""):
+    """
+    Like run_parallel, but skips items already decided in the run's journal
+    (when resuming) and journals every (domain, value) result as it completes.
+    """
+    journal = get_active_journal()
+    if journal is None:
+        return run_parallel(func, items, description)
+
+    decided = journal.results(stage)
+    resumed = [(item, decided[item]) for item in items if item in decided]
+    if resumed:
+        print(f"{description}: {len(resumed)} of {len(items)} results resumed from the journal.")
+    to_run = [item for item in items if item not in decided]
+    on_result = lambda result: journal.record(stage, result[0], result[1])
+    return resumed + run_parallel(func, to_run, description, on_result=on_result)
+
+def run_cached(batch_func, items, check_type, description="", with_outcome=False):
+    """
+    Skips items already decided in the run's journal, serves previously checked
+    items from the result cache and sends only the misses to `batch_func`,
+    which must return (domain, value, outcome) tuples and accept an
+    `on_result` callback. Returns (domain, value) tuples for all items, or
+    (domain, value, outcome) tuples with `with_outcome`; the outcome of a
+    result resumed from a journal that did not record it is None.
+    """
+    items = list(items)
+    results = []
+    journal = get_active_journal()
+    if journal is not None:
+        decided = journal.results(check_type)
+        decided_outcomes = journal.outcomes(check_type)
+        results = [(item, decided[item], decided_outcomes.get(item)) for item in items if item in decided]
+        if results:
+            print(f"{description}: {len(results)} of {len(items)} results resumed from the journal.")
+        items = [item for item in items if item not in decided]
+
+    cache = get_default_cache()
+    if cache is not None:
+        cached = cache.get_many(check_type, items, with_outcome=True)
+        CACHE_HITS.labels(check_type).inc(len(cached))
+        CACHE_MISSES.labels(check_type).inc(len(items) - len(cached))
+        if cached:
+            print(f"{description}: {len(cached)} of {len(items)} results served from cache.")
+            cached_results = [(domain, value, outcome) for domain, (value, outcome) in cached.items()]
+            results.extend(cached_results)
+            if journal is not None:
+                journal.record_many(check_type, [result for result in cached_results if result[2] != 'error'])
+        items = [item for item in items if item not in cached]
+
+    def on_result(result):
+        domain, value, outcome = result
+        # Failed lookups are not decided; a resumed run tries them again
+        if journal is not None and outcome != 'error':
+            journal.record(check_type, domain, value, outcome)
+
+    fresh_results = batch_func(items, on_result=on_result)
+    if cache is not None:
+        cache.set_many(check_type, fresh_results)
+    results.extend(fresh_results)
+    return results if with_outcome else [(domain, value) for domain, value, _ in results]
+
+def check_availability_batch(domains, show_progress=True, on_result=None):
+    """Checks a batch of domains with the availability backend selected in config."""
+    if config.AVAILABILITY_BACKEND in ('async-whois', 'rdap'):
+        if config.AVAILABILITY_BACKEND == 'async-whois':
+            from .analyzers.whois_client import check_domains_detailed
+            protocol = 'async WHOIS'
+        else:
+            from .analyzers.rdap_client import check_domains_detailed
+            protocol = 'RDAP'
+        if show_progress:
+            print(f"Checking availability of {len(domains)} domains ({protocol})...")
+        return check_domains_detailed(domains, on_result=on_result)
+    if config.AVAILABILITY_BACKEND in config.REGISTRAR_BACKENDS:
+        from .registrars.availability import check_domains_detailed, get_registrar
+        registrar = get_registrar()
+        if registrar.has_credentials():
+            return check_domains_detailed(domains, registrar, show_progress=show_progress, on_result=on_result)
+        print(f"[WARNING] {registrar.name} API credentials are not set in config.py. Falling back to WHOIS.")
+    from .analyzers.availability import check_single_domain_give_up, check_single_domain_once, whois_endpoint
+    return run_rate_limited(check_single_domain_once, domains, whois_endpoint,
+                            check_single_domain_give_up, "Checking Availability",
+                            show_progress=show_progress, on_result=on_result, stage='whois')
+
+def check_history_batch(domains, show_progress=True, on_result=None):
+    """Checks a batch of domains against the Wayback Machine, throttled per endpoint."""
+    from .analyzers.metrics import (
+        HISTORY_ENDPOINT, check_single_domain_history_give_up, check_single_domain_history_once
+    )
+    return run_rate_limited(check_single_domain_history_once, domains, lambda domain: HISTORY_ENDPOINT,
+                            check_single_domain_history_give_up, "Checking History",
+                            show_progress=show_progress, on_result=on_result, stage='history')
+
+def check_availability(domains, show_progress=True):
+    """
+    Drops the names matching a trademark or blocklist term, consults the local
+    zone indexes, runs the DNS pre-filter and then WHOIS on the remaining domains.
+
+    Returns:
+        domain -> outcome for every domain, in their order: 'flagged' for
+        screened out names, otherwise the availability outcome ('available',
+        'taken', 'expiring' or 'error').
+    """
+    order = list(domains)
+    flagged, domains = split_by_screening(order)
+    if flagged and show_progress:
+        for domain, reason in flagged[:config.SCREENING_REPORT_LIMIT]:
+            print(f"[REJECTED - SCREENING] {domain} ({reason})")
+        print(f"Screening: {len(flagged)} domains match a trademark or blocklist term, {len(domains)} left to check.")
+    outcomes = {domain: 'flagged' for domain, _ in flagged}
+    # Zone and DNS decisions are journaled too, so a resumed run skips them along with the lookups
+    journal = get_active_journal()
+    decided = journal.results('availability') if journal is not None else {}
+    decided_outcomes = journal.outcomes('availability') if journal is not None else {}
+    resumed = [domain for domain in domains if domain in decided]
+    if resumed:
+        domains = [domain for domain in domains if domain not in decided]
+        outcomes.update({domain: decided_outcomes.get(domain) or ('available' if decided[domain] else 'taken')
+                         for domain in resumed})
+        if show_progress:
+            print(f"Availability: {len(resumed)} results resumed from the journal, {len(domains)} left to check.")
+    in_zone, domains = split_by_zone(domains)
+    if in_zone and show_progress:
+        print(f"Zone index: {len(in_zone)} domains are registered, {len(domains)} left to check.")
+    taken, to_check = prefilter_domains(domains)
+    if taken and show_progress:
+        print(f"DNS pre-filter: {len(taken)} domains are delegated (taken), {len(to_check)} left for WHOIS.")
+    outcomes.update({domain: 'taken' for domain in itertools.chain(in_zone, taken)})
+    if journal is not None:
+        journal.record_many('availability', [(domain, False, 'taken') for domain in itertools.chain(in_zone, taken)])
+    batch_func = functools.partial(check_availability_batch, show_progress=show_progress)
+    for domain, is_available, outcome in run_cached(batch_func, to_check, 'availability', "Checking Availability",
+                                                    with_outcome=True):
+        outcomes[domain] = outcome or ('available' if is_available else 'taken')
+    return {domain: outcomes[domain] for domain in order if domain in outcomes}
+
+def find_available_domains(domains, show_progress=True):
+    """Returns the domains check_availability finds available, in their order."""
+    return [domain for domain, outcome in check_availability(domains, show_progress).items()
+            if outcome == 'available']
+
+def find_clean_history_domains(domains, show_progress=True):
+    """Returns the domains without Wayback Machine history."""
+    if config.HISTORY_BACKEND == 'cdx':
+        from .analyzers.wayback_cdx import fetch_histories, has_history
+        batch_func = functools.partial(fetch_histories, show_progress=show_progress)
+        history_results = run_cached(batch_func, domains, 'history_cdx', "Checking History")
+        return [domain for domain, history in history_results if not has_history(history)]
+    batch_func = functools.partial(check_history_batch, show_progress=show_progress)
+    history_results = run_cached(batch_func, domains, 'history', "Checking History")
+    return [domain for domain, has_history in history_results if not has_history]
+
+def score_domains(domains, show_progress=True):
+    """Returns (domain, score) for every domain; real API scores are cached, simulated ones are not."""
+    from .analyzers.seo_analyzer import fetch_seo_scores, has_seo_credentials
+    batch_func = functools.partial(fetch_seo_scores, show_progress=show_progress)
+    if not has_seo_credentials():
+        return [(domain, score) for domain, score, _ in batch_func(domains)]
+    return run_cached(batch_func, domains, 'seo', "Checking SEO")
+
+def publish_domains(domains):
+    """Lists every domain on the marketplaces and passes it on."""
+    from .publishers.marketplace_lister import list_domain_on_marketplaces
+    for domain in domains:
+        list_domain_on_marketplaces(domain)
+    return domains
+
+def iter_unique_candidates():
+    """
+    Lazily chains all generators, skipping duplicates with a Bloom filter.
+    With config.SCORING_ENABLED the candidates come best first, chunk by chunk.
+    """
+    from .generators.dictionary_generator import iter_dictionary_domains
+    from .generators.engine import iter_unique
+    from .generators.news_generator import iter_news_based_domains
+    from .generators.trend_generator import iter_trend_domains
+    candidates = iter_unique(itertools.chain(iter_trend_domains(), iter_dictionary_domains(),
+                                             iter_news_based_domains()))
+    if not config.SCORING_ENABLED:
+        return candidates
+    from .analyzers.scoring import iter_prioritized
+    return iter_prioritized(candidates)
+
+def prioritize_expired_domains(domains, show_progress=True):
+    """Orders expired domains best first and keeps the config.EXPIRED_TOP_K best, before any lookup."""
+    if not config.SCORING_ENABLED:
+        return domains
+    from .analyzers.scoring import rank_domains
+    return rank_domains(domains, top_k=config.EXPIRED_TOP_K, show_progress=show_progress)
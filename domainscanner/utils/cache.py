@@ -0,0 +1,161 @@
+# domainscanner/utils/cache.py
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .. import config
+
+# SQLite limits the number of bound parameters per statement
+_CHUNK_SIZE = 500
+
+_default_cache = None
+
+
+class ResultCache:
+    """
+    Persistent, size-bounded cache of per-domain check results.
+
+    Entries are keyed by (check_type, domain), e.g. ('availability', 'ai.com').
+    Each entry stores the result value and its outcome ('taken', 'available'
+    or 'error'); the outcome decides how long the entry stays valid.
+    When the cache grows beyond max_entries, the least recently used entries
+    are evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttls: Optional[Dict[str, int]] = None,
+                 max_entries: Optional[int] = None):
+        self.path = path or config.CACHE_FILE
+        self.ttls = ttls or config.CACHE_TTLS
+        self.max_entries = max_entries or config.CACHE_MAX_ENTRIES
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                check_type TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                value TEXT NOT NULL,
+                outcome TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (check_type, domain)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+        self._conn.commit()
+
+    def get(self, check_type: str, domain: str) -> Optional[Any]:
+        """Returns the cached value for a domain, or None if missing or expired."""
+        return self.get_many(check_type, [domain]).get(domain)
+
+    def get_many(self, check_type: str, domains: List[str], with_outcome: bool = False) -> Dict[str, Any]:
+        """
+        Looks up a whole candidate list at once.
+
+        Args:
+            check_type: The kind of check, e.g. 'availability' or 'history'.
+            domains: The domains to look up.
+            with_outcome: Return (value, outcome) tuples instead of the values.
+
+        Returns:
+            A dict mapping every domain with a valid entry to its cached value.
+        """
+        now = time.time()
+        hits = {}
+        with self._lock:
+            for start in range(0, len(domains), _CHUNK_SIZE):
+                chunk = domains[start:start + _CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT domain, value, outcome FROM results WHERE check_type = ? "
+                    f"AND expires_at > ? AND domain IN ({placeholders})",
+                    [check_type, now, *chunk],
+                ).fetchall()
+                for domain, value, outcome in rows:
+                    hits[domain] = (json.loads(value), outcome) if with_outcome else json.loads(value)
+            # Touch the hits so they are the last to be evicted
+            self._conn.executemany(
+                "UPDATE results SET last_access = ? WHERE check_type = ? AND domain = ?",
+                [(now, check_type, domain) for domain in hits],
+            )
+            self._conn.commit()
+        return hits
+
+    def set(self, check_type: str, domain: str, value: Any, outcome: str):
+        """Stores a single result."""
+        self.set_many(check_type, [(domain, value, outcome)])
+
+    def set_many(self, check_type: str, entries: Iterable[Tuple[str, Any, str]]):
+        """
+        Stores many results in one transaction.
+
+        Args:
+            check_type: The kind of check, e.g. 'availability' or 'history'.
+            entries: (domain, value, outcome) tuples; outcome selects the TTL.
+        """
+        now = time.time()
+        rows = [
+            (check_type, domain, json.dumps(value), outcome,
+             now + self.ttls.get(outcome, self.ttls['error']), now)
+            for domain, value, outcome in entries
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results "
+                "(check_type, domain, value, outcome, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drops expired entries, then the least recently used ones above max_entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM results WHERE (check_type, domain) IN "
+                    "(SELECT check_type, domain FROM results ORDER BY last_access LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_default_cache() -> Optional[ResultCache]:
+    """Returns the shared cache, or None if caching is disabled in config."""
+    global _default_cache
+    if not config.CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite3')
+    cache = ResultCache(path, max_entries=2)
+    cache.set_many('availability', [
+        ('ailabs.ai', True, 'available'),
+        ('google.com', False, 'taken'),
+    ])
+    print(cache.get_many('availability', ['ailabs.ai', 'google.com', 'unknown.io']))
+    # Adding a third entry evicts the least recently used one
+    cache.set('availability', 'cryptolabs.io', False, 'error')
+    print(cache.get_many('availability', ['ailabs.ai', 'google.com', 'cryptolabs.io']))
+    cache.close()
@@ -0,0 +1,141 @@
+# domainscanner/utils/concurrency.py
+"""
+Adaptive concurrency limits, one per stage (config.CONCURRENCY_MODE = 'adaptive').
+
+Each limit follows AIMD: after every window of about `limit` completed calls
+it grows by one if the stage kept all its slots busy and latency stayed
+close to its baseline, a slow moving average of the window means. It shrinks
+by config.CONCURRENCY_BACKOFF at once when a call fails (timeout, refusal,
+rate limiting), and a little when a window's mean latency climbs above
+config.CONCURRENCY_LATENCY_TOLERANCE times the baseline, a sign that the
+endpoint is queueing. Every change is appended to
+config.CONCURRENCY_LOG_FILE, one JSON object per line, to tune the settings.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from .. import config
+from .metrics import counter, gauge
+
+CONCURRENCY_LIMIT = gauge('domainscanner_concurrency_limit', "Current adaptive concurrency limit per stage.",
+                          ('stage',))
+CONCURRENCY_DECISIONS = counter('domainscanner_concurrency_decisions_total',
+                                "Changes of the adaptive concurrency limits.", ('stage', 'action'))
+
+# Fraction of the limit given up when latency grows without errors
+LATENCY_BACKOFF = 0.9
+# Weight of a window's mean latency in the long-term baseline
+BASELINE_SMOOTHING = 0.1
+
+_limits: Dict[str, 'AdaptiveLimit'] = {}
+_limits_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit of one stage. Callers check `limit` before
+    starting a call and report every call with started() / finished().
+    """
+
+    def __init__(self, stage: str, initial: Optional[int] = None, minimum: Optional[int] = None,
+                 maximum: Optional[int] = None):
+        self.stage = stage
+        self.minimum = minimum or config.CONCURRENCY_MIN_WORKERS
+        self.maximum = maximum or config.CONCURRENCY_MAX_WORKERS or config.MAX_WORKERS
+        # Starting below the ceiling leaves room to grow while latency holds
+        initial = initial or config.CONCURRENCY_INITIAL_WORKERS or self.maximum // 2
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._baseline = None
+        self._last_decrease = 0.0
+        self._reset_window()
+        CONCURRENCY_LIMIT.labels(stage).set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _reset_window(self):
+        self._samples = 0
+        self._latency_sum = 0.0
+        self._saturated = False
+
+    def started(self) -> float:
+        """Counts a call as in flight. Returns the token to pass to finished()."""
+        with self._lock:
+            self._in_flight += 1
+            if self._in_flight >= self.limit:
+                self._saturated = True
+        return time.monotonic()
+
+    def finished(self, started: float, ok: bool = True):
+        """Reports a call that started() at `started`; ok is False for timeouts and refusals."""
+        now = time.monotonic()
+        latency = now - started
+        with self._lock:
+            self._in_flight -= 1
+            if not ok:
+                # Calls that started before the last decrease saw the old limit; one backoff covers them
+                if started >= self._last_decrease:
+                    self._change(self._limit * config.CONCURRENCY_BACKOFF, 'backoff_error', now,
+                                 latency=round(latency, 4))
+                return
+            self._samples += 1
+            self._latency_sum += latency
+            if self._samples < max(self.limit, config.CONCURRENCY_MIN_WINDOW):
+                return
+            mean = self._latency_sum / self._samples
+            baseline = self._baseline if self._baseline is not None else mean
+            self._baseline = baseline + (mean - baseline) * BASELINE_SMOOTHING
+            details = {'mean_latency': round(mean, 4), 'baseline_latency': round(baseline, 4),
+                       'samples': self._samples}
+            if mean > baseline * config.CONCURRENCY_LATENCY_TOLERANCE:
+                self._change(self._limit * LATENCY_BACKOFF, 'backoff_latency', now, **details)
+            elif self._saturated:
+                self._change(self._limit + 1, 'increase', now, **details)
+            self._reset_window()
+
+    def _change(self, new_limit: float, action: str, now: float, **details):
+        old_limit = self.limit
+        self._limit = min(self.maximum, max(self.minimum, new_limit))
+        if action != 'increase':
+            self._last_decrease = now
+        self._reset_window()
+        if self.limit == old_limit:
+            return
+        CONCURRENCY_LIMIT.labels(self.stage).set(self.limit)
+        CONCURRENCY_DECISIONS.labels(self.stage, action).inc()
+        log_decision({'stage': self.stage, 'action': action, 'from': old_limit, 'to': self.limit, **details})
+
+
+def log_decision(entry: dict):
+    """Appends a controller decision to config.CONCURRENCY_LOG_FILE."""
+    path = config.CONCURRENCY_LOG_FILE
+    if not path:
+        return
+    line = json.dumps({'ts': round(time.time(), 3), **entry})
+    with _log_lock:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+def get_limit(stage: str) -> Optional[AdaptiveLimit]:
+    """
+    Returns the adaptive limit of a stage, shared by every call of the stage
+    in this process, or None when config.CONCURRENCY_MODE is 'fixed'.
+    """
+    if config.CONCURRENCY_MODE != 'adaptive':
+        return None
+    with _limits_lock:
+        if stage not in _limits:
+            _limits[stage] = AdaptiveLimit(stage)
+        return _limits[stage]
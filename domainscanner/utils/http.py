@@ -0,0 +1,34 @@
+# domainscanner/utils/http.py
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .. import config
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the shared HTTP session. It keeps connections alive and pools up
+    to config.HTTP_POOL_SIZE connections per host, so the worker threads
+    reuse them instead of opening a new connection per request.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=config.HTTP_POOL_SIZE,
+                                  pool_maxsize=config.HTTP_POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
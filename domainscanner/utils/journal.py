@@ -0,0 +1,116 @@
+# domainscanner/utils/journal.py
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .. import config
+
+_active_journal = None
+
+
+class Journal:
+    """
+    Append-only journal of per-domain stage results, one JSON object per line.
+
+    Records are buffered and fsync'ed every config.JOURNAL_FSYNC_EVERY records
+    or config.JOURNAL_FSYNC_INTERVAL seconds, whichever comes first, so a crash
+    loses at most one small batch. A truncated last line (from a crash in the
+    middle of a write) is ignored when the journal is loaded.
+    """
+
+    def __init__(self, path: Optional[str] = None, resume: bool = False):
+        self.path = path or config.JOURNAL_FILE
+        self._results: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        self._outcomes: Dict[str, Dict[str, str]] = defaultdict(dict)
+        if resume and os.path.exists(self.path):
+            self._load()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._results[entry['stage']][entry['domain']] = entry['value']
+                if 'outcome' in entry:
+                    self._outcomes[entry['stage']][entry['domain']] = entry['outcome']
+
+    def results(self, stage: str) -> Dict[str, Any]:
+        """Returns the domain -> value results already recorded for a stage."""
+        return self._results.get(stage, {})
+
+    def outcomes(self, stage: str) -> Dict[str, str]:
+        """Returns the domain -> outcome of the results of a stage that were recorded with one."""
+        return self._outcomes.get(stage, {})
+
+    def record(self, stage: str, domain: str, value: Any, outcome: Optional[str] = None):
+        """Appends a single result, optionally with its outcome ('available', 'taken', ...)."""
+        self.record_many(stage, [(domain, value) if outcome is None else (domain, value, outcome)])
+
+    def record_many(self, stage: str, results: Iterable[tuple]):
+        """
+        Appends many (domain, value) or (domain, value, outcome) results of a
+        stage, fsync'ing when a batch is full or old enough.
+        """
+        now = time.time()
+        results = list(results)
+        if not results:
+            return
+        entries = [
+            {'stage': stage, 'domain': result[0], 'value': result[1], 'ts': now,
+             **({'outcome': result[2]} if len(result) > 2 else {})}
+            for result in results
+        ]
+        lines = [json.dumps(entry) for entry in entries]
+        with self._lock:
+            self._results[stage].update((result[0], result[1]) for result in results)
+            self._outcomes[stage].update((result[0], result[2]) for result in results if len(result) > 2)
+            self._file.write('\n'.join(lines) + '\n')
+            self._pending += len(lines)
+            if (self._pending >= config.JOURNAL_FSYNC_EVERY
+                    or time.monotonic() - self._last_sync >= config.JOURNAL_FSYNC_INTERVAL):
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+
+def start_journal(resume: bool = False) -> Optional[Journal]:
+    """Opens the run's journal; with resume, previously recorded results are loaded."""
+    global _active_journal
+    if config.JOURNAL_ENABLED:
+        _active_journal = Journal(resume=resume)
+    return _active_journal
+
+
+def get_active_journal() -> Optional[Journal]:
+    """Returns the journal of the current run, or None if none was started."""
+    return _active_journal
+
+
+def close_journal():
+    global _active_journal
+    if _active_journal is not None:
+        _active_journal.close()
+        _active_journal = None
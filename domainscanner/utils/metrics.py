@@ -0,0 +1,272 @@
+# domainscanner/utils/metrics.py
+"""
+In-process metrics for the scan pipelines: latency histograms per stage and
+endpoint, counters for retries, errors and cache hits, and gauges for queue
+depths and in-flight requests.
+
+Recording is a dict lookup, a bisect and two additions, so it is cheap
+enough for the hot path. The metrics are exposed as Prometheus text over
+HTTP (start_metrics_server) and as a JSON summary (write_metrics_summary).
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .. import config
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List['_Family'] = []
+_registry_lock = threading.Lock()
+
+
+class _Counter:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _Gauge:
+    """A gauge that also remembers the highest value it has reached."""
+
+    def __init__(self):
+        self.value = 0.0
+        self.peak = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+            self.peak = max(self.peak, value)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+            self.peak = max(self.peak, self.value)
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Estimates a percentile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class _Family:
+    """A named metric with a fixed set of label names and one child per label values."""
+
+    def __init__(self, kind: str, name: str, help_text: str, label_names: Sequence[str], factory):
+        self.kind = kind
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def reset(self):
+        with self._lock:
+            self._children.clear()
+
+
+def counter(name: str, help_text: str, label_names: Sequence[str] = ()) -> _Family:
+    return _Family('counter', name, help_text, label_names, _Counter)
+
+
+def gauge(name: str, help_text: str, label_names: Sequence[str] = ()) -> _Family:
+    return _Family('gauge', name, help_text, label_names, _Gauge)
+
+
+def histogram(name: str, help_text: str, label_names: Sequence[str] = (),
+              buckets: Sequence[float] = LATENCY_BUCKETS) -> _Family:
+    return _Family('histogram', name, help_text, label_names, lambda: _Histogram(buckets))
+
+
+STAGE_LATENCY = histogram('domainscanner_stage_latency_seconds',
+                          "Latency of single network calls per stage and endpoint.", ('stage', 'endpoint'))
+RETRIES = counter('domainscanner_retries_total', "Attempts that failed and were retried.", ('stage', 'endpoint'))
+ERRORS = counter('domainscanner_errors_total', "Items given up on after all attempts.", ('stage', 'endpoint'))
+CACHE_HITS = counter('domainscanner_cache_hits_total', "Results served from the result cache.", ('check_type',))
+CACHE_MISSES = counter('domainscanner_cache_misses_total', "Results not found in the result cache.", ('check_type',))
+QUEUE_DEPTH = gauge('domainscanner_queue_depth', "Items waiting in the input queue of a pipeline stage.", ('stage',))
+IN_FLIGHT = gauge('domainscanner_in_flight', "Requests currently in flight per stage and endpoint.",
+                  ('stage', 'endpoint'))
+
+
+def record(stage: str, seconds: float, endpoint: str = ''):
+    """Records the latency of one call of a stage."""
+    STAGE_LATENCY.labels(stage, endpoint).observe(seconds)
+
+
+@contextmanager
+def timed(stage: str, endpoint: str = ''):
+    """Records how long the block took, and counts it as in flight while it runs."""
+    in_flight = IN_FLIGHT.labels(stage, endpoint)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage, endpoint).observe(time.perf_counter() - start)
+        in_flight.dec()
+
+
+def reset_metrics():
+    """Drops every recorded value, e.g. between benchmark runs."""
+    with _registry_lock:
+        families = list(_registry)
+    for family in families:
+        family.reset()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus() -> str:
+    """Renders every metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        families = list(_registry)
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help_text}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for values, child in family.children():
+            if family.kind == 'histogram':
+                cumulative = 0
+                for bound, count in zip(list(child.buckets) + ['+Inf'], child.counts):
+                    cumulative += count
+                    labels = _format_labels(family.label_names, values, f'le="{bound}"')
+                    lines.append(f"{family.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(family.label_names, values)
+                lines.append(f"{family.name}_sum{labels} {child.sum}")
+                lines.append(f"{family.name}_count{labels} {child.count}")
+            else:
+                lines.append(f"{family.name}{_format_labels(family.label_names, values)} {child.value}")
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_summary() -> Dict[str, list]:
+    """
+    Returns a JSON-serializable summary: count, mean, p50 and p99 latency in
+    milliseconds per histogram, final values of the counters, and the current
+    and peak values of the gauges.
+    """
+    with _registry_lock:
+        families = list(_registry)
+    summary = {}
+    for family in families:
+        entries = []
+        for values, child in family.children():
+            entry = dict(zip(family.label_names, values))
+            if family.kind == 'histogram':
+                if not child.count:
+                    continue
+                entry.update({
+                    'count': child.count,
+                    'mean_ms': round(child.sum / child.count * 1000, 3),
+                    'p50_ms': round(child.percentile(0.50) * 1000, 3),
+                    'p99_ms': round(child.percentile(0.99) * 1000, 3),
+                })
+            elif family.kind == 'gauge':
+                entry.update({'value': child.value, 'peak': child.peak})
+            else:
+                entry['value'] = child.value
+            entries.append(entry)
+        if entries:
+            summary[family.name] = entries
+    return summary
+
+
+def write_metrics_summary(path: Optional[str] = None):
+    """Writes metrics_summary() as JSON to `path` (config.METRICS_SUMMARY_FILE by default)."""
+    path = path or config.METRICS_SUMMARY_FILE
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(metrics_summary(), f, indent=2, sort_keys=True)
+    print(f"[SUCCESS] Metrics summary saved to {path}")
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """Serves /metrics in the Prometheus text format from a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            payload = render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port if port is not None else config.METRICS_PORT), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    print(f"Serving Prometheus metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,134 @@
+# domainscanner/utils/pipeline.py
+
+import queue
+import threading
+import time
+import traceback
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from .. import config
+from .metrics import QUEUE_DEPTH
+
+# Marks the end of a stream on a queue
+_DONE = object()
+
+
+class Stage:
+    """
+    A pipeline stage: `func` receives a micro-batch (a list of items) and
+    returns the items to pass on to the next stage.
+
+    Workers collect up to `batch_size` items, or whatever arrived within
+    `batch_timeout` seconds of the first one, so results keep flowing even
+    when the upstream stage is slow.
+    """
+
+    def __init__(self, name: str, func: Callable[[List], Iterable], workers: int = 1,
+                 batch_size: int = 1, batch_timeout: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout if batch_timeout is not None else config.STREAM_BATCH_TIMEOUT
+        self.errors = []
+
+    def _next_batch(self, in_queue: queue.Queue):
+        """Returns (batch, done) where done means the upstream stream ended."""
+        item = in_queue.get()
+        if item is _DONE:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = in_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        QUEUE_DEPTH.labels(self.name).set(in_queue.qsize())
+        return batch, False
+
+    def _work(self, in_queue: queue.Queue, out_queue: queue.Queue, on_finished: Callable):
+        done = False
+        while not done:
+            batch, done = self._next_batch(in_queue)
+            if not batch:
+                continue
+            try:
+                for result in self.func(batch):
+                    out_queue.put(result)
+            except Exception:
+                # Keep the stream going; the error is reported at the end
+                self.errors.append(traceback.format_exc())
+        on_finished()
+
+
+def run_pipeline(source: Iterable, stages: List[Stage], queue_size: Optional[int] = None) -> Iterator:
+    """
+    Streams items from `source` through `stages`, connected by bounded queues.
+
+    Every stage runs in its own worker threads, so stages overlap, and the
+    bounded queues apply back-pressure so memory stays flat however many
+    items the source yields.
+
+    Args:
+        source: An iterable (ideally a generator) of input items.
+        stages: The stages to run, in order.
+        queue_size: The capacity of each queue. Defaults to config.STREAM_QUEUE_SIZE.
+
+    Yields:
+        The items that come out of the last stage, as soon as they are ready.
+    """
+    queue_size = queue_size or config.STREAM_QUEUE_SIZE
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    threads = []
+
+    def feed():
+        try:
+            for item in source:
+                queues[0].put(item)
+        finally:
+            for _ in range(stages[0].workers):
+                queues[0].put(_DONE)
+
+    threads.append(threading.Thread(target=feed, name='pipeline-source', daemon=True))
+
+    for index, stage in enumerate(stages):
+        # The last worker of a stage to finish closes the next queue
+        downstream_workers = stages[index + 1].workers if index + 1 < len(stages) else 1
+        remaining = [stage.workers]
+        lock = threading.Lock()
+
+        def on_finished(out_queue=queues[index + 1], remaining=remaining, lock=lock,
+                        downstream_workers=downstream_workers):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    for _ in range(downstream_workers):
+                        out_queue.put(_DONE)
+
+        for worker in range(stage.workers):
+            threads.append(threading.Thread(
+                target=stage._work, args=(queues[index], queues[index + 1], on_finished),
+                name=f'pipeline-{stage.name}-{worker}', daemon=True,
+            ))
+
+    for thread in threads:
+        thread.start()
+
+    while True:
+        item = queues[-1].get()
+        if item is _DONE:
+            break
+        yield item
+
+    for thread in threads:
+        thread.join()
+    for stage in stages:
+        for error in stage.errors:
+            print(f"[PIPELINE ERROR] Stage '{stage.name}' failed on a batch:\n{error}")
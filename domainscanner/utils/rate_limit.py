@@ -0,0 +1,213 @@
+# domainscanner/utils/rate_limit.py
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional
+
+from tqdm import tqdm
+
+from .. import config
+from .concurrency import get_limit
+from .metrics import ERRORS, RETRIES
+
+
+class RetryableError(Exception):
+    """Raised by a single check attempt when it should be retried later."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `burst` stored.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one will be available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def reserve(self) -> float:
+        """
+        Takes a token unconditionally (the bucket may go into debt).
+
+        Returns:
+            The seconds the caller must wait before using the token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        """Blocks until a token is available. Only for callers outside the scheduler."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(endpoint: str) -> TokenBucket:
+    """Returns the shared token bucket of an endpoint, created from config.RATE_LIMITS."""
+    with _buckets_lock:
+        if endpoint not in _buckets:
+            rate, burst = config.RATE_LIMITS.get(endpoint, config.RATE_LIMITS['default'])
+            _buckets[endpoint] = TokenBucket(rate, burst)
+        return _buckets[endpoint]
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given (zero-based) retry attempt."""
+    delay = min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def run_rate_limited(attempt_func: Callable, items: Iterable, endpoint_func: Callable[..., str],
+                     give_up_func: Callable, description: str = "",
+                     max_workers: Optional[int] = None, max_attempts: Optional[int] = None,
+                     show_progress: bool = True, on_result: Optional[Callable] = None,
+                     stage: str = '') -> List:
+    """
+    Runs `attempt_func` on every item in a thread pool, respecting the token
+    bucket of each item's endpoint.
+
+    Workers never sleep: an item whose endpoint has no token left, or whose
+    attempt raised RetryableError, is put back in a delay queue and its worker
+    slot goes to the next ready item.
+
+    With config.CONCURRENCY_MODE = 'adaptive' (and no explicit max_workers),
+    the number of busy workers follows the stage's adaptive limit instead,
+    which backs off whenever an attempt raises RetryableError.
+
+    Args:
+        attempt_func: Performs a single attempt for an item; raises RetryableError to retry.
+            Any other exception gives up on the item at once.
+        items: The items to process.
+        endpoint_func: Maps an item to its endpoint name (the token bucket to use).
+        give_up_func: Builds the result of an item whose attempts are exhausted.
+        description: The progress bar description.
+        max_workers: The thread pool size. Defaults to config.MAX_WORKERS, or the
+            stage's adaptive limit.
+        max_attempts: Attempts per item. Defaults to config.MAX_ATTEMPTS.
+        show_progress: Whether to show a progress bar.
+        on_result: Optional callback invoked with every result as soon as it is final.
+        stage: The stage name the retry and error counters and the adaptive limit are kept under.
+
+    Returns:
+        The results in completion order.
+    """
+    limiter = get_limit(stage or description) if max_workers is None else None
+    max_workers = limiter.maximum if limiter is not None else max_workers or config.MAX_WORKERS
+    capacity = (lambda: limiter.limit) if limiter is not None else (lambda: max_workers)
+    max_attempts = max_attempts or config.MAX_ATTEMPTS
+    # Items ready to run, per endpoint, as (item, attempt)
+    ready: Dict[str, deque] = defaultdict(deque)
+    total = 0
+    for item in items:
+        ready[endpoint_func(item)].append((item, 0))
+        total += 1
+    # Items waiting for their retry backoff: heap of (ready_at, sequence, item, attempt)
+    delayed = []
+    sequence = itertools.count()
+    # Endpoints whose bucket is empty, and when it will have a token again
+    blocked_until: Dict[str, float] = {}
+    results = []
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+            tqdm(total=total, desc=description, disable=not show_progress) as progress:
+        while ready or delayed or in_flight:
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                _, _, item, attempt = heapq.heappop(delayed)
+                ready[endpoint_func(item)].append((item, attempt))
+
+            # Fill free worker slots round-robin over the endpoints that have a token
+            submitted = True
+            while submitted and len(in_flight) < capacity():
+                submitted = False
+                for endpoint in list(ready):
+                    if len(in_flight) >= capacity():
+                        break
+                    if blocked_until.get(endpoint, 0.0) > now:
+                        continue
+                    wait_time = get_bucket(endpoint).try_acquire()
+                    if wait_time:
+                        blocked_until[endpoint] = now + wait_time
+                        continue
+                    item, attempt = ready[endpoint].popleft()
+                    if not ready[endpoint]:
+                        del ready[endpoint]
+                    started = limiter.started() if limiter is not None else None
+                    in_flight[executor.submit(attempt_func, item)] = (endpoint, item, attempt, started)
+                    submitted = True
+
+            # Sleep until a result arrives, a retry is due or a bucket refills.
+            # With every slot busy only a finished result can make progress.
+            wake_times = []
+            if len(in_flight) < capacity():
+                wake_times = [blocked_until.get(endpoint, now) for endpoint in ready]
+                if delayed:
+                    wake_times.append(delayed[0][0])
+            timeout = max(0.0, min(wake_times) - now) if wake_times else None
+            if not in_flight:
+                time.sleep(timeout or 0)
+                continue
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                endpoint, item, attempt, started = in_flight.pop(future)
+                try:
+                    result = future.result()
+                    if limiter is not None:
+                        limiter.finished(started)
+                except RetryableError:
+                    if limiter is not None:
+                        limiter.finished(started, ok=False)
+                    if attempt + 1 < max_attempts:
+                        RETRIES.labels(stage, endpoint).inc()
+                        ready_at = time.monotonic() + backoff_delay(attempt)
+                        heapq.heappush(delayed, (ready_at, next(sequence), item, attempt + 1))
+                        continue
+                    ERRORS.labels(stage, endpoint).inc()
+                    result = give_up_func(item)
+                except Exception as e:
+                    # Not worth retrying (e.g. a malformed item), but it must not abort the other items
+                    if limiter is not None:
+                        limiter.finished(started)
+                    ERRORS.labels(stage, endpoint).inc()
+                    print(f"[ERROR] {description or stage or 'Rate-limited run'}: giving up on an item "
+                          f"after {type(e).__name__}: {e}")
+                    result = give_up_func(item)
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+                progress.update(1)
+    return results
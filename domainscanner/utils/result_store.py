@@ -0,0 +1,262 @@
+# domainscanner/utils/result_store.py
+"""
+Structured store of the domains found by the pipelines.
+
+Every result is appended to a JSONL log (the source of truth) and upserted
+into an indexed SQLite view keyed by (pipeline, domain). The view dedupes
+across runs and answers "what's new since the last run" with an index scan,
+so nothing is loaded into memory. It can be rebuilt from the log at any time:
+
+    python -m domainscanner.utils.result_store rebuild
+    python -m domainscanner.utils.result_store new --pipeline expired
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from .. import config
+
+# SQLite limits the number of bound parameters per statement
+_CHUNK_SIZE = 500
+
+_active_store = None
+
+
+class ResultStore:
+    """
+    Append-only result log plus its SQLite view.
+
+    A store instance is one run: opening it registers a new run id, and every
+    result recorded through it carries that id. A domain keeps the run that
+    first found it (first_run), so results of later runs can be told apart.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, db_path: Optional[str] = None,
+                 start_run: bool = True):
+        self.log_path = log_path or config.RESULTS_LOG_FILE
+        self.db_path = db_path or config.RESULTS_DB_FILE
+        for path in (self.log_path, self.db_path):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                pipeline TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                outcomes TEXT NOT NULL,
+                score REAL,
+                first_run INTEGER NOT NULL,
+                last_run INTEGER NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (pipeline, domain)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS results_first_run ON results (pipeline, first_run);
+            CREATE INDEX IF NOT EXISTS results_last_run ON results (pipeline, last_run);
+        """)
+        self._conn.commit()
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+        self.run_id = None
+        self.previous_run_id = self._latest_run_id()
+        if start_run:
+            self.run_id = (self.previous_run_id or 0) + 1
+            with self._conn:
+                self._conn.execute("INSERT INTO runs (run_id, started_at) VALUES (?, ?)",
+                                   (self.run_id, time.time()))
+
+    def _latest_run_id(self) -> Optional[int]:
+        return self._conn.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+
+    def record(self, pipeline: str, domain: str, outcomes: Dict[str, Any], score: Optional[float] = None) -> bool:
+        """Records one result. Returns True if no earlier run had found the domain."""
+        return self.record_many(pipeline, [(domain, outcomes, score)]) == 1
+
+    def record_many(self, pipeline: str, results: Iterable[Tuple[str, Dict[str, Any], Optional[float]]]) -> int:
+        """
+        Records many (domain, outcomes, score) results of a pipeline.
+        Returns how many of them no earlier run had found.
+        """
+        now = time.time()
+        results = list(results)
+        if not results:
+            return 0
+        lines = [
+            json.dumps({'run': self.run_id, 'pipeline': pipeline, 'domain': domain,
+                        'outcomes': outcomes, 'score': score, 'ts': now})
+            for domain, outcomes, score in results
+        ]
+        with self._lock:
+            self._log.write('\n'.join(lines) + '\n')
+            self._log.flush()
+            return self._upsert(pipeline, [
+                (domain, json.dumps(outcomes), score, self.run_id, now)
+                for domain, outcomes, score in results
+            ])
+
+    def _upsert(self, pipeline: str, rows) -> int:
+        """Upserts (domain, outcomes_json, score, run_id, ts) rows and counts the new ones."""
+        domains = list({row[0] for row in rows})
+        known = 0
+        for start in range(0, len(domains), _CHUNK_SIZE):
+            chunk = domains[start:start + _CHUNK_SIZE]
+            known += self._conn.execute(
+                f"SELECT COUNT(*) FROM results WHERE pipeline = ? AND domain IN ({','.join('?' * len(chunk))})",
+                [pipeline] + chunk,
+            ).fetchone()[0]
+        with self._conn:
+            self._conn.executemany("""
+                INSERT INTO results (pipeline, domain, outcomes, score, first_run, last_run, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (pipeline, domain) DO UPDATE SET
+                    outcomes = excluded.outcomes, score = excluded.score,
+                    last_run = excluded.last_run, last_seen = excluded.last_seen
+            """, [(pipeline, domain, outcomes, score, run_id, run_id, ts, ts)
+                  for domain, outcomes, score, run_id, ts in rows])
+        return len(domains) - known
+
+    def _iter_rows(self, query: str, params: tuple) -> Iterator[dict]:
+        # A separate cursor streams the rows instead of fetching them all at once
+        cursor = self._conn.cursor()
+        try:
+            for domain, outcomes, score, first_run, last_run, first_seen, last_seen in cursor.execute(query, params):
+                yield {
+                    'domain': domain, 'outcomes': json.loads(outcomes), 'score': score,
+                    'first_run': first_run, 'last_run': last_run,
+                    'first_seen': first_seen, 'last_seen': last_seen,
+                }
+        finally:
+            cursor.close()
+
+    def iter_results(self, pipeline: str, run_id: Optional[int] = None) -> Iterator[dict]:
+        """Yields every result of a pipeline, or only those seen in `run_id`."""
+        columns = "domain, outcomes, score, first_run, last_run, first_seen, last_seen"
+        if run_id is None:
+            return self._iter_rows(f"SELECT {columns} FROM results WHERE pipeline = ? ORDER BY domain",
+                                   (pipeline,))
+        return self._iter_rows(
+            f"SELECT {columns} FROM results WHERE pipeline = ? AND last_run = ? ORDER BY domain",
+            (pipeline, run_id),
+        )
+
+    def iter_new_since(self, pipeline: str, run_id: Optional[int]) -> Iterator[dict]:
+        """Yields the results first found after run `run_id` (all of them for None)."""
+        return self._iter_rows(
+            "SELECT domain, outcomes, score, first_run, last_run, first_seen, last_seen FROM results "
+            "WHERE pipeline = ? AND first_run > ? ORDER BY first_run, domain",
+            (pipeline, run_id or 0),
+        )
+
+    def iter_new_since_last_run(self, pipeline: str) -> Iterator[dict]:
+        """Yields the results this run found that no earlier run had found."""
+        return self.iter_new_since(pipeline, self.previous_run_id)
+
+    def close(self):
+        with self._lock:
+            if self.run_id is not None:
+                with self._conn:
+                    self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                                       (time.time(), self.run_id))
+            if not self._log.closed:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._log.close()
+            self._conn.close()
+
+
+def rebuild_index(log_path: Optional[str] = None, db_path: Optional[str] = None) -> int:
+    """
+    Rebuilds the SQLite view from the JSONL log, streaming it line by line.
+    A truncated last line (from a crash in the middle of a write) is skipped.
+    Returns the number of log records replayed.
+    """
+    db_path = db_path or config.RESULTS_DB_FILE
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    store = ResultStore(log_path, db_path, start_run=False)
+    replayed = 0
+    runs = {}
+    batch = []
+
+    def flush():
+        pipelines = {}
+        for pipeline, row in batch:
+            pipelines.setdefault(pipeline, []).append(row)
+        for pipeline, rows in pipelines.items():
+            store._upsert(pipeline, rows)
+        batch.clear()
+
+    with open(store.log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            run_id, ts = entry['run'], entry['ts']
+            started, finished = runs.get(run_id, (ts, ts))
+            runs[run_id] = (min(started, ts), max(finished, ts))
+            batch.append((entry['pipeline'],
+                          (entry['domain'], json.dumps(entry['outcomes']), entry['score'], run_id, ts)))
+            replayed += 1
+            if len(batch) >= _CHUNK_SIZE:
+                flush()
+    flush()
+    with store._conn:
+        store._conn.executemany("INSERT INTO runs (run_id, started_at, finished_at) VALUES (?, ?, ?)",
+                                [(run_id, started, finished) for run_id, (started, finished) in runs.items()])
+    store.close()
+    return replayed
+
+
+def start_result_store() -> ResultStore:
+    """Opens the result store for a new run."""
+    global _active_store
+    _active_store = ResultStore()
+    return _active_store
+
+
+def get_active_result_store() -> Optional[ResultStore]:
+    """Returns the result store of the current run, or None if none was started."""
+    return _active_store
+
+
+def close_result_store():
+    global _active_store
+    if _active_store is not None:
+        _active_store.close()
+        _active_store = None
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query or rebuild the result store.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('rebuild', help="Rebuild the SQLite view from the JSONL log.")
+    new = subparsers.add_parser('new', help="List the domains the last run found for the first time.")
+    new.add_argument('--pipeline', default='new', choices=['new', 'expired'])
+    args = parser.parse_args()
+
+    if args.command == 'rebuild':
+        count = rebuild_index()
+        print(f"[SUCCESS] Rebuilt {config.RESULTS_DB_FILE} from {count} log records.")
+    else:
+        store = ResultStore(start_run=False)
+        last_run = store.previous_run_id
+        for result in store.iter_new_since(args.pipeline, (last_run or 1) - 1):
+            score = f" (score: {result['score']:g})" if result['score'] is not None else ""
+            print(f"{result['domain']}{score}")
+        store.close()
@@ -0,0 +1,532 @@
+# domainscanner/utils/stub_servers.py
+"""
+Local stub servers used to exercise the network stages without touching
+live services. Each server runs in a background thread and is used as a
+context manager that yields its (host, port).
+"""
+
+import json
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+UDP_RECEIVE_BUFFER = 4 * 1024 * 1024
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    # The default listen backlog of 5 drops connections under concurrent load
+    request_queue_size = 256
+    allow_reuse_address = True
+
+
+class _ThreadingHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 256
+
+
+class _UDPServer(socketserver.UDPServer):
+    def server_bind(self):
+        # Bursts of queries overflow the default receive buffer
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER)
+        super().server_bind()
+
+
+class _StubServer:
+    """Base class handling the background thread of a socketserver."""
+
+    server_class = None
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def _make_handler(self):
+        raise NotImplementedError
+
+    def start(self) -> Tuple[str, int]:
+        self._server = self.server_class((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.host, self.port
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> Tuple[str, int]:
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubDNSServer(_StubServer):
+    """
+    Answers every query with NOERROR for registered names and NXDOMAIN
+    for everything else. Only the header is meaningful; no records are sent.
+    """
+
+    # Answering is cheap, so one thread keeps up better than a thread per packet
+    server_class = _UDPServer
+
+    def __init__(self, registered: Iterable[str], host: str = '127.0.0.1', port: int = 0):
+        super().__init__(host, port)
+        self.registered = {domain.lower().rstrip('.') for domain in registered}
+
+    def _make_handler(self):
+        registered = self.registered
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                data, sock = self.request
+                if len(data) < 12:
+                    return
+                query_id, flags = struct.unpack('>HH', data[:4])
+                # Decode the question name
+                labels, offset = [], 12
+                while offset < len(data) and data[offset]:
+                    length = data[offset]
+                    labels.append(data[offset + 1:offset + 1 + length].decode('ascii', 'replace'))
+                    offset += length + 1
+                name = '.'.join(labels).lower()
+                rcode = 0 if name in registered else 3
+                response_flags = 0x8180 | rcode  # QR, RD, RA
+                header = struct.pack('>HHHHHH', query_id, response_flags, 1, 0, 0, 0)
+                sock.sendto(header + data[12:], self.client_address)
+
+        return Handler
+
+
+class StubWhoisServer(_StubServer):
+    """
+    Port-43 WHOIS responder. Registered names get a registry-style record
+    with a status and an expiration date; everything else gets "No match for".
+
+    Every answer is delayed by `latency` seconds, and a fraction `error_rate`
+    of the connections is closed without a response.
+    """
+
+    server_class = _ThreadingTCPServer
+
+    def __init__(self, registered: Iterable[str], host: str = '127.0.0.1', port: int = 0,
+                 expiration_date: str = '2030-01-01T00:00:00Z', latency: float = 0.0,
+                 error_rate: float = 0.0):
+        super().__init__(host, port)
+        self.registered = {domain.lower() for domain in registered}
+        self.expiration_date = expiration_date
+        self.latency = latency
+        self.error_rate = error_rate
+
+    def _make_handler(self):
+        registered = self.registered
+        expiration_date = self.expiration_date
+        latency, error_rate = self.latency, self.error_rate
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                domain = self.rfile.readline().strip().decode('ascii', 'replace').lower()
+                if latency:
+                    time.sleep(latency)
+                if error_rate and random.random() < error_rate:
+                    return
+                if domain in registered:
+                    response = (
+                        f"   Domain Name: {domain.upper()}\r\n"
+                        f"   Registry Expiry Date: {expiration_date}\r\n"
+                        f"   Domain Status: clientTransferProhibited\r\n"
+                    )
+                else:
+                    response = f'No match for "{domain.upper()}".\r\n'
+                self.wfile.write(response.encode('utf-8'))
+
+        return Handler
+
+
+class StubHTTPServer(_StubServer):
+    """
+    Keep-alive HTTP/1.1 server dispatching GET and POST requests by path.
+    Routes map a path to a callable taking (query, body, headers) and returning
+    (status, content_type, body_bytes), optionally followed by a dict of extra
+    response headers. A route ending in '/' also serves every path below it;
+    the rest of the path is passed in the query as '_subpath'.
+
+    Every response is delayed by `latency` seconds, and a fraction `error_rate`
+    of the requests is answered with 503.
+    """
+
+    server_class = _ThreadingHTTPServer
+
+    def __init__(self, routes: Dict[str, Callable], host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, error_rate: float = 0.0):
+        super().__init__(host, port)
+        self.routes = routes
+        self.latency = latency
+        self.error_rate = error_rate
+
+    def _make_handler(self):
+        routes = self.routes
+        latency, error_rate = self.latency, self.error_rate
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; with Nagle's algorithm the
+            # body waits for the client's delayed ACK and every answer takes 40ms more
+            disable_nagle_algorithm = True
+
+            def _dispatch(self, body: bytes):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                route = routes.get(url.path)
+                if route is None:
+                    prefix = url.path[:url.path.rfind('/') + 1]
+                    route = routes.get(prefix)
+                    query['_subpath'] = [url.path[len(prefix):]]
+                extra = []
+                if latency:
+                    time.sleep(latency)
+                if error_rate and random.random() < error_rate:
+                    status, content_type, payload = 503, 'text/plain', b'Service Unavailable'
+                elif route is None:
+                    status, content_type, payload = 404, 'text/plain', b'Not Found'
+                else:
+                    status, content_type, payload, *extra = route(query, body, self.headers)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                for name, value in (extra[0] if extra else {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._dispatch(b'')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self._dispatch(self.rfile.read(length))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class StubWaybackServer(StubHTTPServer):
+    """
+    Fake archive.org serving /wayback/available and the CDX API from a
+    domain -> list of capture timestamps (YYYYMMDDhhmmss) map.
+    """
+
+    def __init__(self, histories: Dict[str, List[str]], host: str = '127.0.0.1', port: int = 0,
+                 **kwargs):
+        self.histories = {domain.lower(): sorted(stamps) for domain, stamps in histories.items()}
+        super().__init__({
+            '/wayback/available': self._available,
+            '/cdx/search/cdx': self._cdx,
+        }, host, port, **kwargs)
+
+    def _available(self, query, body, headers):
+        domain = query.get('url', [''])[0].lower()
+        stamps = self.histories.get(domain)
+        snapshots = {}
+        if stamps:
+            snapshots = {'closest': {
+                'available': True, 'status': '200', 'timestamp': stamps[-1],
+                'url': f"http://web.archive.org/web/{stamps[-1]}/http://{domain}/",
+            }}
+        payload = {'url': domain, 'archived_snapshots': snapshots}
+        return 200, 'application/json', json.dumps(payload).encode('utf-8')
+
+    def _cdx(self, query, body, headers):
+        domain = query.get('url', [''])[0].lower()
+        limit = int(query.get('limit', ['0'])[0]) or None
+        stamps = self.histories.get(domain, [])[:limit]
+        if not stamps:
+            return 200, 'application/json', b'[]'
+        rows = [['timestamp']] + [[stamp] for stamp in stamps]
+        return 200, 'application/json', json.dumps(rows).encode('utf-8')
+
+
+class StubExpiredDomainsServer(StubHTTPServer):
+    """
+    Fake expireddomains.net serving paginated /<list-name>/?start=N fixture
+    pages with ETag / If-None-Match support.
+    """
+
+    def __init__(self, listings: Dict[str, List[str]], page_size: int = 25,
+                 host: str = '127.0.0.1', port: int = 0, **kwargs):
+        self.listings = listings
+        self.page_size = page_size
+        super().__init__({
+            f"/{list_name}/": self._make_route(domains) for list_name, domains in listings.items()
+        }, host, port, **kwargs)
+
+    def _make_route(self, domains: List[str]):
+        def route(query, body, headers):
+            start = int(query.get('start', ['0'])[0])
+            page = domains[start:start + self.page_size]
+            etag = f'"{start}-{len(domains)}"'
+            if headers.get('If-None-Match') == etag:
+                return 304, 'text/html', b''
+            rows = ''.join(
+                f'<tr><td class="field_domain"><a href="/goto/{domain}" title="{domain}">{domain}</a></td>'
+                f'<td>{i}</td></tr>'
+                for i, domain in enumerate(page)
+            )
+            html = (
+                '<html><head><title>Deleted Domains</title></head><body>'
+                f'<table class="base1"><thead><tr><th>Domain</th><th>BL</th></tr></thead>'
+                f'<tbody>{rows}</tbody></table></body></html>'
+            )
+            return 200, 'text/html', html.encode('utf-8'), {'ETag': etag}
+        return route
+
+
+class StubRSSServer(StubHTTPServer):
+    """
+    Fake news feed serving /<feed-name>.xml RSS documents from a
+    feed name -> list of headlines map, with ETag / If-None-Match and
+    Last-Modified / If-Modified-Since support. `requests` counts the calls
+    and `not_modified` the 304 answers.
+    """
+
+    LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+    def __init__(self, feeds: Dict[str, List[str]], host: str = '127.0.0.1', port: int = 0, **kwargs):
+        self.feeds = feeds
+        self.requests = 0
+        self.not_modified = 0
+        self._counter_lock = threading.Lock()
+        super().__init__({
+            f"/{feed_name}.xml": self._make_route(headlines) for feed_name, headlines in feeds.items()
+        }, host, port, **kwargs)
+
+    def _make_route(self, headlines: List[str]):
+        def route(query, body, headers):
+            etag = f'"{len(headlines)}-{hash(tuple(headlines)) & 0xFFFFFFFF:08x}"'
+            validators = {'ETag': etag, 'Last-Modified': self.LAST_MODIFIED}
+            unchanged = (headers.get('If-None-Match') == etag if 'If-None-Match' in headers
+                         else headers.get('If-Modified-Since') == self.LAST_MODIFIED)
+            with self._counter_lock:
+                self.requests += 1
+                self.not_modified += unchanged
+            if unchanged:
+                return 304, 'application/rss+xml', b'', validators
+            items = ''.join(
+                f'<item><title>{escape(title)}</title><guid>item-{i}</guid></item>'
+                for i, title in enumerate(headlines)
+            )
+            xml = (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                f'<rss version="2.0"><channel><title>Stub feed</title>{items}</channel></rss>'
+            )
+            return 200, 'application/rss+xml', xml.encode('utf-8'), validators
+        return route
+
+
+class StubSEOServer(StubHTTPServer):
+    """
+    Fake Moz-style bulk metrics API: POST /v2/url_metrics with
+    {"targets": [...]} returns one result per target. Scores come from the
+    `scores` map, or a stable hash of the domain. `requests` counts the
+    calls, to measure batching efficiency.
+    """
+
+    def __init__(self, scores: Optional[Dict[str, int]] = None, host: str = '127.0.0.1', port: int = 0,
+                 **kwargs):
+        self.scores = {domain.lower(): score for domain, score in (scores or {}).items()}
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+        super().__init__({'/v2/url_metrics': self._url_metrics}, host, port, **kwargs)
+
+    def _url_metrics(self, query, body, headers):
+        with self._requests_lock:
+            self.requests += 1
+        if not headers.get('Authorization'):
+            return 401, 'application/json', b'{"error": "missing credentials"}'
+        try:
+            targets = json.loads(body)['targets']
+        except (ValueError, KeyError):
+            return 400, 'application/json', b'{"error": "invalid request"}'
+        results = []
+        for target in targets:
+            domain = target.lower()
+            score = self.scores.get(domain)
+            if score is None:
+                score = int.from_bytes(domain.encode('utf-8'), 'big') % 60 + 1
+            results.append({'page': f"{domain}/", 'domain_authority': score})
+        return 200, 'application/json', json.dumps({'results': results}).encode('utf-8')
+
+
+class StubMarketplaceServer(StubHTTPServer):
+    """
+    Fake marketplace bulk listing API: POST /listings/bulk with
+    {"listings": [{"domain", "idempotency_key"}]}. A listing sent again with
+    the same idempotency key gets its original listing id back, so `listings`
+    holds every domain exactly once. `requests` counts the calls.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **kwargs):
+        self.listings: Dict[str, str] = {}
+        self.requests = 0
+        self._listings_lock = threading.Lock()
+        super().__init__({'/listings/bulk': self._bulk}, host, port, **kwargs)
+
+    def _bulk(self, query, body, headers):
+        with self._listings_lock:
+            self.requests += 1
+        if not headers.get('Authorization'):
+            return 401, 'application/json', b'{"error": "missing credentials"}'
+        try:
+            listings = json.loads(body)['listings']
+        except (ValueError, KeyError):
+            return 400, 'application/json', b'{"error": "invalid request"}'
+        results = []
+        with self._listings_lock:
+            for listing in listings:
+                key = listing.get('idempotency_key') or listing['domain']
+                if key not in self.listings:
+                    self.listings[key] = f"L{len(self.listings) + 1}"
+                results.append({'domain': listing['domain'], 'listing_id': self.listings[key]})
+        return 200, 'application/json', json.dumps({'results': results}).encode('utf-8')
+
+
+class StubRegistrarServer(StubHTTPServer):
+    """
+    Fake registrar availability APIs answering from a set of registered
+    domains: GoDaddy-style POST /v1/domains/available with a JSON list of
+    domains, and Namecheap-style /xml.response with
+    Command=namecheap.domains.check. Batches larger than `max_batch` are
+    refused. `requests` counts the calls.
+    """
+
+    def __init__(self, registered: Iterable[str], max_batch: int = 500, host: str = '127.0.0.1',
+                 port: int = 0, **kwargs):
+        self.registered = {domain.lower() for domain in registered}
+        self.max_batch = max_batch
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+        super().__init__({
+            '/v1/domains/available': self._godaddy,
+            '/xml.response': self._namecheap,
+        }, host, port, **kwargs)
+
+    def _count(self):
+        with self._requests_lock:
+            self.requests += 1
+
+    def _godaddy(self, query, body, headers):
+        self._count()
+        if not headers.get('Authorization', '').startswith('sso-key '):
+            return 401, 'application/json', b'{"code": "UNABLE_TO_AUTHENTICATE"}'
+        try:
+            domains = json.loads(body)
+        except ValueError:
+            return 400, 'application/json', b'{"code": "INVALID_BODY"}'
+        if not isinstance(domains, list) or len(domains) > self.max_batch:
+            return 422, 'application/json', b'{"code": "TOO_MANY_DOMAINS"}'
+        results = [
+            {'domain': domain, 'available': domain.lower() not in self.registered, 'definitive': False}
+            for domain in domains
+        ]
+        return 200, 'application/json', json.dumps({'domains': results}).encode('utf-8')
+
+    def _namecheap(self, query, body, headers):
+        self._count()
+        params = {**query, **parse_qs(body.decode('utf-8'))}
+        domains = params.get('DomainList', [''])[0].split(',')
+        if not params.get('ApiKey') or params.get('Command', [''])[0] != 'namecheap.domains.check':
+            errors, results = '<Error Number="1011102">Parameter ApiKey is missing</Error>', ''
+        elif len(domains) > self.max_batch:
+            errors, results = '<Error Number="2030166">Too many domains</Error>', ''
+        else:
+            errors = ''
+            results = ''.join(
+                f'<DomainCheckResult Domain="{escape(domain)}" '
+                f'Available="{str(domain.lower() not in self.registered).lower()}" />'
+                for domain in domains
+            )
+        status = 'ERROR' if errors else 'OK'
+        payload = (
+            f'<?xml version="1.0" encoding="utf-8"?>'
+            f'<ApiResponse Status="{status}" xmlns="http://api.namecheap.com/xml.response">'
+            f'<Errors>{errors}</Errors><CommandResponse Type="namecheap.domains.check">{results}'
+            f'</CommandResponse></ApiResponse>'
+        )
+        return 200, 'text/xml', payload.encode('utf-8')
+
+
+class StubRDAPServer(StubHTTPServer):
+    """
+    Fake RDAP service: /rdap/dns.json is an IANA-style bootstrap registry
+    pointing every TLD in `tlds` at this server, and /domain/<name> answers
+    with a domain object (status, expiration event) for registered names
+    and 404 for everything else. `registered` maps domains to their
+    expiration dates, or is a plain list using `expiration_date`.
+    `requests` and `connections` count the calls and the TCP connections.
+    """
+
+    def __init__(self, registered: Iterable[str], tlds: Iterable[str] = ('com', 'net', 'io', 'ai'),
+                 expiration_date: str = '2030-01-01T00:00:00Z', host: str = '127.0.0.1', port: int = 0,
+                 **kwargs):
+        expirations = registered if isinstance(registered, dict) else dict.fromkeys(registered, expiration_date)
+        self.registered = {domain.lower(): expiration for domain, expiration in expirations.items()}
+        self.tlds = [tld.lstrip('.') for tld in tlds]
+        self.requests = 0
+        self.connections = 0
+        self._counter_lock = threading.Lock()
+        super().__init__({
+            '/rdap/dns.json': self._bootstrap,
+            '/domain/': self._domain,
+        }, host, port, **kwargs)
+
+    def _make_handler(self):
+        handler = super()._make_handler()
+        server = self
+
+        class CountingHandler(handler):
+            def setup(self):
+                with server._counter_lock:
+                    server.connections += 1
+                super().setup()
+
+        return CountingHandler
+
+    def _bootstrap(self, query, body, headers):
+        payload = {
+            'version': '1.0',
+            'publication': '2024-01-01T00:00:00Z',
+            'services': [[self.tlds, [f"http://{self.host}:{self.port}/"]]],
+        }
+        return 200, 'application/json', json.dumps(payload).encode('utf-8')
+
+    def _domain(self, query, body, headers):
+        with self._counter_lock:
+            self.requests += 1
+        domain = query['_subpath'][0].lower()
+        if domain not in self.registered:
+            payload = {'errorCode': 404, 'title': 'Not Found'}
+            return 404, 'application/rdap+json', json.dumps(payload).encode('utf-8')
+        payload = {
+            'objectClassName': 'domain',
+            'ldhName': domain.upper(),
+            'status': ['client transfer prohibited'],
+            'events': [
+                {'eventAction': 'registration', 'eventDate': '2015-01-01T00:00:00Z'},
+                {'eventAction': 'expiration', 'eventDate': self.registered[domain]},
+            ],
+        }
+        return 200, 'application/rdap+json', json.dumps(payload).encode('utf-8')
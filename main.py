@@ -1,45 +1,50 @@
 # src/main.py
+"""
+Command line entry point. Every subcommand imports only the stages it uses,
+so short runs (cron jobs, single shards) start quickly:
 
-import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from tqdm import tqdm
-import datetime
-
-from domainscanner.generators.trend_generator import generate_trend_domains
-from domainscanner.generators.dictionary_generator import generate_dictionary_domains
-from domainscanner.generators.news_generator import generate_news_based_domains
-from domainscanner.parsers.expired_domains_parser import get_expired_domains
-from domainscanner.analyzers.availability import check_single_domain
-from domainscanner.analyzers.metrics import filter_by_length, check_single_domain_history
-from domainscanner.analyzers.seo_analyzer import get_single_domain_seo
-from domainscanner.publishers.marketplace_lister import list_domain_on_marketplaces
-
-# Constants
-MAX_WORKERS = 5 # Reduced from 10 to be even less aggressive
-
-def run_parallel(func, items, description=""):
-    """Helper function to run a function in parallel on a list of items."""
-    results = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # Create a future for each item
-        futures = [executor.submit(func, item) for item in items]
-        # Process as they complete, with a progress bar
-        for future in tqdm(as_completed(futures), total=len(items), desc=description):
-            results.append(future.result())
-    return results
-
-def save_results(filename, domains):
-    """Saves a list of domains to a file in the data directory."""
-    filepath = os.path.join('data', filename)
-    with open(filepath, 'w') as f:
-        # Add a timestamp to the file
-        f.write(f"# Results from {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        for domain in domains:
-            f.write(f"{domain}\n")
-    print(f"\n[SUCCESS] Results saved to {filepath}")
+    python main.py new            # new domains, in config.PIPELINE_MODE
+    python main.py expired        # expired domains
+    python main.py check FILE     # availability of the domains listed in FILE
+    python main.py generate       # print the candidates without checking them
+
+Without a subcommand both the new and the expired pipelines run.
+"""
+
+import argparse
+import contextlib
+import functools
+import itertools
+import sys
+import threading
+
+from domainscanner import config
+
+PIPELINE_MODES = ['batch', 'streaming', 'distributed']
+
+def save_results(pipeline, results):
+    """Appends (domain, outcomes, score) results of a pipeline to the result store, if one was started."""
+    from domainscanner.utils.result_store import get_active_result_store
+    store = get_active_result_store()
+    if store is None:
+        return
+    new_count = store.record_many(pipeline, results)
+    print(f"\n[SUCCESS] Results saved to {store.log_path} ({new_count} new since the last run)")
+
+def new_domain_outcomes(domain, short_domains, clean_domains):
+    """Stage outcomes of an available new domain; None for stages it did not reach."""
+    is_short = domain in short_domains
+    return {'available': True, 'short': is_short, 'clean_history': domain in clean_domains if is_short else None}
 
 def process_new_domains():
     """Pipeline for finding valuable new domains."""
+    from domainscanner.analyzers.metrics import filter_by_length
+    from domainscanner.generators.dictionary_generator import generate_dictionary_domains
+    from domainscanner.generators.news_generator import generate_news_based_domains
+    from domainscanner.generators.trend_generator import generate_trend_domains
+    from domainscanner.publishers.marketplace_lister import list_domain_on_marketplaces
+    from domainscanner.stages import find_available_domains, find_clean_history_domains
+
     print("\n\n=========================================")
     print("🚀 Starting Pipeline for NEW Domains 🚀")
     print("=========================================")
@@ -52,19 +57,22 @@ def process_new_domains():
     print(f"Generated {len(dictionary_domains)} domain candidates from the dictionary.")
     news_domains = generate_news_based_domains()
     print(f"Generated {len(news_domains)} domain candidates from news headlines.")
-    generated_domains = list(set(trend_domains + dictionary_domains + news_domains))
+    # The lists are in memory already, so the dedupe is exact; only the streaming generators use the Bloom filter
+    generated_domains = list(dict.fromkeys(itertools.chain(trend_domains, dictionary_domains, news_domains)))
+    if config.SCORING_ENABLED:
+        from domainscanner.analyzers.scoring import rank_domains
+        # The best names are checked first; a top-K budget drops the rest
+        generated_domains = rank_domains(generated_domains)
     
-    # 2. Analyze for availability (in parallel)
-    availability_results = run_parallel(check_single_domain, generated_domains, "Checking Availability")
-    available_domains = [domain for domain, is_available in availability_results if is_available]
+    # 2. Analyze for availability (DNS pre-filter, then WHOIS in parallel)
+    available_domains = find_available_domains(generated_domains)
     
     # 3. Filter by length
     short_domains = filter_by_length(available_domains)
     print(f"\nFiltered down to {len(short_domains)} domains based on length.")
     
     # 4. Filter for clean history (in parallel)
-    history_results = run_parallel(check_single_domain_history, short_domains, "Checking History")
-    clean_domains = [domain for domain, has_history in history_results if not has_history]
+    clean_domains = find_clean_history_domains(short_domains)
     
     # 5. Print and save results
     print("\n--- ✅ Final Results for NEW Domains ---")
@@ -74,12 +82,112 @@ def process_new_domains():
         for domain in sorted_domains:
             print(f"  -> {domain}")
             list_domain_on_marketplaces(domain)
-        save_results('new_domains_found.txt', sorted_domains)
     else:
         print("No new domains found that meet all criteria.")
+    short_set, clean_set = set(short_domains), set(clean_domains)
+    save_results('new', [
+        (domain, new_domain_outcomes(domain, short_set, clean_set), None) for domain in sorted(available_domains)
+    ])
+
+def process_new_domains_streaming():
+    """
+    Streaming pipeline for finding valuable new domains. Candidates flow
+    through bounded queues, so a domain found available is filtered, checked
+    for history and published while generation and WHOIS checks continue.
+    """
+    from domainscanner.analyzers.metrics import filter_by_length
+    from domainscanner.stages import (
+        find_available_domains, find_clean_history_domains, iter_unique_candidates, publish_domains
+    )
+    from domainscanner.utils.pipeline import Stage, run_pipeline
+    from domainscanner.utils.result_store import get_active_result_store
+
+    print("\n\n=====================================================")
+    print("🚀 Starting Streaming Pipeline for NEW Domains 🚀")
+    print("=====================================================")
+
+    # Every available domain is stored with the stage outcomes it reached, as
+    # in batch mode: the length and history stages record the domains they drop
+    store = get_active_result_store()
+    new_count = [0]
+    count_lock = threading.Lock()
+
+    def record(domains, short_domains, clean_domains):
+        if store is None or not domains:
+            return
+        count = store.record_many('new', [
+            (domain, new_domain_outcomes(domain, short_domains, clean_domains), None) for domain in domains
+        ])
+        with count_lock:
+            new_count[0] += count
+
+    def length_stage(domains):
+        short_domains = filter_by_length(domains)
+        short_set = set(short_domains)
+        record([domain for domain in domains if domain not in short_set], short_set, ())
+        return short_domains
+
+    def history_stage(domains):
+        clean_domains = find_clean_history_domains(domains, show_progress=False)
+        clean_set = set(clean_domains)
+        record([domain for domain in domains if domain not in clean_set], set(domains), clean_set)
+        return clean_domains
+
+    batch_size = config.STREAM_BATCH_SIZE
+    stages = [
+        Stage('availability', functools.partial(find_available_domains, show_progress=False),
+              workers=config.STREAM_AVAILABILITY_WORKERS, batch_size=batch_size),
+        Stage('length', length_stage, batch_size=batch_size),
+        Stage('history', history_stage, workers=config.STREAM_HISTORY_WORKERS, batch_size=batch_size),
+        Stage('publish', publish_domains),
+    ]
+
+    found_domains = 0
+    for domain in run_pipeline(iter_unique_candidates(), stages):
+        print(f"  -> {domain}")
+        record([domain], {domain}, {domain})
+        found_domains += 1
+
+    print("\n--- ✅ Final Results for NEW Domains ---")
+    if found_domains:
+        print(f"Found {found_domains} domains that meet all criteria (available, short, clean history).")
+    else:
+        print("No new domains found that meet all criteria.")
+    if store is not None:
+        print(f"\n[SUCCESS] Results saved to {store.log_path} ({new_count[0]} new since the last run)")
+
+def process_new_domains_distributed():
+    """
+    Sharded pipeline for finding valuable new domains: this process splits the
+    candidates into shards and local or remote worker processes analyze them.
+    """
+    from domainscanner.distributed.runner import run_distributed
+    from domainscanner.publishers.marketplace_lister import list_domain_on_marketplaces
+    from domainscanner.stages import iter_unique_candidates
+
+    print("\n\n=======================================================")
+    print("🚀 Starting Distributed Pipeline for NEW Domains 🚀")
+    print("=======================================================")
+
+    results = run_distributed(iter_unique_candidates())
+    clean_domains = sorted(domain for domain, outcomes in results if outcomes['clean_history'])
+
+    print("\n--- ✅ Final Results for NEW Domains ---")
+    if clean_domains:
+        print(f"Found {len(clean_domains)} domains that meet all criteria (available, short, clean history):")
+        for domain in clean_domains:
+            print(f"  -> {domain}")
+            list_domain_on_marketplaces(domain)
+    else:
+        print("No new domains found that meet all criteria.")
+    save_results('new', [(domain, outcomes, None) for domain, outcomes in results if outcomes['available']])
 
 def process_expired_domains():
     """Pipeline for finding valuable expired domains."""
+    from domainscanner.parsers.expired_domains_parser import get_expired_domains
+    from domainscanner.publishers.marketplace_lister import list_domain_on_marketplaces
+    from domainscanner.stages import find_available_domains, prioritize_expired_domains, score_domains
+
     print("\n\n===========================================")
     print("💎 Starting Pipeline for EXPIRED Domains 💎")
     print("===========================================")
@@ -90,17 +198,17 @@ def process_expired_domains():
     if not expired_domains:
         print("No expired domains found or parser failed.")
         return
+    expired_domains = prioritize_expired_domains(expired_domains)
 
-    # 2. Check availability (in parallel)
-    availability_results = run_parallel(check_single_domain, expired_domains, "Checking Availability")
-    available_expired = [domain for domain, is_available in availability_results if is_available]
+    # 2. Check availability (DNS pre-filter, then WHOIS in parallel)
+    available_expired = find_available_domains(expired_domains)
     
-    # 3. Check SEO metrics for the available ones (in parallel)
+    # 3. Check SEO metrics for the available ones (in bulk requests)
     if not available_expired:
         print("\nNo available domains found from the parsed list.")
         return
         
-    seo_results = run_parallel(get_single_domain_seo, available_expired, "Checking SEO (Simulated)")
+    seo_results = score_domains(available_expired)
     
     # 4. Filter or sort by score (e.g., show domains with DA > 20)
     print("\n--- ✅ Final Results for EXPIRED Domains (DA > 20) ---")
@@ -110,25 +218,149 @@ def process_expired_domains():
         # Sort by score, descending
         sorted_domains = sorted(high_value_domains.items(), key=lambda item: item[1], reverse=True)
         print(f"Found {len(sorted_domains)} high-value expired domains:")
-        # Prepare list for saving
-        domains_to_save = []
         for domain, score in sorted_domains:
-            line = f"{domain} (DA: {score})"
-            print(f"  -> {line}")
-            domains_to_save.append(line)
+            print(f"  -> {domain} (DA: {score})")
             list_domain_on_marketplaces(domain)
-        save_results('expired_domains_found.txt', domains_to_save)
     else:
         print("No high-value expired domains found that meet the criteria.")
+    save_results('expired', [
+        (domain, {'available': True, 'high_value': domain in high_value_domains}, score)
+        for domain, score in seo_results
+    ])
 
-def main():
-    """Main function to run the domain scanner bot."""
+def process_new_domains_in_mode(mode=None):
+    """Runs the new-domain pipeline of the given mode (config.PIPELINE_MODE by default)."""
+    mode = mode or config.PIPELINE_MODE
+    if mode == 'streaming':
+        process_new_domains_streaming()
+    elif mode == 'distributed':
+        process_new_domains_distributed()
+    else:
+        process_new_domains()
+
+def check_domains_from_file(path):
+    """Checks the availability of the domains listed in a file, one per line."""
+    from domainscanner.generators.engine import iter_words
+    from domainscanner.stages import find_available_domains
+
+    domains = list(dict.fromkeys(domain.lower() for domain in iter_words(path)))
+    print(f"\n--- Checking {len(domains)} domains from {path} ---")
+    available = set(find_available_domains(domains))
+    for domain in domains:
+        print(f"[{'AVAILABLE' if domain in available else 'TAKEN'}] {domain}")
+    save_results('check', [(domain, {'available': True}, None) for domain in sorted(available)])
+
+def generate_candidates(limit=None, output=None):
+    """
+    Prints the unique candidates, best first, without any availability check.
+    Progress and warnings of the generators go to stderr, so stdout carries
+    only the candidates.
+    """
+    from domainscanner.stages import iter_unique_candidates
+
+    out = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            for domain in itertools.islice(iter_unique_candidates(), limit):
+                out.write(domain + '\n')
+    finally:
+        if output:
+            out.close()
+
+def run_daemon(once=False):
+    """Scans continuously, only checking what changed since the last round (see domainscanner/daemon.py)."""
+    from domainscanner.daemon import ScanDaemon
+
+    daemon = ScanDaemon()
+    try:
+        daemon.run(once=once)
+    finally:
+        daemon.state.close()
+
+def run_with_services(args, func):
+    """Runs a scan with the journal, result store, publisher and metrics of the run around it."""
+    from domainscanner.publishers.marketplace_lister import close_publisher, start_publisher
+    from domainscanner.utils.journal import close_journal, start_journal
+    from domainscanner.utils.metrics import start_metrics_server, write_metrics_summary
+    from domainscanner.utils.result_store import close_result_store, start_result_store
+
+    config.AVAILABILITY_BACKEND = args.availability_backend
     print("Initializing Domain Scanner Bot...")
-    
-    process_new_domains()
-    process_expired_domains()
-    
+    if args.metrics_port is not None:
+        start_metrics_server(args.metrics_port)
+    start_journal(resume=args.resume)
+    start_result_store()
+    # Listings are sent in the background while the scan goes on
+    start_publisher()
+    try:
+        func()
+    finally:
+        close_publisher()
+        close_journal()
+        close_result_store()
+        write_metrics_summary()
+
     print("\n\nDomain Scanner Bot finished.")
 
+def add_run_options(parser, defaults=True):
+    """
+    Adds the options shared by the scanning commands. Subcommands get them
+    without defaults, so options given before the subcommand are kept.
+    """
+    default = (lambda value: value) if defaults else (lambda value: argparse.SUPPRESS)
+    parser.add_argument('--resume', action='store_true', default=default(False),
+                        help="Skip domains already decided by an interrupted run (see config.JOURNAL_FILE).")
+    parser.add_argument('--metrics-port', type=int, default=default(config.METRICS_PORT),
+                        help="Serve Prometheus metrics on this port while the scan runs.")
+    parser.add_argument('--availability-backend', choices=config.AVAILABILITY_BACKENDS,
+                        default=default(config.AVAILABILITY_BACKEND),
+                        help="How availability is checked: WHOIS, RDAP, or a registrar's bulk API.")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Domain Scanner Bot")
+    add_run_options(parser)
+    subparsers = parser.add_subparsers(dest='command')
+
+    new = subparsers.add_parser('new', help="Find valuable new domains.")
+    add_run_options(new, defaults=False)
+    new.add_argument('--mode', choices=PIPELINE_MODES, default=None,
+                     help="Pipeline mode (config.PIPELINE_MODE by default).")
+
+    expired = subparsers.add_parser('expired', help="Find valuable expired domains.")
+    add_run_options(expired, defaults=False)
+
+    check = subparsers.add_parser('check', help="Check the availability of the domains listed in a file.")
+    add_run_options(check, defaults=False)
+    check.add_argument('file', help="File with one domain per line.")
+
+    daemon = subparsers.add_parser('daemon', help="Keep scanning new candidates and rechecking registered domains.")
+    add_run_options(daemon, defaults=False)
+    daemon.add_argument('--once', action='store_true', help="Run a single round and exit.")
+
+    generate = subparsers.add_parser('generate', help="Print the candidate domains without checking them.")
+    generate.add_argument('--limit', type=int, default=None, help="Print at most this many candidates.")
+    generate.add_argument('--output', default=None, help="Write the candidates to this file instead of stdout.")
+    return parser
+
+def main(argv=None):
+    """Main function to run the domain scanner bot."""
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'generate':
+        generate_candidates(args.limit, args.output)
+    elif args.command == 'new':
+        run_with_services(args, functools.partial(process_new_domains_in_mode, args.mode))
+    elif args.command == 'expired':
+        run_with_services(args, process_expired_domains)
+    elif args.command == 'check':
+        run_with_services(args, functools.partial(check_domains_from_file, args.file))
+    elif args.command == 'daemon':
+        run_with_services(args, functools.partial(run_daemon, args.once))
+    else:
+        def run_all():
+            process_new_domains_in_mode()
+            process_expired_domains()
+        run_with_services(args, run_all)
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()